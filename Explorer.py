@@ -1,10 +1,31 @@
+import argparse
+import hashlib
 import pygame
 import random
 import math
+import numpy as np
 import os
 import sys
 import time
 
+from assets import AssetManager
+from audio import AudioDispatcher
+from dirty_rects import DirtyRectTracker
+from ecs import Archetype, World
+from framebuffer import SCALE_INTEGER, SCALERS, ScaledDisplay
+from enemy_wave import EnemyWave
+from particles import ParticlePool
+from pipeline import SimulationPipeline
+from profiler import FrameProfiler, ProfilerOverlay
+from replay import ReplayWriter
+from snapshot import SnapshotError, SnapshotWriter, load_file
+from starfield import Starfield
+from sweep import swept_pairs
+from synth import SoundBank
+from text_cache import Hud, TextCache
+from timestep import FixedTimestep, Interpolator
+from waves import DEFAULT_CAMPAIGN, CampaignError, load_campaign
+
 # Initialize Pygame
 pygame.init()
 
@@ -29,14 +50,220 @@ PAUSE = 4
 SHOP = 5
 TUTORIAL = 6
 
+# Gameplay input bits (one per action held during a frame)
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_UP = 4
+INPUT_DOWN = 8
+INPUT_FIRE = 16
+
+# Simulated ticks of play between autosaves (see snapshot.py)
+AUTOSAVE_TICKS = 600
+
+
+def display_refresh_rate():
+    """Return the desktop's refresh rate in Hz, or FPS if it cannot be detected."""
+    try:
+        rates = pygame.display.get_desktop_refresh_rates()
+    except (AttributeError, pygame.error):  # pygame < 2.2, or no video driver
+        rates = None
+    return max(rates) if rates and max(rates) > 0 else FPS
+
+
+class SilentSound:
+    """Stand-in for pygame.mixer.Sound when running without an audio device."""
+    
+    def play(self, *args, **kwargs):
+        """Do nothing."""
+        return None
+    
+    def set_volume(self, volume):
+        """Do nothing."""
+        return None
+
+
+# Power-up kinds, indexed by the power-up pool's `type` field
+POWER_UP_TYPES = ['health', 'energy', 'coin', 'double_shot', 'shield']
+
+# Atlas sprite names for each enemy type and power-up kind
+ENEMY_SPRITES = ['enemy_red', 'enemy_purple', 'enemy_cyan']
+POWER_UP_SPRITES = ['power_up_' + power_up_type for power_up_type in POWER_UP_TYPES]
+
+# Entity pool layouts and capacities (see pools.py)
+BULLET_FIELDS = {'x': float, 'y': float}
+POWER_UP_FIELDS = {'x': float, 'y': float, 'type': int, 'speed': float}
+MAX_PLAYER_BULLETS = 1024
+MAX_ENEMY_BULLETS = 8192
+MAX_ENEMIES = 8192
+MAX_POWER_UPS = 1024
+
+# Co-op: players after the first fly the ships of the 'wingmen' archetype
+# (the first keeps the single-player fields); lives, score and coins are shared
+MAX_PLAYERS = 4
+WINGMAN_FIELDS = {'x': float, 'y': float, 'energy': float, 'shoot_cooldown': np.int32,
+                  'double_shot_time': np.int32, 'shield_time': np.int32}
+
+# Pixels an enemy bullet falls per tick
+ENEMY_BULLET_SPEED = 5
+
+# Draw layers of the entity archetypes; the boss goes in between the ones
+# below BOSS_LAYER and the rest
+BOSS_LAYER = 2
+
+# Systems run over the world each tick ('update'), each drawn frame ('draw')
+# and once per frame after both ('frame'), in order: (name, SpaceExplorer method)
+UPDATE_SYSTEMS = (
+    ('stars', 'move_stars'),
+    ('timers', 'update_timers'),
+    ('wingmen', 'update_wingmen'),
+    ('movement', 'move_entities'),
+    ('enemies', 'update_enemies'),
+    ('boss', 'update_boss'),
+    ('particles', 'update_particles'),
+    ('collisions', 'check_collisions'),
+    ('progress', 'check_level_complete'),
+)
+DRAW_SYSTEMS = (
+    ('background', 'draw_background'),
+    ('particles', 'draw_particles'),
+    ('player', 'draw_player'),
+    ('wingmen', 'draw_wingmen'),
+    ('sprites.lower', 'draw_lower_sprites'),
+    ('boss', 'draw_boss'),
+    ('sprites.upper', 'draw_upper_sprites'),
+    ('hud', 'draw_hud'),
+)
+FRAME_SYSTEMS = (
+    ('audio', 'queue_sounds'),
+    ('autosave', 'autosave'),
+)
+SYSTEMS = {'update': UPDATE_SYSTEMS, 'draw': DRAW_SYSTEMS, 'frame': FRAME_SYSTEMS}
+
+# Frame phases timed by the profiler, in the order they run, and the
+# entity counts logged with every frame
+PROFILE_PHASES = (
+    ('events', 'input') +
+    tuple('update.' + name for name, _ in UPDATE_SYSTEMS) +
+    ('draw',) +
+    tuple('frame.' + name for name, _ in FRAME_SYSTEMS) +
+    ('overlay', 'idle', 'scale', 'present', 'sync')
+)
+PROFILE_COUNTERS = ('enemies', 'player_bullets', 'enemy_bullets', 'power_ups', 'particles', 'ticks')
+
+# Render modes
+RENDER_FULL = 'full'    # Clear and flip the whole screen every frame
+RENDER_DIRTY = 'dirty'  # Only clear and push the areas sprites covered
+
+
+def create_world(player_bullets=MAX_PLAYER_BULLETS, enemies=MAX_ENEMIES, enemy_bullets=MAX_ENEMY_BULLETS,
+                 power_ups=MAX_POWER_UPS):
+    """Create the game's entity archetypes with room for the given numbers of entities.
+
+    Shared components (see ecs.py):
+      vy      vertical speed of every entity (power-ups have a per-entity speed)
+      cull    (top, bottom) limits; entities moved beyond them are removed
+      sprite  atlas sprite of every entity, or `sprites`: one per 'type' value
+      layer   draw order
+    """
+    world = World()
+    world.add(Archetype('player_bullets', player_bullets, BULLET_FIELDS,
+                        {'vy': -10, 'cull': (0, math.inf), 'sprite': 'bullet', 'layer': 0}))
+    world.add(EnemyWave(enemies, {'sprites': ENEMY_SPRITES, 'layer': 1}))
+    world.add(Archetype('enemy_bullets', enemy_bullets, BULLET_FIELDS,
+                        {'vy': ENEMY_BULLET_SPEED, 'cull': (-math.inf, HEIGHT), 'sprite': 'enemy_bullet',
+                         'layer': 3}))
+    world.add(Archetype('power_ups', power_ups, POWER_UP_FIELDS,
+                        {'cull': (-math.inf, HEIGHT), 'sprites': POWER_UP_SPRITES, 'layer': 4}))
+    world.add(Archetype('wingmen', MAX_PLAYERS - 1, WINGMAN_FIELDS))
+    return world
+
+
+def step_ship(x, y, bits, speed):
+    """Return where a ship at (x, y) moves to in one tick holding INPUT_* `bits`."""
+    if bits & INPUT_LEFT:
+        x = max(30, x - speed)
+    if bits & INPUT_RIGHT:
+        x = min(WIDTH - 30, x + speed)
+    if bits & INPUT_UP:
+        y = max(50, y - speed)
+    if bits & INPUT_DOWN:
+        y = min(HEIGHT - 50, y + speed)
+    return x, y
+
+
 class SpaceExplorer:
-    def __init__(self):
-        """Initialize the game with all necessary attributes and settings."""
+    def __init__(self, headless=False, seed=None, render_mode=RENDER_FULL, window_size=None,
+                 fullscreen=False, scaler=SCALE_INTEGER, campaign=DEFAULT_CAMPAIGN):
+        """Initialize the game with all necessary attributes and settings.
+        
+        With headless=True no window or audio device is opened: drawing goes to
+        an offscreen surface and sounds are silent, so the simulation can run
+        on machines without a display. A given seed makes the game fully
+        reproducible; without one a fresh seed is picked. render_mode picks
+        between full-screen redraws and dirty-rectangle updates.
+        
+        The game always draws at its logical WIDTH x HEIGHT. Given a
+        window_size (or fullscreen=True) it draws into an offscreen
+        framebuffer that `scaler` scales to the (resizable) window.
+        
+        `campaign` is the .json or .toml file the levels' waves come from.
+        """
+        self.headless = headless
+        
+        # Random streams: `rng` drives gameplay, `fx_rng` only cosmetic effects
+        # (stars, particles) so visuals can never change the simulation
+        self.rng = random.Random()
+        self.fx_rng = random.Random()
+        self.seed_rng(seed)
+        
+        # Replay recording (see replay.py)
+        self.record_path = None
+        self.recorder = None
+        
+        # Background snapshots for crash recovery (see snapshot.py)
+        self.autosave_path = None
+        self.autosave_time = 0  # game_time of the last autosave
+        self.snapshots = SnapshotWriter()
+        
         # Set up display for VS Code
-        pygame.display.set_caption("Space Explorer")
-        self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        self.display = None
+        if headless:
+            self.screen = pygame.Surface((WIDTH, HEIGHT))
+        elif window_size or fullscreen:
+            # Draw at the logical resolution, scale to whatever the window is
+            pygame.display.set_caption("Space Explorer")
+            if fullscreen:
+                window = pygame.display.set_mode((0, 0), pygame.FULLSCREEN)
+            else:
+                window = pygame.display.set_mode(window_size, pygame.RESIZABLE)
+            self.display = ScaledDisplay(window, (WIDTH, HEIGHT), scaler)
+            self.screen = self.display.surface
+        else:
+            pygame.display.set_caption("Space Explorer")
+            self.screen = pygame.display.set_mode((WIDTH, HEIGHT))
         self.clock = pygame.time.Clock()
         
+        # Gameplay runs in fixed ticks of 1/FPS seconds whatever the frame rate;
+        # frames in between ticks are drawn interpolated (see timestep.py)
+        self.timestep = FixedTimestep(FPS)
+        self.lerp = Interpolator()
+        self.interpolate = not headless
+        self.alpha = 1.0
+        self.max_fps = FPS if headless else display_refresh_rate()
+        self.frame_seconds = 1.0 / FPS
+        self.frame_busy = 0.0
+        
+        # Dirty-rectangle tracking (a no-op in full render mode)
+        self.render_mode = render_mode
+        self.dirty = DirtyRectTracker((WIDTH, HEIGHT), enabled=render_mode == RENDER_DIRTY)
+        self.static_key = None
+        
+        # Frame-time profiler (off until the overlay is shown or a log is opened)
+        self.profiler = FrameProfiler(PROFILE_PHASES, PROFILE_COUNTERS)
+        
+        # Level waves, compiled on demand (see waves.py)
+        self.campaign = load_campaign(campaign)
+        
         # Game state
         self.state = MENU
         self.level = 1
@@ -51,18 +278,33 @@ class SpaceExplorer:
         self.load_assets()
         
         # Sound effects (initialize pygame mixer)
-        pygame.mixer.init()
-        self.sounds = {
-            'shoot': self.create_sound_effect(220, 0.1),
-            'explosion': self.create_sound_effect(100, 0.3),
-            'powerup': self.create_sound_effect(440, 0.2),
-            'hit': self.create_sound_effect(150, 0.2)
-        }
+        if headless:
+            silent = SilentSound()
+            self.sounds = {'shoot': silent, 'explosion': silent, 'powerup': silent, 'hit': silent}
+        else:
+            pygame.mixer.init()
+            self.sound_bank = SoundBank()
+            self.sounds = {
+                'shoot': self.create_sound_effect(220, 0.1),
+                'explosion': self.create_sound_effect(100, 0.3),
+                'powerup': self.create_sound_effect(440, 0.2),
+                'hit': self.create_sound_effect(150, 0.2)
+            }
+        # Sounds requested during a frame are played together, off the update path
+        self.audio = AudioDispatcher(self.sounds, mixer=not headless)
+        
+        # Entities live in archetypes of a World, updated and drawn by systems (see ecs.py)
+        self.world = None
+        self.use_world(create_world())
+        
+        # What the draw systems show: the game itself, or a copy of it taken
+        # after a tick when the simulation runs on its own thread (see pipeline.py)
+        self.view = self
+        self.pipeline = None
         
         # Player attributes
         self.player_pos = [WIDTH // 2, HEIGHT - 100]
         self.player_speed = 5
-        self.player_bullets = []
         self.bullet_speed = 10
         self.bullet_damage = 10
         self.shoot_cooldown = 0
@@ -70,24 +312,21 @@ class SpaceExplorer:
         self.shield_time = 0
         self.shield_cooldown = 0
         
-        # Enemy attributes
-        self.enemies = []
-        self.enemy_bullets = []
+        # Boss (a single entity, kept out of the world)
         self.boss = None
         self.boss_health = 0
         self.boss_max_health = 0
         
-        # Power-ups
-        self.power_ups = []
+        # Power-up effects
         self.double_shot = False
         self.double_shot_time = 0
         
-        # Stars background
-        self.stars = []
+        # Stars background (pre-rendered parallax layers, see starfield.py)
+        self.starfield = Starfield(WIDTH, HEIGHT, self.fx_rng)
         self.create_stars(100)
         
-        # Particles
-        self.particles = []
+        # Particles (NumPy-backed pool, see particles.py)
+        self.particles = ParticlePool()
         
         # Shop items
         self.shop_items = [
@@ -134,26 +373,47 @@ class SpaceExplorer:
         ]
         
         # Sound effects and music
-        self.sound_on = True
+        self.sound_on = not headless
         
         # Background music
         self.background_music_playing = False
 
+    def use_world(self, world):
+        """Make `world` (from create_world) hold the game's entities and register the systems on it."""
+        if self.world is not None:
+            world['player_bullets'].shared['vy'] = self.player_bullets.shared['vy']
+        for schedule, systems in SYSTEMS.items():
+            for name, method in systems:
+                world.system(schedule, name, getattr(self, method))
+        self.world = world
+        self.player_bullets = world['player_bullets']
+        self.enemies = world['enemies']
+        self.enemy_bullets = world['enemy_bullets']
+        self.power_ups = world['power_ups']
+        self.wingmen = world['wingmen']
+    
+    @property
+    def bullet_speed(self):
+        """Pixels a player bullet climbs per tick (the player bullets' shared velocity)."""
+        return -self.player_bullets.shared['vy']
+    
+    @bullet_speed.setter
+    def bullet_speed(self, speed):
+        self.player_bullets.shared['vy'] = -speed
+    
+    def seed_rng(self, seed=None):
+        """Reseed the gameplay and effect random streams."""
+        if seed is None:
+            seed = random.getrandbits(63)
+        self.seed = seed
+        self.rng.seed(seed)
+        self.fx_rng.seed(f"fx:{seed}")
+    
     def create_sound_effect(self, frequency, duration):
         """Create a simple sound effect using sine waves."""
-        sample_rate = 44100
-        num_samples = int(duration * sample_rate)
-        
-        # Generate a sine wave
-        buf = bytearray()
-        for i in range(num_samples):
-            t = i / sample_rate  # Time in seconds
-            # Simple sine wave with decay
-            value = int(127 + 127 * math.sin(2 * math.pi * frequency * t) * (1 - t/duration))
-            buf.append(value)
-        
-        # Create a Sound object from the buffer
-        sound = pygame.mixer.Sound(buffer=bytes(buf))
+        # Sine wave with linear decay, synthesized (or loaded from the disk
+        # cache) in the mixer's own sample format
+        sound = self.sound_bank.sound(frequency, duration, waveform='sine', envelope='linear')
         sound.set_volume(0.3)  # Set volume to 30%
         
         return sound
@@ -165,25 +425,47 @@ class SpaceExplorer:
         self.main_font = pygame.font.SysFont('Arial', 24)
         self.small_font = pygame.font.SysFont('Arial', 18)
         
+        # Rendered text caches
+        self.text = TextCache()
+        self.hud = Hud()
+        self.hud.add_field('lives', self.main_font, "Lives: {}", WHITE, (10, 10))
+        self.hud.add_field('score', self.main_font, "Score: {}", WHITE, (10, 40))
+        self.hud.add_field('level', self.main_font, "Level: {}", WHITE, (10, 70))
+        self.hud.add_field('coins', self.main_font, "Coins: {}", YELLOW, (WIDTH - 120, 10))
+        self.hud.add_field('double_shot', self.small_font, "Double Shot: {}s", PURPLE, (WIDTH - 160, 90))
+        self.hud.add_field('shield', self.small_font, "Shield: {}s", CYAN, (WIDTH - 160, 115))
+        
+        # Profiler overlay (toggled with F3)
+        self.profiler_overlay = ProfilerOverlay(self.profiler, pygame.font.SysFont('monospace', 14))
+        
         # Create placeholder images for player, enemies, bullets, etc.
         # In a real game, you'd load actual image files
-        self.player_img = self.create_player_img()
-        self.enemy_imgs = [
-            self.create_enemy_img(RED),
-            self.create_enemy_img(PURPLE),
-            self.create_enemy_img(CYAN)
-        ]
-        self.boss_img = self.create_boss_img()
-        self.bullet_img = self.create_bullet_img()
-        self.shield_img = self.create_shield_img()
+        assets = AssetManager()
+        assets.sprite('player', self.create_player_img)
+        for name, color in zip(ENEMY_SPRITES, (RED, PURPLE, CYAN)):
+            # One white ship, tinted per enemy type
+            assets.sprite(name, self.create_enemy_img, WHITE, tint=color)
+        assets.sprite('boss', self.create_boss_img)
+        assets.sprite('bullet', self.create_bullet_img)
+        assets.sprite('enemy_bullet', self.create_enemy_bullet_img)
+        assets.sprite('shield', self.create_shield_img, alpha=128)
         
         # Power-up images
+        for name, color in zip(POWER_UP_SPRITES, (GREEN, BLUE, YELLOW, PURPLE, CYAN)):
+            assets.sprite(name, self.create_powerup_img, color)
+        
+        # Bake everything into the atlas (or load it from the disk cache);
+        # the images below are views into its sheets
+        images = assets.build()
+        self.assets = assets
+        self.atlas = assets.atlas
+        self.player_img = images['player']
+        self.enemy_imgs = [images[name] for name in ENEMY_SPRITES]
+        self.boss_img = images['boss']
+        self.bullet_img = images['bullet']
+        self.shield_img = images['shield']
         self.powerup_imgs = {
-            'health': self.create_powerup_img(GREEN),
-            'energy': self.create_powerup_img(BLUE),
-            'coin': self.create_powerup_img(YELLOW),
-            'double_shot': self.create_powerup_img(PURPLE),
-            'shield': self.create_powerup_img(CYAN)
+            power_up_type: images[name] for power_up_type, name in zip(POWER_UP_TYPES, POWER_UP_SPRITES)
         }
 
     def create_player_img(self):
@@ -214,10 +496,16 @@ class SpaceExplorer:
         pygame.draw.rect(surf, YELLOW, (0, 0, 6, 12))
         return surf
     
+    def create_enemy_bullet_img(self):
+        """Create an enemy bullet."""
+        surf = pygame.Surface((4, 8), pygame.SRCALPHA)
+        surf.fill(RED)
+        return surf
+    
     def create_shield_img(self):
         """Create a circular shield effect."""
         surf = pygame.Surface((50, 50), pygame.SRCALPHA)
-        pygame.draw.circle(surf, (0, 100, 255, 128), (25, 25), 25)
+        pygame.draw.circle(surf, (0, 100, 255), (25, 25), 25)  # Made translucent when baked
         return surf
     
     def create_powerup_img(self, color):
@@ -229,257 +517,350 @@ class SpaceExplorer:
     
     def create_stars(self, count):
         """Create stars for the background."""
-        for _ in range(count):
-            self.stars.append([
-                random.randint(0, WIDTH),    # x position
-                random.randint(0, HEIGHT),   # y position
-                random.random() * 2 + 1,     # size
-                random.random() * 0.5 + 0.5  # brightness
-            ])
+        self.starfield.add_stars(count)
     
     def move_stars(self):
         """Move the stars to create a scrolling effect."""
-        for star in self.stars:
-            star[1] += 0.5 * star[2]  # Move faster based on size
-            if star[1] > HEIGHT:
-                star[1] = 0
-                star[0] = random.randint(0, WIDTH)
+        self.starfield.update()
     
     def draw_stars(self):
         """Draw the stars on the screen."""
-        for star in self.stars:
-            brightness = int(255 * star[3])
-            color = (brightness, brightness, brightness)
-            pygame.draw.circle(self.screen, color, (int(star[0]), int(star[1])), int(star[2]))
+        self.starfield.draw(self.screen, self.dirty.add if self.dirty.enabled else None)
     
     def spawn_enemies(self):
-        """Spawn enemies based on the current level."""
+        """Spawn the current level's wave from the campaign (see waves.py)."""
         # Clear any remaining enemies
-        self.enemies = []
+        self.enemies.clear()
         
-        # Number of enemies scales with level
-        num_enemies = 5 + self.level * 2
-        
-        # Every 5 levels, spawn a boss instead
-        if self.level % 5 == 0:
+        wave = self.campaign.wave(self.level)
+        if wave.boss:
+            pos, types, health = wave.boss
             self.boss = {
-                'pos': [WIDTH // 2, 100],
+                'pos': list(pos),
                 'direction': 1,
-                'type': random.randint(0, 2),
+                'type': self.rng.randint(0, types - 1),
                 'attack_timer': 0
             }
-            self.boss_health = 100 + (self.level // 5) * 50
+            self.boss_health = health
             self.boss_max_health = self.boss_health
-        else:
-            # Spawn regular enemies in formation
-            for i in range(num_enemies):
-                enemy_type = random.randint(0, 2)
-                row = i // 5
-                col = i % 5
-                
-                self.enemies.append({
-                    'pos': [100 + col * 150, 50 + row * 80],
-                    'direction': 1,
-                    'type': enemy_type,
-                    'attack_timer': random.randint(0, 100)
-                })
+        
+        # Regular enemies in formation
+        if len(wave):
+            self.enemies.spawn_wave(wave, self.rng)
     
     def spawn_power_up(self, pos):
         """Spawn a power-up at the given position."""
-        power_up_type = random.choices(
-            ['health', 'energy', 'coin', 'double_shot', 'shield'],
+        power_up_type = self.rng.choices(
+            range(len(POWER_UP_TYPES)),
             weights=[0.2, 0.3, 0.3, 0.1, 0.1],
             k=1
         )[0]
         
-        self.power_ups.append({
-            'pos': [pos[0], pos[1]],
-            'type': power_up_type,
-            'speed': 2
-        })
+        self.power_ups.spawn(x=pos[0], y=pos[1], type=power_up_type, speed=2)
     
     def add_particles(self, pos, color, count=10):
         """Add explosion particles at the given position."""
+        vel_x = []
+        vel_y = []
+        lifetimes = []
+        sizes = []
         for _ in range(count):
-            angle = random.uniform(0, math.pi * 2)
-            speed = random.uniform(1, 3)
-            lifetime = random.uniform(30, 60)
-            size = random.uniform(1, 3)
+            angle = self.fx_rng.uniform(0, math.pi * 2)
+            speed = self.fx_rng.uniform(1, 3)
+            lifetime = self.fx_rng.uniform(30, 60)
+            size = self.fx_rng.uniform(1, 3)
             
-            self.particles.append({
-                'pos': [pos[0], pos[1]],
-                'vel': [math.cos(angle) * speed, math.sin(angle) * speed],
-                'color': color,
-                'lifetime': lifetime,
-                'max_lifetime': lifetime,
-                'size': size
-            })
+            vel_x.append(math.cos(angle) * speed)
+            vel_y.append(math.sin(angle) * speed)
+            lifetimes.append(lifetime)
+            sizes.append(size)
+        
+        self.particles.emit(pos, color, vel_x, vel_y, lifetimes, sizes)
     
     def update_particles(self):
         """Update and remove expired particles."""
-        for particle in self.particles[:]:
-            particle['pos'][0] += particle['vel'][0]
-            particle['pos'][1] += particle['vel'][1]
-            particle['lifetime'] -= 1
-            
-            if particle['lifetime'] <= 0:
-                self.particles.remove(particle)
+        self.particles.update()
     
     def draw_particles(self):
         """Draw all active particles."""
-        for particle in self.particles:
-            alpha = int(255 * (particle['lifetime'] / particle['max_lifetime']))
-            color = list(particle['color'])
-            if len(color) == 3:
-                color.append(alpha)
-            else:
-                color[3] = alpha
-            
-            pygame.draw.circle(
-                self.screen, 
-                color, 
-                (int(particle['pos'][0]), int(particle['pos'][1])), 
-                int(particle['size'])
-            )
+        self.view.particles.draw(self.screen, self.dirty.add if self.dirty.enabled else None)
     
     def shoot(self):
         """Fire a bullet from the player's position."""
         if self.energy >= 5 and self.shoot_cooldown <= 0:
             # Single or double shot based on power-up
             if self.double_shot:
-                self.player_bullets.append([self.player_pos[0] - 10, self.player_pos[1]])
-                self.player_bullets.append([self.player_pos[0] + 10, self.player_pos[1]])
+                self.player_bullets.spawn(x=self.player_pos[0] - 10, y=self.player_pos[1])
+                self.player_bullets.spawn(x=self.player_pos[0] + 10, y=self.player_pos[1])
             else:
-                self.player_bullets.append([self.player_pos[0], self.player_pos[1]])
+                self.player_bullets.spawn(x=self.player_pos[0], y=self.player_pos[1])
             
             self.energy -= 5
             self.shoot_cooldown = 10
             
             # Play sound effect
             if self.sound_on:
-                self.sounds['shoot'].play()
+                self.audio.play('shoot')
     
     def check_collisions(self):
         """Check for all collisions between game objects."""
-        # Player bullets vs enemies
-        for bullet in self.player_bullets[:]:
-            # Check if bullet hit any enemy
-            for enemy in self.enemies[:]:
-                if (abs(bullet[0] - enemy['pos'][0]) < 20 and 
-                    abs(bullet[1] - enemy['pos'][1]) < 20):
-                    # Enemy hit
-                    self.player_bullets.remove(bullet)
-                    self.enemies.remove(enemy)
-                    self.score += 10
-                    self.coins += random.randint(1, 3)
-                    
-                    # Achievement: first kill
-                    if not self.achievements["first_kill"]["unlocked"]:
-                        self.achievements["first_kill"]["unlocked"] = True
-                    
-                    # Chance to spawn power-up
-                    if random.random() < 0.2:
-                        self.spawn_power_up(enemy['pos'])
-                        
-                    # Add explosion particles
-                    self.add_particles(enemy['pos'], RED)
-                    
-                    # Play explosion sound
-                    if self.sound_on:
-                        self.sounds['explosion'].play()
+        bullets = self.player_bullets
+        enemies = self.enemies
+        
+        # Snapshot live entities (in spawn order) as plain lists for fast access
+        bullet_slots = bullets.active()
+        bullet_x = bullets.x[bullet_slots]
+        bullet_y = bullets.y[bullet_slots]
+        enemy_slots = enemies.active()
+        enemy_x = enemies.x[enemy_slots].tolist()
+        enemy_y = enemies.y[enemy_slots].tolist()
+        
+        # Swept tests: each bullet is checked along the whole path it moved this
+        # tick, so fast bullets cannot skip over an enemy between two frames.
+        # Every bullet is tested at once; candidates come back per bullet,
+        # nearest enemy along the path first (bullets fired after the move
+        # have not travelled yet)
+        travelled = bullets.seq[bullet_slots] < bullets.moved_seq
+        bullet_from = bullet_y - bullets.shared['vy'] * travelled
+        hit_bullets, hit_enemies, _ = swept_pairs(bullet_x, bullet_from, bullet_y,
+                                                  enemies.x[enemy_slots], enemies.y[enemy_slots], 20, 20)
+        candidates = {}
+        for bullet_index, enemy_index in zip(hit_bullets.tolist(), hit_enemies.tolist()):
+            if bullet_index in candidates:
+                candidates[bullet_index].append(enemy_index)
+            else:
+                candidates[bullet_index] = [enemy_index]
+        
+        # Bullets whose path crosses the boss
+        boss_candidates = ()
+        if self.boss:
+            boss_candidates = set(swept_pairs(bullet_x, bullet_from, bullet_y, [self.boss['pos'][0]],
+                                              [self.boss['pos'][1]], 40, 40)[0].tolist())
+        
+        # Player bullets vs enemies, in spawn order
+        bullet_x = bullet_x.tolist()
+        bullet_y = bullet_y.tolist()
+        dead_enemies = set()
+        for bullet_index in sorted(candidates.keys() | boss_candidates):
+            bullet = (bullet_x[bullet_index], bullet_y[bullet_index])
+            
+            # First enemy on this bullet's path that is still alive
+            hit_index = None
+            for enemy_index in candidates.get(bullet_index, ()):
+                if enemy_index not in dead_enemies:
+                    hit_index = enemy_index
                     break
             
-            # Check if bullet hit boss
-            if self.boss and bullet in self.player_bullets:  # Check if bullet wasn't already removed
-                if (abs(bullet[0] - self.boss['pos'][0]) < 40 and 
-                    abs(bullet[1] - self.boss['pos'][1]) < 40):
-                    # Boss hit
-                    if bullet in self.player_bullets:  # Check again to be safe
-                        self.player_bullets.remove(bullet)
-                    self.boss_health -= self.bullet_damage
-                    self.score += 5
-                    self.add_particles(bullet, YELLOW, 5)
-                    
-                    # Check if boss is defeated
-                    if self.boss_health <= 0:
-                        self.add_particles(self.boss['pos'], RED, 30)
-                        self.boss = None
-                        self.score += 100 * (self.level // 5)
-                        self.coins += random.randint(20, 50)
-                        
-                        # Achievement: boss slayer
-                        self.achievements["boss_slayer"]["unlocked"] = True
-                        
-                        # Spawn multiple power-ups
-                        for _ in range(3):
-                            offset_x = random.randint(-30, 30)
-                            offset_y = random.randint(-30, 30)
-                            pos = [self.player_pos[0] + offset_x, 100 + offset_y]
-                            self.spawn_power_up(pos)
-        
-        # Enemy bullets vs player
-        for bullet in self.enemy_bullets[:]:
-            if (abs(bullet[0] - self.player_pos[0]) < 15 and 
-                abs(bullet[1] - self.player_pos[1]) < 15):
-                # Player hit
-                self.enemy_bullets.remove(bullet)
-                
-                if not self.shield_active:
-                    self.lives -= 1
-                    self.add_particles(self.player_pos, BLUE, 15)
-                    # Play hit sound
-                    if self.sound_on:
-                        self.sounds['hit'].play()
-                    if self.lives <= 0:
-                        self.state = GAME_OVER
-                else:
-                    # Shield absorbed the hit
-                    self.add_particles(bullet, CYAN, 5)
-        
-        # Power-ups vs player
-        for power_up in self.power_ups[:]:
-            if (abs(power_up['pos'][0] - self.player_pos[0]) < 20 and 
-                abs(power_up['pos'][1] - self.player_pos[1]) < 20):
-                # Collect power-up
-                self.power_ups.remove(power_up)
+            if hit_index is not None:
+                # Enemy hit
+                enemy_pos = (enemy_x[hit_index], enemy_y[hit_index])
+                bullets.kill(bullet_slots[bullet_index])
+                enemies.kill(enemy_slots[hit_index])
+                dead_enemies.add(hit_index)
+                self.score += 10
+                self.coins += self.rng.randint(1, 3)
                 
-                # Apply power-up effect
-                if power_up['type'] == 'health':
-                    self.lives = min(self.lives + 1, 5)
-                elif power_up['type'] == 'energy':
-                    self.energy = self.max_energy
-                elif power_up['type'] == 'coin':
-                    self.coins += random.randint(5, 15)
-                elif power_up['type'] == 'double_shot':
-                    self.double_shot = True
-                    self.double_shot_time = 900  # 15 seconds at 60 FPS
-                elif power_up['type'] == 'shield':
-                    self.shield_active = True
-                    self.shield_time = 600  # 10 seconds at 60 FPS
+                # Achievement: first kill
+                if not self.achievements["first_kill"]["unlocked"]:
+                    self.achievements["first_kill"]["unlocked"] = True
                 
-                # Achievement: collector
-                self.achievements["collector"]["count"] += 1
-                if self.achievements["collector"]["count"] >= 10:
-                    self.achievements["collector"]["unlocked"] = True
+                # Chance to spawn power-up
+                if self.rng.random() < 0.2:
+                    self.spawn_power_up(enemy_pos)
+                    
+                # Add explosion particles
+                self.add_particles(enemy_pos, RED)
                 
-                # Add particles
-                color = GREEN if power_up['type'] == 'health' else BLUE
-                self.add_particles(power_up['pos'], color, 10)
+                # Play explosion sound
+                if self.sound_on:
+                    self.audio.play('explosion')
+                continue
+            
+            # Check if bullet hit boss
+            if self.boss and bullet_index in boss_candidates:
+                # Boss hit
+                bullets.kill(bullet_slots[bullet_index])
+                self.boss_health -= self.bullet_damage
+                self.score += 5
+                self.add_particles(bullet, YELLOW, 5)
                 
-                # Play power-up sound
+                # Check if boss is defeated
+                if self.boss_health <= 0:
+                    self.add_particles(self.boss['pos'], RED, 30)
+                    self.boss = None
+                    self.score += 100 * (self.level // 5)
+                    self.coins += self.rng.randint(20, 50)
+                    
+                    # Achievement: boss slayer
+                    self.achievements["boss_slayer"]["unlocked"] = True
+                    
+                    # Spawn multiple power-ups
+                    for _ in range(3):
+                        offset_x = self.rng.randint(-30, 30)
+                        offset_y = self.rng.randint(-30, 30)
+                        pos = [self.player_pos[0] + offset_x, 100 + offset_y]
+                        self.spawn_power_up(pos)
+        
+        # Enemy bullets vs player, swept along each bullet's fall this tick
+        # (bullets fired after the move have not travelled yet)
+        enemy_bullets = self.enemy_bullets
+        bullet_slots = enemy_bullets.active()
+        bullet_x = enemy_bullets.x[bullet_slots]
+        bullet_y = enemy_bullets.y[bullet_slots]
+        travelled = enemy_bullets.seq[bullet_slots] < enemy_bullets.moved_seq
+        hits = swept_pairs(bullet_x, bullet_y - enemy_bullets.shared['vy'] * travelled, bullet_y,
+                           [self.player_pos[0]], [self.player_pos[1]], 15, 15)[0]
+        for bullet_index in hits.tolist():
+            bullet = (float(bullet_x[bullet_index]), float(bullet_y[bullet_index]))
+            # Player hit
+            enemy_bullets.kill(bullet_slots[bullet_index])
+            
+            if not self.shield_active:
+                self.lives -= 1
+                self.add_particles(self.player_pos, BLUE, 15)
+                # Play hit sound
+                if self.sound_on:
+                    self.audio.play('hit')
+                if self.lives <= 0:
+                    self.state = GAME_OVER
+            else:
+                # Shield absorbed the hit
+                self.add_particles(bullet, CYAN, 5)
+        
+        # Power-ups vs player: every power-up overlapping the ship, in spawn order
+        power_ups = self.power_ups
+        power_up_slots = power_ups.active()
+        power_up_x = power_ups.x[power_up_slots]
+        power_up_y = power_ups.y[power_up_slots]
+        hits = swept_pairs(power_up_x, power_up_y, power_up_y,
+                           [self.player_pos[0]], [self.player_pos[1]], 20, 20)[0]
+        for power_up_index in hits.tolist():
+            pos = (float(power_up_x[power_up_index]), float(power_up_y[power_up_index]))
+            # Collect power-up
+            slot = power_up_slots[power_up_index]
+            power_up_type = POWER_UP_TYPES[power_ups.type[slot]]
+            power_ups.kill(slot)
+            
+            # Apply power-up effect
+            if power_up_type == 'health':
+                self.lives = min(self.lives + 1, 5)
+            elif power_up_type == 'energy':
+                self.energy = self.max_energy
+            elif power_up_type == 'coin':
+                self.coins += self.rng.randint(5, 15)
+            elif power_up_type == 'double_shot':
+                self.double_shot = True
+                self.double_shot_time = 900  # 15 seconds at 60 FPS
+            elif power_up_type == 'shield':
+                self.shield_active = True
+                self.shield_time = 600  # 10 seconds at 60 FPS
+            self.power_up_collected(power_up_type, pos)
+        
+        if len(self.wingmen):
+            self.check_wingman_collisions()
+    
+    def power_up_collected(self, power_up_type, pos):
+        """Count a collected power-up towards achievements and show and play the pickup."""
+        # Achievement: collector
+        self.achievements["collector"]["count"] += 1
+        if self.achievements["collector"]["count"] >= 10:
+            self.achievements["collector"]["unlocked"] = True
+        
+        # Add particles
+        color = GREEN if power_up_type == 'health' else BLUE
+        self.add_particles(pos, color, 10)
+        
+        # Play power-up sound
+        if self.sound_on:
+            self.audio.play('powerup')
+    
+    def check_wingman_collisions(self):
+        """Check the co-op ships against the enemy bullets and power-ups the player left."""
+        wingmen = self.wingmen
+        wingman_slots = wingmen.active()
+        wingman_x = wingmen.x[wingman_slots]
+        wingman_y = wingmen.y[wingman_slots]
+        
+        # Enemy bullets vs wingmen, swept like the player's; a bullet hits the first ship on its path
+        enemy_bullets = self.enemy_bullets
+        bullet_slots = enemy_bullets.active()
+        bullet_x = enemy_bullets.x[bullet_slots]
+        bullet_y = enemy_bullets.y[bullet_slots]
+        travelled = enemy_bullets.seq[bullet_slots] < enemy_bullets.moved_seq
+        hit_bullets, hit_ships, _ = swept_pairs(bullet_x, bullet_y - enemy_bullets.shared['vy'] * travelled,
+                                                bullet_y, wingman_x, wingman_y, 15, 15)
+        done = set()
+        for bullet_index, ship_index in zip(hit_bullets.tolist(), hit_ships.tolist()):
+            if bullet_index in done:
+                continue
+            done.add(bullet_index)
+            enemy_bullets.kill(bullet_slots[bullet_index])
+            
+            slot = wingman_slots[ship_index]
+            if wingmen.shield_time[slot] <= 0:
+                self.lives -= 1
+                self.add_particles((float(wingmen.x[slot]), float(wingmen.y[slot])), BLUE, 15)
                 if self.sound_on:
-                    self.sounds['powerup'].play()
+                    self.audio.play('hit')
+                if self.lives <= 0:
+                    self.state = GAME_OVER
+            else:
+                self.add_particles((float(bullet_x[bullet_index]), float(bullet_y[bullet_index])), CYAN, 5)
+        
+        # Power-ups vs wingmen: a power-up goes to the first ship (in slot order) it overlaps
+        power_ups = self.power_ups
+        power_up_slots = power_ups.active()
+        power_up_x = power_ups.x[power_up_slots]
+        power_up_y = power_ups.y[power_up_slots]
+        hit_power_ups, hit_ships, _ = swept_pairs(power_up_x, power_up_y, power_up_y,
+                                                  wingman_x, wingman_y, 20, 20)
+        done = set()
+        for power_up_index, ship_index in zip(hit_power_ups.tolist(), hit_ships.tolist()):
+            if power_up_index in done:
+                continue
+            done.add(power_up_index)
+            slot = power_up_slots[power_up_index]
+            power_up_type = POWER_UP_TYPES[power_ups.type[slot]]
+            power_ups.kill(slot)
+            
+            # Team-wide effects work as for the player, the rest apply to this ship
+            ship = wingman_slots[ship_index]
+            if power_up_type == 'health':
+                self.lives = min(self.lives + 1, 5)
+            elif power_up_type == 'energy':
+                wingmen.energy[ship] = self.max_energy
+            elif power_up_type == 'coin':
+                self.coins += self.rng.randint(5, 15)
+            elif power_up_type == 'double_shot':
+                wingmen.double_shot_time[ship] = 900
+            elif power_up_type == 'shield':
+                wingmen.shield_time[ship] = 600
+            self.power_up_collected(power_up_type, (float(power_up_x[power_up_index]),
+                                                    float(power_up_y[power_up_index])))
     
     def update_game(self):
-        """Update all game objects and states."""
+        """Advance all game objects and states by one tick (the 'update' systems)."""
+        self.world.run('update', self.profiler.lap)
+    
+    def simulate(self, ticks, bits, skip=()):
+        """Run up to `ticks` ticks holding INPUT_* `bits`, stopping when play ends; return how many ran.
+        
+        Systems named in `skip` are left out, and nothing is profiled.
+        """
+        for tick in range(ticks):
+            if self.state != PLAYING:
+                return tick
+            self.apply_input(bits)
+            self.world.run('update', skip=skip)
+        return ticks
+    
+    def update_timers(self):
+        """Count down cooldowns and power-up timers, regenerate energy and time achievements."""
         # Timer for achievements
         self.game_time += 1
         if self.game_time >= 7200 and not self.achievements["survivor"]["unlocked"]:  # 2 minutes at 60 FPS
             self.achievements["survivor"]["unlocked"] = True
         
-        # Move stars
-        self.move_stars()
-        
         # Update cooldowns
         if self.shoot_cooldown > 0:
             self.shoot_cooldown -= 1
@@ -502,164 +883,180 @@ class SpaceExplorer:
         
         if self.shield_cooldown > 0:
             self.shield_cooldown -= 1
-        
-        # Move player bullets
-        for bullet in self.player_bullets[:]:
-            bullet[1] -= self.bullet_speed
-            if bullet[1] < 0:
-                self.player_bullets.remove(bullet)
-        
-        # Move enemy bullets
-        for bullet in self.enemy_bullets[:]:
-            bullet[1] += 5
-            if bullet[1] > HEIGHT:
-                self.enemy_bullets.remove(bullet)
-        
-        # Move and update enemies
-        for enemy in self.enemies[:]:
-            # Move horizontally
-            enemy['pos'][0] += enemy['direction'] * (2 + 0.1 * self.level)
-            
-            # Change direction if reaching screen edge
-            if enemy['pos'][0] < 30 or enemy['pos'][0] > WIDTH - 30:
-                enemy['direction'] *= -1
-                enemy['pos'][1] += 20  # Move down a bit
-            
-            # Random attack
-            enemy['attack_timer'] -= 1
-            if enemy['attack_timer'] <= 0:
-                # Fire at player
-                self.enemy_bullets.append([enemy['pos'][0], enemy['pos'][1] + 15])
-                enemy['attack_timer'] = random.randint(60, 120)
-        
-        # Update boss if present
-        if self.boss:
-            # Move horizontally
-            self.boss['pos'][0] += self.boss['direction'] * 2
-            
-            # Change direction if reaching screen edge
-            if self.boss['pos'][0] < 40 or self.boss['pos'][0] > WIDTH - 40:
-                self.boss['direction'] *= -1
+    
+    def move_entities(self):
+        """Move every entity with a vertical velocity and remove the ones that left their bounds."""
+        for archetype in self.world.query('y', shared=('cull',)):
+            slots = archetype.active()
+            if 'speed' in archetype.components:
+                archetype.y[slots] += archetype.speed[slots]
+            else:
+                archetype.y[slots] += archetype.shared['vy']
+            # Entities spawned later this tick start where they spawn
+            archetype.moved_seq = archetype.next_seq
+            top, bottom = archetype.shared['cull']
+            y = archetype.y[slots]
+            archetype.kill_many(slots[(y < top) | (y > bottom)])
+    
+    def update_wingmen(self):
+        """Count down the co-op ships' cooldowns and power-up timers and regenerate their energy."""
+        wingmen = self.wingmen
+        if not len(wingmen):
+            return
+        slots = wingmen.active()
+        for timer in (wingmen.shoot_cooldown, wingmen.double_shot_time, wingmen.shield_time):
+            values = timer[slots]
+            timer[slots[values > 0]] -= 1
+        energy = wingmen.energy[slots]
+        wingmen.energy[slots[energy < self.max_energy]] += 0.1
+    
+    def update_enemies(self):
+        """Move the enemy wave, bouncing off the screen edges, and fire at the player."""
+        fire_x, fire_y = self.enemies.update(2 + 0.1 * self.level, 30, WIDTH - 30, self.rng)
+        if len(fire_x):
+            self.enemy_bullets.spawn_many(len(fire_x), x=fire_x, y=fire_y + 15)
+    
+    def update_boss(self):
+        """Move the boss, if present, and run its attack pattern."""
+        if not self.boss:
+            return
+        
+        # Move horizontally
+        self.boss['pos'][0] += self.boss['direction'] * 2
+        
+        # Change direction if reaching screen edge
+        if self.boss['pos'][0] < 40 or self.boss['pos'][0] > WIDTH - 40:
+            self.boss['direction'] *= -1
+        
+        # Boss attack pattern
+        self.boss['attack_timer'] -= 1
+        if self.boss['attack_timer'] <= 0:
+            # Different attack patterns based on boss type
+            if self.boss['type'] == 0:
+                # Spread shot
+                for angle in range(-2, 3):
+                    self.enemy_bullets.spawn(
+                        x=self.boss['pos'][0] + angle * 10, 
+                        y=self.boss['pos'][1] + 20
+                    )
+            elif self.boss['type'] == 1:
+                # Aimed shot
+                dx = self.player_pos[0] - self.boss['pos'][0]
+                self.enemy_bullets.spawn(
+                    x=self.boss['pos'][0], 
+                    y=self.boss['pos'][1] + 20
+                )
+            else:
+                # Double shot
+                self.enemy_bullets.spawn(x=self.boss['pos'][0] - 20, y=self.boss['pos'][1] + 10)
+                self.enemy_bullets.spawn(x=self.boss['pos'][0] + 20, y=self.boss['pos'][1] + 10)
             
-            # Boss attack pattern
-            self.boss['attack_timer'] -= 1
-            if self.boss['attack_timer'] <= 0:
-                # Different attack patterns based on boss type
-                if self.boss['type'] == 0:
-                    # Spread shot
-                    for angle in range(-2, 3):
-                        self.enemy_bullets.append([
-                            self.boss['pos'][0] + angle * 10, 
-                            self.boss['pos'][1] + 20
-                        ])
-                elif self.boss['type'] == 1:
-                    # Aimed shot
-                    dx = self.player_pos[0] - self.boss['pos'][0]
-                    self.enemy_bullets.append([
-                        self.boss['pos'][0], 
-                        self.boss['pos'][1] + 20
-                    ])
-                else:
-                    # Double shot
-                    self.enemy_bullets.append([self.boss['pos'][0] - 20, self.boss['pos'][1] + 10])
-                    self.enemy_bullets.append([self.boss['pos'][0] + 20, self.boss['pos'][1] + 10])
-                
-                self.boss['attack_timer'] = random.randint(30, 60)
-        
-        # Move power-ups
-        for power_up in self.power_ups[:]:
-            power_up['pos'][1] += power_up['speed']
-            if power_up['pos'][1] > HEIGHT:
-                self.power_ups.remove(power_up)
-        
-        # Update particles
-        self.update_particles()
-        
-        # Check for collisions
-        self.check_collisions()
-        
-        # Check if level is complete
+            self.boss['attack_timer'] = self.rng.randint(30, 60)
+    
+    def check_level_complete(self):
+        """Move on to the shop once every enemy and the boss are gone."""
         if not self.enemies and not self.boss:
             self.level += 1
             self.state = SHOP
     
     def draw_game(self):
-        """Draw all game elements to the screen."""
-        # Clear screen
-        self.screen.fill(BLACK)
-        
-        # Draw stars
+        """Draw all game elements to the screen (the 'draw' systems)."""
+        self.world.run('draw')
+    
+    def draw_background(self):
+        """Clear the screen (only where sprites were last frame in dirty-rect mode) and draw the stars."""
+        self.dirty.clear(self.screen, BLACK)
         self.draw_stars()
-        
-        # Draw particles
-        self.draw_particles()
-        
-        # Draw player ship
-        self.screen.blit(self.player_img, (self.player_pos[0] - 15, self.player_pos[1] - 20))
+    
+    def draw_player(self):
+        """Draw the player ship and its shield."""
+        view = self.view
+        # Positions are blended between the last two ticks when drawing in between them
+        player_x, player_y = self.lerp.point('player', view.player_pos, self.alpha)
+        mark = self.dirty.add
+        mark(self.screen.blit(self.player_img, (player_x - 15, player_y - 20)))
         
         # Draw shield if active
-        if self.shield_active:
-            self.screen.blit(self.shield_img, (self.player_pos[0] - 25, self.player_pos[1] - 25))
-        
-        # Draw player bullets
-        for bullet in self.player_bullets:
-            self.screen.blit(self.bullet_img, (bullet[0] - 3, bullet[1] - 6))
-        
-        # Draw enemies
-        for enemy in self.enemies:
-            enemy_img = self.enemy_imgs[enemy['type']]
-            self.screen.blit(enemy_img, (enemy['pos'][0] - 15, enemy['pos'][1] - 15))
-        
-        # Draw boss if present
-        if self.boss:
-            self.screen.blit(self.boss_img, (self.boss['pos'][0] - 40, self.boss['pos'][1] - 40))
-            
-            # Draw boss health bar
-            health_width = 80 * (self.boss_health / self.boss_max_health)
-            pygame.draw.rect(self.screen, RED, (self.boss['pos'][0] - 40, self.boss['pos'][1] - 50, 80, 5))
-            pygame.draw.rect(self.screen, GREEN, (self.boss['pos'][0] - 40, self.boss['pos'][1] - 50, health_width, 5))
-        
-        # Draw enemy bullets
-        for bullet in self.enemy_bullets:
-            pygame.draw.rect(self.screen, RED, (bullet[0] - 2, bullet[1] - 4, 4, 8))
-        
-        # Draw power-ups
-        for power_up in self.power_ups:
-            img = self.powerup_imgs[power_up['type']]
-            self.screen.blit(img, (power_up['pos'][0] - 10, power_up['pos'][1] - 10))
-        
-        # Draw HUD
-        # Lives
-        life_text = self.main_font.render(f"Lives: {self.lives}", True, WHITE)
-        self.screen.blit(life_text, (10, 10))
-        
-        # Score
-        score_text = self.main_font.render(f"Score: {self.score}", True, WHITE)
-        self.screen.blit(score_text, (10, 40))
-        
-        # Level
-        level_text = self.main_font.render(f"Level: {self.level}", True, WHITE)
-        self.screen.blit(level_text, (10, 70))
-        
-        # Coins
-        coin_text = self.main_font.render(f"Coins: {self.coins}", True, YELLOW)
-        self.screen.blit(coin_text, (WIDTH - 120, 10))
+        if view.shield_active:
+            mark(self.screen.blit(self.shield_img, (player_x - 25, player_y - 25)))
+    
+    def draw_wingmen(self):
+        """Draw the co-op players' ships and shields."""
+        wingmen = self.view.world['wingmen']
+        if not len(wingmen):
+            return
+        mark = self.dirty.add
+        slots = wingmen.active()
+        shields = (wingmen.shield_time[slots] > 0).tolist()
+        for x, y, shield in zip(*self.lerp.pool_xy(wingmen, slots, self.alpha), shields):
+            mark(self.screen.blit(self.player_img, (x - 15, y - 20)))
+            if shield:
+                mark(self.screen.blit(self.shield_img, (x - 25, y - 25)))
+    
+    def draw_sprites(self, low, high):
+        """Draw the entities of every archetype in layers low <= layer < high, a batched blit each."""
+        view = self.view
+        screen = self.screen
+        atlas = self.atlas
+        lerp = self.lerp
+        alpha = self.alpha
+        batch_mark = self.dirty.add if self.dirty.enabled else None
+        for archetype in view.world.query('x', 'y', shared=('layer',)):
+            shared = archetype.shared
+            if not low <= shared['layer'] < high:
+                continue
+            slots = archetype.active()
+            sprites = shared.get('sprite')
+            if sprites is None:
+                sprites = [shared['sprites'][sprite_type] for sprite_type in archetype.type[slots].tolist()]
+            atlas.draw(screen, sprites, *lerp.pool_xy(archetype, slots, alpha), batch_mark)
+    
+    def draw_lower_sprites(self):
+        """Draw the entity layers that go below the boss."""
+        self.draw_sprites(-math.inf, BOSS_LAYER)
+    
+    def draw_upper_sprites(self):
+        """Draw the entity layers that go above the boss."""
+        self.draw_sprites(BOSS_LAYER, math.inf)
+    
+    def draw_boss(self):
+        """Draw the boss and its health bar, if present."""
+        view = self.view
+        if not view.boss:
+            return
+        screen = self.screen
+        mark = self.dirty.add
+        boss_x, boss_y = self.lerp.point('boss', view.boss['pos'], self.alpha)
+        mark(screen.blit(self.boss_img, (boss_x - 40, boss_y - 40)))
+        
+        # Draw boss health bar
+        health_width = 80 * (view.boss_health / view.boss_max_health)
+        mark(pygame.draw.rect(screen, RED, (boss_x - 40, boss_y - 50, 80, 5)))
+        pygame.draw.rect(screen, GREEN, (boss_x - 40, boss_y - 50, health_width, 5))
+    
+    def draw_hud(self):
+        """Draw the HUD (fields are only re-rendered when their value changes)."""
+        view = self.view
+        screen = self.screen
+        mark = self.dirty.add
+        mark(self.hud.draw(screen, 'lives', view.lives))
+        mark(self.hud.draw(screen, 'score', view.score))
+        mark(self.hud.draw(screen, 'level', view.level))
+        mark(self.hud.draw(screen, 'coins', view.coins))
         
         # Energy bar
-        pygame.draw.rect(self.screen, (50, 50, 50), (WIDTH - 160, 40, 150, 20))
-        energy_width = max(0, 150 * (self.energy / self.max_energy))
-        pygame.draw.rect(self.screen, BLUE, (WIDTH - 160, 40, energy_width, 20))
-        energy_text = self.small_font.render("Energy", True, WHITE)
-        self.screen.blit(energy_text, (WIDTH - 160, 65))
+        mark(pygame.draw.rect(screen, (50, 50, 50), (WIDTH - 160, 40, 150, 20)))
+        energy_width = max(0, 150 * (view.energy / view.max_energy))
+        pygame.draw.rect(screen, BLUE, (WIDTH - 160, 40, energy_width, 20))
+        energy_text = self.text.render(self.small_font, "Energy", WHITE)
+        mark(screen.blit(energy_text, (WIDTH - 160, 65)))
         
         # Power-up indicators
-        if self.double_shot:
-            double_text = self.small_font.render(f"Double Shot: {self.double_shot_time//60}s", True, PURPLE)
-            self.screen.blit(double_text, (WIDTH - 160, 90))
+        if view.double_shot:
+            mark(self.hud.draw(screen, 'double_shot', view.double_shot_time // 60))
         
-        if self.shield_active:
-            shield_text = self.small_font.render(f"Shield: {self.shield_time//60}s", True, CYAN)
-            self.screen.blit(shield_text, (WIDTH - 160, 115))
+        if view.shield_active:
+            mark(self.hud.draw(screen, 'shield', view.shield_time // 60))
         
     def draw_menu(self):
         """Draw the main menu screen."""
@@ -668,11 +1065,11 @@ class SpaceExplorer:
         self.draw_stars()
         
         # Title
-        title_text = self.title_font.render("SPACE EXPLORER", True, BLUE)
+        title_text = self.text.render(self.title_font, "SPACE EXPLORER", BLUE)
         self.screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 100))
         
         # Subtitle
-        subtitle_text = self.main_font.render("An Epic Space Adventure", True, WHITE)
+        subtitle_text = self.text.render(self.main_font, "An Epic Space Adventure", WHITE)
         self.screen.blit(subtitle_text, (WIDTH//2 - subtitle_text.get_width()//2, 160))
         
         # Draw buttons
@@ -682,27 +1079,27 @@ class SpaceExplorer:
         pygame.draw.rect(self.screen, RED, self.buttons["quit"])
         
         # Button text
-        start_text = self.main_font.render("Start Game", True, WHITE)
+        start_text = self.text.render(self.main_font, "Start Game", WHITE)
         self.screen.blit(start_text, (WIDTH//2 - start_text.get_width()//2, HEIGHT//2 - 35))
         
-        shop_text = self.main_font.render("Shop", True, WHITE)
+        shop_text = self.text.render(self.main_font, "Shop", WHITE)
         self.screen.blit(shop_text, (WIDTH//2 - shop_text.get_width()//2, HEIGHT//2 + 35))
         
-        tutorial_text = self.main_font.render("Tutorial", True, WHITE)
+        tutorial_text = self.text.render(self.main_font, "Tutorial", WHITE)
         self.screen.blit(tutorial_text, (WIDTH//2 - tutorial_text.get_width()//2, HEIGHT//2 + 105))
         
-        quit_text = self.main_font.render("Quit", True, WHITE)
+        quit_text = self.text.render(self.main_font, "Quit", WHITE)
         self.screen.blit(quit_text, (WIDTH//2 - quit_text.get_width()//2, HEIGHT//2 + 175))
         
         # Draw achievements
-        achievement_text = self.main_font.render("Achievements:", True, YELLOW)
+        achievement_text = self.text.render(self.main_font, "Achievements:", YELLOW)
         self.screen.blit(achievement_text, (20, HEIGHT - 120))
         
         y_offset = HEIGHT - 90
         for achievement in self.achievements.values():
             status = "✓" if achievement["unlocked"] else "✗"
             color = GREEN if achievement["unlocked"] else RED
-            text = self.small_font.render(f"{status} {achievement['name']}", True, color)
+            text = self.text.render(self.small_font, f"{status} {achievement['name']}", color)
             self.screen.blit(text, (30, y_offset))
             y_offset += 20
     
@@ -713,11 +1110,11 @@ class SpaceExplorer:
         self.draw_stars()
         
         # Title
-        title_text = self.title_font.render("SHOP", True, YELLOW)
+        title_text = self.text.render(self.title_font, "SHOP", YELLOW)
         self.screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 50))
         
         # Player stats
-        stats_text = self.main_font.render(f"Coins: {self.coins} | Level: {self.level} | Lives: {self.lives}", True, WHITE)
+        stats_text = self.text.render(self.main_font, f"Coins: {self.coins} | Level: {self.level} | Lives: {self.lives}", WHITE)
         self.screen.blit(stats_text, (WIDTH//2 - stats_text.get_width()//2, 120))
         
         # Shop items
@@ -727,18 +1124,18 @@ class SpaceExplorer:
             pygame.draw.rect(self.screen, color, (WIDTH//2 - 150, 180 + i*60, 300, 50))
             
             # Item name and cost
-            name_text = self.main_font.render(item["name"], True, WHITE)
+            name_text = self.text.render(self.main_font, item["name"], WHITE)
             self.screen.blit(name_text, (WIDTH//2 - 140, 190 + i*60))
             
-            cost_text = self.main_font.render(f"{item['cost']} coins", True, YELLOW)
+            cost_text = self.text.render(self.main_font, f"{item['cost']} coins", YELLOW)
             self.screen.blit(cost_text, (WIDTH//2 + 50, 190 + i*60))
             
             # Item description
-            desc_text = self.small_font.render(item["description"], True, WHITE)
+            desc_text = self.text.render(self.small_font, item["description"], WHITE)
             self.screen.blit(desc_text, (WIDTH//2 - 140, 215 + i*60))
         
         # Instructions
-        instr_text = self.small_font.render("Use UP/DOWN to select, ENTER to buy, ESC to return to game", True, WHITE)
+        instr_text = self.text.render(self.small_font, "Use UP/DOWN to select, ENTER to buy, ESC to return to game", WHITE)
         self.screen.blit(instr_text, (WIDTH//2 - instr_text.get_width()//2, HEIGHT - 50))
     
     def draw_game_over(self):
@@ -748,15 +1145,15 @@ class SpaceExplorer:
         self.draw_stars()
         
         # Title
-        title_text = self.title_font.render("GAME OVER", True, RED)
+        title_text = self.text.render(self.title_font, "GAME OVER", RED)
         self.screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 100))
         
         # Score
-        score_text = self.main_font.render(f"Final Score: {self.score}", True, WHITE)
+        score_text = self.text.render(self.main_font, f"Final Score: {self.score}", WHITE)
         self.screen.blit(score_text, (WIDTH//2 - score_text.get_width()//2, 180))
         
         # Level reached
-        level_text = self.main_font.render(f"Level Reached: {self.level}", True, WHITE)
+        level_text = self.text.render(self.main_font, f"Level Reached: {self.level}", WHITE)
         self.screen.blit(level_text, (WIDTH//2 - level_text.get_width()//2, 220))
         
         # Buttons
@@ -764,21 +1161,20 @@ class SpaceExplorer:
         pygame.draw.rect(self.screen, BLUE, self.buttons["menu"])
         
         # Button text
-        restart_text = self.main_font.render("Play Again", True, WHITE)
+        restart_text = self.text.render(self.main_font, "Play Again", WHITE)
         self.screen.blit(restart_text, (WIDTH//2 - restart_text.get_width()//2, HEIGHT//2 - 10 + 15))
         
-        menu_text = self.main_font.render("Main Menu", True, WHITE)
+        menu_text = self.text.render(self.main_font, "Main Menu", WHITE)
         self.screen.blit(menu_text, (WIDTH//2 - menu_text.get_width()//2, HEIGHT//2 + 20 + 15))
     
     def draw_pause(self):
         """Draw the pause screen overlay."""
-        # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 128))
+        # Semi-transparent overlay (built once and cached)
+        overlay = self.assets.derive('pause_overlay', self.create_pause_overlay)
         self.screen.blit(overlay, (0, 0))
         
         # Pause title
-        title_text = self.title_font.render("PAUSED", True, WHITE)
+        title_text = self.text.render(self.title_font, "PAUSED", WHITE)
         self.screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 100))
         
         # Buttons
@@ -786,12 +1182,18 @@ class SpaceExplorer:
         pygame.draw.rect(self.screen, BLUE, self.buttons["menu"])
         
         # Button text
-        resume_text = self.main_font.render("Resume Game", True, WHITE)
+        resume_text = self.text.render(self.main_font, "Resume Game", WHITE)
         self.screen.blit(resume_text, (WIDTH//2 - resume_text.get_width()//2, HEIGHT//2 - 65))
         
-        menu_text = self.main_font.render("Main Menu", True, WHITE)
+        menu_text = self.text.render(self.main_font, "Main Menu", WHITE)
         self.screen.blit(menu_text, (WIDTH//2 - menu_text.get_width()//2, HEIGHT//2 + 35))
     
+    def create_pause_overlay(self):
+        """Create the semi-transparent layer that dims the game while paused."""
+        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
+        overlay.fill((0, 0, 0, 128))
+        return overlay
+    
     def draw_tutorial(self):
         """Draw the tutorial screen."""
         # Clear screen and draw stars
@@ -799,36 +1201,26 @@ class SpaceExplorer:
         self.draw_stars()
         
         # Title
-        title_text = self.title_font.render("TUTORIAL", True, GREEN)
+        title_text = self.text.render(self.title_font, "TUTORIAL", GREEN)
         self.screen.blit(title_text, (WIDTH//2 - title_text.get_width()//2, 50))
         
         # Current tutorial step
         step_text = self.tutorial_texts[self.tutorial_step]
         
-        # Wrap text
-        words = step_text.split(' ')
-        lines = []
-        line = ""
-        for word in words:
-            test_line = line + word + " "
-            if self.main_font.size(test_line)[0] < WIDTH - 100:
-                line = test_line
-            else:
-                lines.append(line)
-                line = word + " "
-        lines.append(line)
+        # Wrap text (cached per step)
+        lines = self.text.wrap(self.main_font, step_text, WIDTH - 100)
         
         # Draw wrapped text
         y = 150
         for line in lines:
-            text = self.main_font.render(line, True, WHITE)
+            text = self.text.render(self.main_font, line, WHITE)
             self.screen.blit(text, (50, y))
             y += 30
         
         # Navigation instructions
-        nav_text = self.small_font.render(
+        nav_text = self.text.render(
+            self.small_font,
             f"Step {self.tutorial_step + 1}/{len(self.tutorial_texts)} - Press LEFT/RIGHT to navigate, ESC to exit", 
-            True, 
             WHITE
         )
         self.screen.blit(nav_text, (WIDTH//2 - nav_text.get_width()//2, HEIGHT - 50))
@@ -836,7 +1228,7 @@ class SpaceExplorer:
         # Back button
         if self.tutorial_step == len(self.tutorial_texts) - 1:
             pygame.draw.rect(self.screen, BLUE, self.buttons["back"])
-            back_text = self.main_font.render("Back to Menu", True, WHITE)
+            back_text = self.text.render(self.main_font, "Back to Menu", WHITE)
             self.screen.blit(back_text, (WIDTH//2 - back_text.get_width()//2, HEIGHT - 85))
     
     def handle_shop_input(self, event):
@@ -844,8 +1236,7 @@ class SpaceExplorer:
         if event.type == pygame.KEYDOWN:
             if event.key == pygame.K_ESCAPE:
                 # Return to game
-                self.state = PLAYING
-                self.spawn_enemies()
+                self.leave_shop()
             elif event.key == pygame.K_UP:
                 # Move selection up
                 self.selected_item = max(0, self.selected_item - 1)
@@ -854,39 +1245,54 @@ class SpaceExplorer:
                 self.selected_item = min(len(self.shop_items) - 1, self.selected_item + 1)
             elif event.key == pygame.K_RETURN:
                 # Try to buy selected item
-                item = self.shop_items[self.selected_item]
-                if self.coins >= item["cost"]:
-                    # Purchase successful
-                    self.coins -= item["cost"]
-                    
-                    # Apply item effect
-                    if item["name"] == "Health Up":
-                        self.lives = min(self.lives + 1, 5)
-                    elif item["name"] == "Speed Up":
-                        self.player_speed += 1
-                    elif item["name"] == "Damage Up":
-                        self.bullet_damage += 5
-                    elif item["name"] == "Shield":
-                        self.shield_active = True
-                        self.shield_time = 600  # 10 seconds
-                    elif item["name"] == "Double Shot":
-                        self.double_shot = True
-                        self.double_shot_time = 900  # 15 seconds
-                    
-                    # Play power-up sound
-                    if self.sound_on:
-                        self.sounds['powerup'].play()
+                self.buy_item(self.selected_item)
+    
+    def buy_item(self, index):
+        """Buy the shop item at the given index if the player can afford it."""
+        if self.recorder:
+            self.recorder.record_buy(index)
+        
+        item = self.shop_items[index]
+        if self.coins >= item["cost"]:
+            # Purchase successful
+            self.coins -= item["cost"]
+            
+            # Apply item effect
+            if item["name"] == "Health Up":
+                self.lives = min(self.lives + 1, 5)
+            elif item["name"] == "Speed Up":
+                self.player_speed += 1
+            elif item["name"] == "Damage Up":
+                self.bullet_damage += 5
+            elif item["name"] == "Shield":
+                self.shield_active = True
+                self.shield_time = 600  # 10 seconds
+            elif item["name"] == "Double Shot":
+                self.double_shot = True
+                self.double_shot_time = 900  # 15 seconds
+            
+            # Play power-up sound
+            if self.sound_on:
+                self.audio.play('powerup')
+            return True
+        return False
+    
+    def leave_shop(self):
+        """Leave the shop and start the next wave."""
+        if self.recorder:
+            self.recorder.record_leave_shop()
+        
+        self.state = PLAYING
+        self.spawn_enemies()
     
     def handle_menu_input(self, event):
         """Handle input for the main menu screen."""
         if event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = self.mouse_pos()
             
             if self.buttons["start"].collidepoint(mouse_pos):
                 # Start game
-                self.reset_game()
-                self.state = PLAYING
-                self.spawn_enemies()
+                self.start_game()
             elif self.buttons["shop"].collidepoint(mouse_pos):
                 # Go to shop
                 self.state = SHOP
@@ -903,13 +1309,11 @@ class SpaceExplorer:
     def handle_game_over_input(self, event):
         """Handle input for the game over screen."""
         if event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = self.mouse_pos()
             
             if self.buttons["restart"].collidepoint(mouse_pos):
                 # Restart game
-                self.reset_game()
-                self.state = PLAYING
-                self.spawn_enemies()
+                self.start_game()
             elif self.buttons["menu"].collidepoint(mouse_pos):
                 # Return to main menu
                 self.state = MENU
@@ -920,7 +1324,7 @@ class SpaceExplorer:
             # Resume game
             self.state = PLAYING
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = self.mouse_pos()
             
             if self.buttons["resume"].collidepoint(mouse_pos):
                 # Resume game
@@ -942,7 +1346,7 @@ class SpaceExplorer:
                 # Next step
                 self.tutorial_step = min(len(self.tutorial_texts) - 1, self.tutorial_step + 1)
         elif event.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = pygame.mouse.get_pos()
+            mouse_pos = self.mouse_pos()
             
             if self.tutorial_step == len(self.tutorial_texts) - 1 and self.buttons["back"].collidepoint(mouse_pos):
                 # Return to main menu from last step
@@ -950,22 +1354,149 @@ class SpaceExplorer:
     
     def handle_game_input(self):
         """Handle input for the main gameplay."""
+        self.apply_input(self.read_input())
+    
+    def read_input(self):
+        """Read the keyboard and return the held gameplay actions as INPUT_* bits."""
         keys = pygame.key.get_pressed()
         
-        # Movement
+        bits = 0
         if keys[pygame.K_LEFT] or keys[pygame.K_a]:
-            self.player_pos[0] = max(30, self.player_pos[0] - self.player_speed)
+            bits |= INPUT_LEFT
         if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
-            self.player_pos[0] = min(WIDTH - 30, self.player_pos[0] + self.player_speed)
+            bits |= INPUT_RIGHT
         if keys[pygame.K_UP] or keys[pygame.K_w]:
-            self.player_pos[1] = max(50, self.player_pos[1] - self.player_speed)
+            bits |= INPUT_UP
         if keys[pygame.K_DOWN] or keys[pygame.K_s]:
-            self.player_pos[1] = min(HEIGHT - 50, self.player_pos[1] + self.player_speed)
+            bits |= INPUT_DOWN
+        if keys[pygame.K_SPACE]:
+            bits |= INPUT_FIRE
+        return bits
+    
+    def apply_input(self, bits):
+        """Move and shoot according to a set of INPUT_* bits."""
+        if self.recorder:
+            self.recorder.record_input(bits)
+        
+        # Movement
+        self.player_pos[0], self.player_pos[1] = step_ship(self.player_pos[0], self.player_pos[1], bits,
+                                                           self.player_speed)
         
         # Shooting
-        if keys[pygame.K_SPACE]:
+        if bits & INPUT_FIRE:
             self.shoot()
     
+    def add_wingman(self):
+        """Add a co-op player's ship next to the player and return its wingmen slot (None if full)."""
+        x = WIDTH // 2 + 60 * (1 + len(self.wingmen))
+        return self.wingmen.spawn(x=min(x, WIDTH - 30), y=HEIGHT - 100, energy=self.max_energy)
+    
+    def apply_wingman_input(self, slot, bits):
+        """Move and shoot the co-op ship in wingmen `slot` according to a set of INPUT_* bits."""
+        wingmen = self.wingmen
+        wingmen.x[slot], wingmen.y[slot] = step_ship(wingmen.x[slot], wingmen.y[slot], bits, self.player_speed)
+        
+        if bits & INPUT_FIRE and wingmen.energy[slot] >= 5 and wingmen.shoot_cooldown[slot] <= 0:
+            x = float(wingmen.x[slot])
+            y = float(wingmen.y[slot])
+            if wingmen.double_shot_time[slot] > 0:
+                self.player_bullets.spawn(x=x - 10, y=y)
+                self.player_bullets.spawn(x=x + 10, y=y)
+            else:
+                self.player_bullets.spawn(x=x, y=y)
+            wingmen.energy[slot] -= 5
+            wingmen.shoot_cooldown[slot] = 10
+            if self.sound_on:
+                self.audio.play('shoot')
+    
+    def start_game(self, level=1):
+        """Start a fresh game, recording it if a record path is set."""
+        self.reset_game()
+        self.level = level
+        
+        if self.record_path:
+            self.start_recording(self.record_path)
+        
+        self.state = PLAYING
+        self.spawn_enemies()
+    
+    def start_recording(self, path):
+        """Start recording the game that is about to begin to a replay file."""
+        self.stop_recording()
+        
+        # Fresh seed per recorded game, stored in the replay header. It is drawn
+        # from the gameplay stream so a seeded session records the same seeds
+        self.seed_rng(self.rng.getrandbits(63))
+        self.recorder = ReplayWriter(
+            path, self.seed, self.level, self.coins, self.player_speed, self.bullet_damage, self.campaign
+        )
+    
+    def stop_recording(self):
+        """Finish the current replay, if any, with the final state hash."""
+        if self.recorder:
+            self.recorder.close(self.state_hash())
+            self.recorder = None
+    
+    def save_snapshot(self, path):
+        """Queue a snapshot of the game to be written to `path` in the background."""
+        self.snapshots.save(self, path)
+    
+    def load_snapshot(self, path):
+        """Restore the game from a snapshot file written by save_snapshot()."""
+        self.stop_recording()
+        load_file(self, path)
+        self.autosave_time = self.game_time
+    
+    def queue_sounds(self):
+        """Hand the sounds requested this frame to the audio dispatcher."""
+        self.audio.end_frame()
+    
+    def autosave(self):
+        """Snapshot the game every AUTOSAVE_TICKS simulated ticks of play if an autosave path is set."""
+        if not self.autosave_path or self.state != PLAYING:
+            return
+        # game_time counts ticks, however many frames they were simulated or skipped in
+        if self.game_time - self.autosave_time >= AUTOSAVE_TICKS:
+            self.autosave_time = self.game_time
+            self.save_snapshot(self.autosave_path)
+    
+    def state_hash(self):
+        """Return a 16-byte digest of the gameplay state, used to verify replays."""
+        state = (
+            self.level, self.score, self.lives, self.coins, self.energy,
+            self.player_pos, self.player_speed, self.bullet_damage, self.shoot_cooldown,
+            self.shield_active, self.shield_time, self.double_shot, self.double_shot_time,
+            self.pool_state(self.player_bullets), self.pool_state(self.enemy_bullets),
+            self.pool_state(self.enemies),
+            self.boss and (self.boss['pos'], self.boss['direction'], self.boss['type'], self.boss['attack_timer']),
+            self.boss_health,
+            self.pool_state(self.power_ups),
+            self.rng.getstate()
+        )
+        return hashlib.blake2b(repr(state).encode(), digest_size=16).digest()
+    
+    def pool_state(self, pool):
+        """Return every field of a pool's live entities, in spawn order, as plain lists."""
+        slots = pool.active()
+        return [getattr(pool, name)[slots].tolist() for name in pool.field_names]
+    
+    def pool_stats(self):
+        """Return occupancy and high-water marks for every entity pool."""
+        return self.world.stats()
+    
+    def entity_counts(self):
+        """Return how many of each kind of entity are alive, for the profiler."""
+        counts = {archetype.name: len(archetype) for archetype in self.world}
+        counts['particles'] = len(self.particles)
+        return counts
+    
+    def toggle_profiler_overlay(self):
+        """Show or hide the frame-time overlay."""
+        self.profiler.toggle_overlay()
+        # Menus are only redrawn when they change, so force a repaint to remove the panel
+        self.static_key = None
+        self.dirty.invalidate()
+    
     def reset_game(self):
         """Reset the game to initial state."""
         self.level = 1
@@ -973,18 +1504,24 @@ class SpaceExplorer:
         self.lives = 3
         self.energy = 100
         self.player_pos = [WIDTH // 2, HEIGHT - 100]
-        self.player_bullets = []
-        self.enemy_bullets = []
-        self.enemies = []
+        self.world.clear()
         self.boss = None
-        self.power_ups = []
-        self.particles = []
+        self.particles.clear()
         self.double_shot = False
+        self.double_shot_time = 0
         self.shield_active = False
+        self.shield_time = 0
+        self.shield_cooldown = 0
+        self.shoot_cooldown = 0
         self.game_time = 0
+        self.autosave_time = 0
+        self.lerp.clear()
     
     def run_frame(self):
         """Run a single frame of the game."""
+        profiler = self.profiler
+        profiler.begin_frame()
+        
         # Process events
         running = True
         for event in pygame.event.get():
@@ -993,6 +1530,10 @@ class SpaceExplorer:
             elif event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_ESCAPE and self.state == PLAYING:
                     self.state = PAUSE
+                elif event.key == pygame.K_F3:
+                    self.toggle_profiler_overlay()
+            elif event.type == pygame.VIDEORESIZE and self.display:
+                self.display.resize(pygame.display.get_surface())
             
             # Handle state-specific input
             if self.state == MENU:
@@ -1006,30 +1547,150 @@ class SpaceExplorer:
             elif self.state == TUTORIAL:
                 self.handle_tutorial_input(event)
         
+        # A recorded game ends when the player dies or leaves to the menu
+        if self.recorder and self.state in (MENU, GAME_OVER):
+            self.stop_recording()
+        
+        profiler.lap('events')
+        
+        # Run the simulation ticks this frame's share of real time calls for
+        ticks = 1
+        render = True
+        if self.state == PLAYING:
+            ticks = self.timestep.advance(self.frame_seconds, self.frame_busy)
+            render = self.timestep.render
+            self.alpha = self.timestep.alpha if self.interpolate else 1.0
+        else:
+            self.timestep.reset()
+            self.alpha = 1.0
+        
         # Update and draw based on game state
+        pipelined = self.pipeline is not None and self.state == PLAYING
+        if pipelined:
+            # The worker simulates this frame's ticks while the last ones are drawn and shown
+            self.alpha = 1.0
+            self.leave_static_screen()
+            self.pipeline.submit(ticks, self.read_input())
+            profiler.lap('input')
+            if render:
+                self.pipeline.draw()
+        else:
+            if self.pipeline is not None:
+                self.pipeline.reset()
+            self.update_state(ticks, render)
+        profiler.lap('draw')
+        
+        # Profiler overlay on top of everything
+        if render:
+            rect = self.profiler_overlay.draw(self.screen)
+            if rect:
+                self.dirty.add(rect)
+        profiler.lap('overlay')
+        
+        if pipelined:
+            if render:
+                self.present()
+            profiler.lap('present')
+            # Wait for the worker; the game is only touched from here on once it is done
+            self.pipeline.wait()
+            profiler.lap('sync')
+        
+        # Queue this frame's sounds for the mixer, autosave
+        self.world.run('frame', profiler.lap)
+        
+        # Cap framerate (at the display's refresh rate; the simulation keeps its own pace)
+        self.frame_seconds = self.clock.tick(self.max_fps) / 1000
+        self.frame_busy = self.clock.get_rawtime() / 1000
+        profiler.lap('idle')
+        
+        # Update display (frames skipped under load have nothing new to show)
+        if render and not pipelined:
+            self.present()
+        profiler.lap('present')
+        if profiler.enabled:
+            profiler.end_frame(dict(self.entity_counts(), ticks=ticks))
+        
+        return running
+    
+    def update_state(self, ticks=1, render=True):
+        """Update and draw one frame of the current game state (input events aside).
+        
+        During play the simulation runs `ticks` ticks (none when the display
+        is faster than the tick rate) and the frame is only drawn if
+        `render` is set; menus ignore both.
+        """
         if self.state == PLAYING:
-            self.handle_game_input()
-            self.update_game()
-            self.draw_game()
+            self.leave_static_screen()
+            for _ in range(ticks):
+                if self.state != PLAYING:
+                    break
+                if self.interpolate:
+                    self.capture_positions()
+                self.handle_game_input()
+                self.profiler.lap('input')
+                self.update_game()
+            if render:
+                self.draw_game()
         elif self.state == MENU:
-            self.draw_menu()
+            unlocked = tuple(achievement["unlocked"] for achievement in self.achievements.values())
+            self.draw_static(self.draw_menu, (MENU, unlocked))
         elif self.state == GAME_OVER:
-            self.draw_game_over()
+            self.draw_static(self.draw_game_over, (GAME_OVER, self.score, self.level))
         elif self.state == PAUSE:
-            self.draw_game()
-            self.draw_pause()
+            self.draw_static(self.draw_paused_game, (PAUSE,))
         elif self.state == SHOP:
-            self.draw_shop()
+            self.draw_static(self.draw_shop, (SHOP, self.coins, self.level, self.lives, self.selected_item))
         elif self.state == TUTORIAL:
-            self.draw_tutorial()
-        
-        # Cap framerate
-        self.clock.tick(FPS)
-        
-        # Update display
-        pygame.display.flip()
-        
-        return running
+            self.draw_static(self.draw_tutorial, (TUTORIAL, self.tutorial_step))
+    
+    def leave_static_screen(self):
+        """Make the next frame repaint everything if the last one was a full-screen menu."""
+        if self.static_key is not None:
+            self.static_key = None
+            self.dirty.invalidate()
+    
+    def capture_positions(self):
+        """Remember where everything is before a tick, to draw frames in between ticks."""
+        lerp = self.lerp
+        lerp.capture_point('player', self.player_pos)
+        lerp.capture_point('boss', self.boss['pos'] if self.boss else None)
+        for archetype in self.world.query('x', 'y'):
+            lerp.capture_pool(archetype)
+    
+    def draw_paused_game(self):
+        """Draw the frozen game with the pause overlay on top."""
+        self.draw_game()
+        self.draw_pause()
+    
+    def draw_static(self, draw, key):
+        """Draw a menu-style screen, skipping it in dirty-rect mode if nothing it shows has changed.
+        
+        `key` captures everything the screen displays; stars do not move
+        outside of gameplay, so an unchanged key means an unchanged screen.
+        """
+        if self.dirty.enabled and key == self.static_key:
+            return
+        self.static_key = key
+        self.dirty.invalidate()
+        draw()
+    
+    def mouse_pos(self):
+        """Return the mouse position in logical (game) coordinates."""
+        pos = pygame.mouse.get_pos()
+        if self.display:
+            pos = self.display.to_logical(pos)
+        return pos
+    
+    def present(self):
+        """Push the finished frame to the display, scaling it to the window if needed."""
+        rects = self.dirty.present()
+        if self.display:
+            rects = self.display.present(rects)
+        self.profiler.lap('scale')
+        if rects is None:
+            pygame.display.flip()
+        elif rects:
+            pygame.display.update(rects)
     
     def run(self):
         """Main game loop for standalone pygame."""
@@ -1037,9 +1698,73 @@ class SpaceExplorer:
         while running:
             running = self.run_frame()
         
+        if self.pipeline is not None:
+            self.pipeline.close()
+        self.stop_recording()
+        if self.autosave_path and self.state in (PLAYING, PAUSE, SHOP):
+            # Quitting mid-game keeps the game to resume later
+            self.save_snapshot(self.autosave_path)
+        self.snapshots.close()
+        self.audio.close()
+        self.profiler.close_log()
         pygame.quit()
 
 # Main execution
 if __name__ == "__main__":
-    game = SpaceExplorer()
+    parser = argparse.ArgumentParser(description="Space Explorer")
+    parser.add_argument('--seed', type=int, default=None, help="seed for a reproducible game")
+    parser.add_argument('--record', metavar='PATH', help="record each game to a replay file")
+    parser.add_argument('--render-mode', choices=[RENDER_FULL, RENDER_DIRTY], default=RENDER_FULL,
+                        help="redraw the whole screen or only what changed")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="log per-frame phase timings to a .csv or .jsonl file")
+    parser.add_argument('--campaign', metavar='PATH', default=DEFAULT_CAMPAIGN,
+                        help="campaign file (.json or .toml) defining each level's waves")
+    parser.add_argument('--autosave', metavar='PATH',
+                        help="snapshot the game to PATH every few seconds of play")
+    parser.add_argument('--resume', metavar='PATH', help="continue the game saved in a snapshot")
+    parser.add_argument('--max-fps', type=int, default=None,
+                        help="frame rate cap (default: the display's refresh rate, 0: uncapped); "
+                             "gameplay always runs at 60 ticks per second")
+    parser.add_argument('--no-interpolation', action='store_true',
+                        help="draw entities where the last tick left them")
+    parser.add_argument('--pipelined', action='store_true',
+                        help="simulate on a worker thread while the previous tick is drawn")
+    parser.add_argument('--window', metavar='WxH', help="window size; the game is scaled to fit")
+    parser.add_argument('--fullscreen', action='store_true', help="scale the game to the full screen")
+    parser.add_argument('--scaler', choices=SCALERS, default=SCALE_INTEGER,
+                        help="how to scale the game to the window")
+    args = parser.parse_args()
+    
+    window_size = None
+    if args.window:
+        try:
+            window_size = tuple(int(value) for value in args.window.lower().split('x'))
+        except ValueError:
+            window_size = ()
+        if len(window_size) != 2:
+            parser.error(f"--window must look like 1920x1080, not {args.window!r}")
+    
+    try:
+        game = SpaceExplorer(seed=args.seed, render_mode=args.render_mode, window_size=window_size,
+                             fullscreen=args.fullscreen, scaler=args.scaler, campaign=args.campaign)
+    except CampaignError as error:
+        parser.exit(1, f"{error}\n")
+    game.record_path = args.record
+    game.autosave_path = args.autosave
+    if args.max_fps is not None:
+        game.max_fps = args.max_fps
+    game.interpolate = not args.no_interpolation
+    if args.pipelined:
+        game.pipeline = SimulationPipeline(game)
+    if args.resume:
+        try:
+            game.load_snapshot(args.resume)
+        except (OSError, SnapshotError) as error:
+            parser.exit(1, f"Cannot resume from {args.resume}: {error}\n")
+        if game.state == PLAYING:
+            # Give the player a moment before the action restarts
+            game.state = PAUSE
+    if args.profile:
+        game.profiler.open_log(args.profile)
     game.run()
@@ -0,0 +1,207 @@
+import hashlib
+import os
+import time
+
+import pygame
+
+from atlas import SpriteAtlas
+
+# Bump when sprite generation changes in a way the cache key cannot see
+ASSET_VERSION = 1
+
+# Module globals of these types (colors, sizes) are part of a factory's fingerprint
+_CONSTANT_TYPES = (bool, int, float, str, bytes, tuple, type(None))
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'space_explorer', 'assets'
+)
+
+
+def _code_fingerprint(func):
+    """Return bytes that change whenever a sprite factory's code or the constants it reads change."""
+    code = getattr(func, '__code__', None)
+    if code is None:
+        return repr(func).encode()
+    module_globals = getattr(func, '__globals__', {})
+    parts = []
+    codes = [code]
+    while codes:
+        code = codes.pop()
+        # Nested code (comprehensions, lambdas) is hashed in place of its address-bearing repr
+        codes.extend(const for const in code.co_consts if hasattr(const, 'co_code'))
+        parts.append(code.co_code)
+        parts.append(repr(tuple(const for const in code.co_consts if not hasattr(const, 'co_code'))).encode())
+        # The values of globals it reads, e.g. RED and YELLOW in create_boss_img
+        for name in code.co_names:
+            value = module_globals.get(name)
+            if isinstance(value, _CONSTANT_TYPES):
+                parts.append(repr((name, value)).encode())
+    return b''.join(parts)
+
+
+def _bytes(surface):
+    """Return the pixel memory of a surface (0 for subsurfaces, which share their parent's)."""
+    if surface.get_parent() is not None:
+        return 0
+    return surface.get_bytesize() * surface.get_width() * surface.get_height()
+
+
+class AssetManager:
+    """Builds every generated sprite once, in the display's pixel format, and caches what is derived from them.
+
+    Sprites are registered as factories (plus an optional tint and alpha
+    applied to the factory's output) and baked into a SpriteAtlas on
+    build(). The baked atlas is saved to disk, keyed on the sprite list and
+    the factories' code, so later launches load it instead of drawing.
+    Variants of baked sprites (tinted, faded, scaled) and other derived
+    surfaces such as full-screen overlays are created on first use and kept.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+        """Create an empty manager caching its baked atlas in `cache_dir`."""
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.specs = {}
+        self.atlas = SpriteAtlas()
+        self.images = {}
+        self.derived = {}
+
+        # Stats
+        self.load_seconds = 0.0
+        self.loaded_from_disk = False
+        self.derived_hits = 0
+        self.derived_misses = 0
+
+    def sprite(self, name, factory, *args, tint=None, alpha=None):
+        """Register sprite `name` as factory(*args), optionally multiplied by `tint` and `alpha`."""
+        self.specs[name] = (factory, args, tint, alpha)
+
+    def cache_key(self):
+        """Return a 16-byte key identifying the registered sprites and how they are drawn."""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(repr(ASSET_VERSION).encode())
+        for name, (factory, args, tint, alpha) in sorted(self.specs.items()):
+            digest.update(repr((name, getattr(factory, '__qualname__', None), args, tint, alpha)).encode())
+            digest.update(_code_fingerprint(factory))
+        return digest.digest()
+
+    def cache_path(self):
+        """Return the file the baked atlas is cached in."""
+        return os.path.join(self.cache_dir, f"atlas-{self.cache_key().hex()}.bin")
+
+    def build(self):
+        """Bake (or load from disk) every registered sprite and return a {name: image} dict."""
+        start = time.perf_counter()
+        images = None
+        if self.use_cache:
+            images = self.atlas.load(self.cache_path(), self.cache_key())
+        self.loaded_from_disk = images is not None
+
+        if images is None:
+            # Factories with the same arguments are only drawn once (e.g. one base ship for every tint)
+            bases = {}
+            for name, (factory, args, tint, alpha) in self.specs.items():
+                base = bases.get((factory, args))
+                if base is None:
+                    base = bases[(factory, args)] = factory(*args)
+                self.atlas.add(name, self.multiply(base, tint, alpha))
+            images = self.atlas.build()
+            if self.use_cache:
+                try:
+                    self.atlas.save(self.cache_path(), self.cache_key())
+                except OSError:
+                    pass  # The cache is optional
+
+        self.images = images
+        self.load_seconds = time.perf_counter() - start
+        return images
+
+    @staticmethod
+    def multiply(surface, tint=None, alpha=None):
+        """Return a per-pixel alpha copy of `surface` with its colors times `tint` and alpha times `alpha`."""
+        surface = surface.convert_alpha() if pygame.display.get_surface() is not None else surface.copy()
+        if tint is not None or alpha is not None:
+            color = tuple(tint or (255, 255, 255))[:3] + (255 if alpha is None else alpha,)
+            surface.fill(color, special_flags=pygame.BLEND_RGBA_MULT)
+        return surface
+
+    def derive(self, key, factory):
+        """Return the surface cached under `key`, creating it with factory() and converting it on first use."""
+        surface = self.derived.get(key)
+        if surface is not None:
+            self.derived_hits += 1
+            return surface
+
+        self.derived_misses += 1
+        surface = factory()
+        if pygame.display.get_surface() is not None:
+            if surface.get_flags() & pygame.SRCALPHA:
+                surface = surface.convert_alpha()
+            else:
+                surface = surface.convert()
+        self.derived[key] = surface
+        return surface
+
+    def variant(self, name, tint=None, alpha=None, size=None, smooth=False):
+        """Return baked sprite `name` tinted, faded and/or scaled to `size`, cached after the first call."""
+        def make():
+            surface = self.images[name]
+            if size is not None:
+                scale = pygame.transform.smoothscale if smooth else pygame.transform.scale
+                surface = scale(self.multiply(surface), size)
+            return self.multiply(surface, tint, alpha)
+        return self.derive(('variant', name, tint, alpha, size, smooth), make)
+
+    def nbytes(self):
+        """Return the pixel memory of the atlas and every derived surface."""
+        return self.atlas.nbytes() + sum(_bytes(surface) for surface in self.derived.values())
+
+    def report(self):
+        """Return load time, cache use and memory footprint."""
+        return {
+            'load_ms': self.load_seconds * 1000,
+            'from_disk': self.loaded_from_disk,
+            'sprites': len(self.images),
+            'atlas_bytes': self.atlas.nbytes(),
+            'derived': len(self.derived),
+            'derived_hits': self.derived_hits,
+            'derived_misses': self.derived_misses,
+            'total_bytes': self.nbytes(),
+        }
+
+
+if __name__ == "__main__":
+    import argparse
+    import shutil
+    import tempfile
+
+    # Bake without opening a window or an audio device
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    from Explorer import SpaceExplorer
+
+    parser = argparse.ArgumentParser(description="Report Space Explorer asset load time and memory")
+    parser.add_argument('--clear', action='store_true', help="delete the baked atlas cache first")
+    args = parser.parse_args()
+    if args.clear:
+        shutil.rmtree(DEFAULT_CACHE_DIR, ignore_errors=True)
+
+    # A throwaway cache directory shows the cold (bake and save) cost next to the cached load
+    cold_dir = tempfile.mkdtemp(prefix="space_explorer_assets_")
+    try:
+        game = SpaceExplorer(headless=True)
+        cold = AssetManager(cold_dir)
+        cold.specs = dict(game.assets.specs)
+        cold.build()
+        warm = AssetManager(cold_dir)
+        warm.specs = dict(game.assets.specs)
+        warm.build()
+    finally:
+        shutil.rmtree(cold_dir, ignore_errors=True)
+
+    game.draw_pause()  # Derive the pause overlay
+    print(f"cold bake: {cold.report()['load_ms']:.2f} ms, cached load: {warm.report()['load_ms']:.2f} ms")
+    for key, value in game.assets.report().items():
+        print(f"{key}: {value}")
@@ -0,0 +1,217 @@
+import json
+import os
+import struct
+
+import numpy as np
+import pygame
+
+# Background of the colorkeyed sheet; no generated sprite uses this color
+COLORKEY = (255, 0, 255)
+
+# Baked atlas file: magic, format version, cache key, metadata length,
+# then JSON metadata and the raw pixels of each sheet
+ATLAS_MAGIC = b'SXAT'
+ATLAS_VERSION = 1
+ATLAS_HEADER = struct.Struct('<4sB16sI')
+
+# Sheet kinds and the pixel layout they are stored with
+SHEET_KEYED = 'keyed'
+SHEET_ALPHA = 'alpha'
+SHEET_FORMATS = {SHEET_KEYED: 'RGB', SHEET_ALPHA: 'RGBA'}
+
+
+class SpriteAtlas:
+    """Packs the game's generated sprites into shared sheets and draws them in batches.
+
+    Sprites whose alpha is all-or-nothing go on an opaque sheet with a
+    colorkey, which blits much faster than per-pixel alpha; only genuinely
+    translucent sprites go on the alpha sheet. Sprites are placed on
+    shelves (rows) in order of decreasing height. Every sprite is anchored
+    at its center, matching how the game positions its images, so a whole
+    layer of entities can be drawn from their coordinate arrays with a
+    single Surface.blits call.
+    """
+
+    def __init__(self, max_width=256, padding=1):
+        """Create an empty atlas whose shelves are at most `max_width` pixels wide."""
+        self.max_width = max_width
+        self.padding = padding
+        self.pending = {}
+        self.sheets = {}
+        self.sheet_surfaces = {}
+        self.rects = {}
+        self.images = {}
+
+    def add(self, name, surface):
+        """Queue a sprite for packing; call build() once everything is added."""
+        self.pending[name] = surface
+
+    def _pack(self, names):
+        """Shelf-pack the named sprites and return the sheet size."""
+        padding = self.padding
+        x = y = shelf_height = width = 0
+        for name in sorted(names, key=lambda name: self.pending[name].get_height(), reverse=True):
+            w, h = self.pending[name].get_size()
+            if x and x + w > self.max_width:
+                # Row is full: start a new one below
+                x = 0
+                y += shelf_height + padding
+                shelf_height = 0
+            self.rects[name] = pygame.Rect(x, y, w, h)
+            x += w + padding
+            width = max(width, x)
+            shelf_height = max(shelf_height, h)
+        return max(width, 1), max(y + shelf_height, 1)
+
+    def build(self):
+        """Pack every queued sprite into the sheets and return a {name: image} dict.
+
+        The images are subsurfaces of the sheets, so they can still be
+        blitted on their own (menus, shop) while sharing their pixels.
+        """
+        keyed = []
+        translucent = []
+        for name, sprite in self.pending.items():
+            alpha = pygame.surfarray.array_alpha(sprite)
+            if ((alpha == 0) | (alpha == 255)).all():
+                keyed.append(name)
+            else:
+                translucent.append(name)
+
+        sheets = {}
+        if keyed:
+            sheet = pygame.Surface(self._pack(keyed))
+            sheet.fill(COLORKEY)
+            for name in keyed:
+                sheet.blit(self.pending[name], self.rects[name])
+            sheets[SHEET_KEYED] = (sheet, keyed)
+
+        if translucent:
+            sheet = pygame.Surface(self._pack(translucent), pygame.SRCALPHA)
+            for name in translucent:
+                # Additive blit onto the transparent sheet copies the pixels, alpha included, unblended
+                sheet.blit(self.pending[name], self.rects[name], special_flags=pygame.BLEND_RGBA_ADD)
+            sheets[SHEET_ALPHA] = (sheet, translucent)
+
+        self.pending = {}
+        return self._finish(sheets)
+
+    def _finish(self, sheets):
+        """Convert the {kind: (surface, names)} sheets to the display format and slice out the images."""
+        has_display = pygame.display.get_surface() is not None
+        for kind, (sheet, names) in sheets.items():
+            if kind == SHEET_KEYED:
+                sheet.set_colorkey(COLORKEY)
+                if has_display:
+                    sheet = sheet.convert()
+            elif has_display:
+                sheet = sheet.convert_alpha()
+            self.sheet_surfaces[kind] = sheet
+            for name in names:
+                self.sheets[name] = sheet
+
+        self.images = {name: self.sheets[name].subsurface(rect) for name, rect in self.rects.items()}
+        return self.images
+
+    def nbytes(self):
+        """Return the pixel memory used by the sheets."""
+        return sum(sheet.get_bytesize() * sheet.get_width() * sheet.get_height()
+                   for sheet in self.sheet_surfaces.values())
+
+    def save(self, path, key):
+        """Write the baked sheets and sprite rects to `path`, tagged with a 16-byte cache key."""
+        sheets = []
+        pixels = []
+        for kind, sheet in self.sheet_surfaces.items():
+            names = [name for name, owner in self.sheets.items() if owner is sheet]
+            sheets.append({
+                'kind': kind,
+                'size': sheet.get_size(),
+                'sprites': {name: tuple(self.rects[name]) for name in names},
+            })
+            pixels.append(pygame.image.tobytes(sheet, SHEET_FORMATS[kind]))
+        metadata = json.dumps({'sheets': sheets}).encode()
+
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(ATLAS_HEADER.pack(ATLAS_MAGIC, ATLAS_VERSION, key, len(metadata)))
+                f.write(metadata)
+                for data in pixels:
+                    f.write(data)
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def load(self, path, key):
+        """Load sheets baked by save() and return the images, or None if the file is missing or stale."""
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) < ATLAS_HEADER.size:
+            return None
+        magic, version, file_key, metadata_size = ATLAS_HEADER.unpack_from(data)
+        if magic != ATLAS_MAGIC or version != ATLAS_VERSION or file_key != key:
+            return None
+
+        offset = ATLAS_HEADER.size
+        try:
+            metadata = json.loads(data[offset:offset + metadata_size])
+        except ValueError:
+            return None
+        offset += metadata_size
+
+        sheets = {}
+        for info in metadata['sheets']:
+            kind = info['kind']
+            size = tuple(info['size'])
+            pixel_format = SHEET_FORMATS[kind]
+            end = offset + size[0] * size[1] * len(pixel_format)
+            if end > len(data):
+                return None
+            sheet = pygame.image.frombytes(data[offset:end], size, pixel_format)
+            if kind == SHEET_KEYED:
+                # Copy into the same surface format build() would have produced
+                keyed = pygame.Surface(size)
+                keyed.blit(sheet, (0, 0))
+                sheet = keyed
+            offset = end
+            for name, rect in info['sprites'].items():
+                self.rects[name] = pygame.Rect(rect)
+            sheets[kind] = (sheet, list(info['sprites']))
+        return self._finish(sheets)
+
+    def draw(self, surface, sprites, x, y, mark=None):
+        """Draw sprites centered on the coordinate arrays `x` and `y` with one Surface.blits call.
+
+        `sprites` is one sprite name for every entity, or a list of names
+        with one per entity. If `mark` is given it is called with every
+        drawn rect.
+        """
+        count = len(x)
+        if not count:
+            return
+
+        if isinstance(sprites, str):
+            sheet = self.sheets[sprites]
+            rect = self.rects[sprites]
+            left = (x - rect.w // 2).astype(np.int32).tolist()
+            top = (y - rect.h // 2).astype(np.int32).tolist()
+            batch = [(sheet, (left[i], top[i]), rect) for i in range(count)]
+        else:
+            sheets = [self.sheets[name] for name in sprites]
+            rects = [self.rects[name] for name in sprites]
+            left = (x - np.array([rect.w // 2 for rect in rects])).astype(np.int32).tolist()
+            top = (y - np.array([rect.h // 2 for rect in rects])).astype(np.int32).tolist()
+            batch = [(sheets[i], (left[i], top[i]), rects[i]) for i in range(count)]
+
+        if mark is None:
+            surface.blits(batch, doreturn=False)
+        else:
+            for rect in surface.blits(batch):
+                mark(rect)
@@ -0,0 +1,184 @@
+import queue
+import threading
+
+import pygame
+
+# Mixer channels the dispatcher manages
+DEFAULT_CHANNELS = 16
+
+# How each sound may use the mixer:
+#   priority  requests are served highest first, and may steal a shared
+#             channel from a sound of lower priority
+#   voices    most copies of the sound that may play at once
+#   reserved  channels kept for this sound alone, so it is never starved
+SOUND_POLICIES = {
+    'hit': {'priority': 3, 'voices': 1, 'reserved': 1},
+    'powerup': {'priority': 2, 'voices': 2, 'reserved': 1},
+    'explosion': {'priority': 1, 'voices': 4, 'reserved': 0},
+    'shoot': {'priority': 0, 'voices': 2, 'reserved': 0},
+}
+DEFAULT_POLICY = {'priority': 0, 'voices': 1, 'reserved': 0}
+
+
+class AudioDispatcher:
+    """Collects the sounds requested during a frame and plays them off the game thread.
+
+    play() only counts the request, so the simulation can ask for a sound
+    once per kill or pickup at no cost. end_frame() hands the frame's
+    requests to a worker thread as one batch, in which duplicates of the
+    same sound are played once. The worker serves sounds in priority
+    order, caps how many copies of each play at once and places them on
+    their reserved channels first, then on the shared ones, stealing the
+    lowest-priority shared voice only for a more important sound.
+
+    Without a mixer (headless games) requests are still counted and
+    coalesced, but nothing is played. Duplicates within a frame count as
+    coalesced; when the worker falls behind and plays several frames'
+    batches together, a sound already in the merged batch counts as merged.
+    """
+
+    def __init__(self, sounds, policies=SOUND_POLICIES, channels=DEFAULT_CHANNELS, mixer=True, threaded=True):
+        """Create a dispatcher for the {name: Sound} dict `sounds`."""
+        self.sounds = sounds
+        self.policies = {name: policies.get(name, DEFAULT_POLICY) for name in sounds}
+        self.mixer = mixer and pygame.mixer.get_init() is not None
+        self.pending = {}
+        self.queue = None
+        self.thread = None
+
+        # Stats
+        self.requested = 0
+        self.coalesced = 0
+        self.merged = 0
+        self.played = 0
+        self.stolen = 0
+        self.dropped = 0
+        self.late = 0
+
+        if self.mixer:
+            self._assign_channels(channels)
+            if threaded:
+                self.queue = queue.SimpleQueue()
+                self.thread = threading.Thread(target=self._run, name="audio-dispatch", daemon=True)
+                self.thread.start()
+
+    def _assign_channels(self, channels):
+        """Give each sound its reserved channels and leave the rest shared."""
+        reserved = {}
+        index = 0
+        for name, policy in self.policies.items():
+            reserved[name] = list(range(index, index + policy['reserved']))
+            index += policy['reserved']
+        channels = max(channels, index + 1)
+        pygame.mixer.set_num_channels(channels)
+        # Sound.play() elsewhere (menus) must not grab the reserved channels
+        pygame.mixer.set_reserved(index)
+
+        self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.channel_priority = [0] * channels
+        self.reserved = reserved
+        self.shared = list(range(index, channels))
+
+    def play(self, name):
+        """Request sound `name` for this frame."""
+        self.requested += 1
+        pending = self.pending
+        if name in pending:
+            # A duplicate within the frame: it will play once
+            pending[name] += 1
+            self.coalesced += 1
+        else:
+            pending[name] = 1
+
+    def end_frame(self):
+        """Hand this frame's requests to the mixer (on the worker thread when there is one)."""
+        if not self.pending:
+            return
+        batch = self.pending
+        self.pending = {}
+        if self.queue is not None:
+            self.queue.put(batch)
+        else:
+            self._dispatch(batch)
+
+    def _run(self):
+        """Play batches until a None batch arrives."""
+        while True:
+            batch = self.queue.get()
+            if batch is None:
+                return
+            # If the worker fell behind, play the frames it missed as one batch
+            while True:
+                try:
+                    more = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+                if more is None:
+                    self._dispatch(batch)
+                    return
+                self.late += 1
+                for name, count in more.items():
+                    if name in batch:
+                        # Also requested by an earlier frame of the batch
+                        self.merged += 1
+                        batch[name] += count
+                    else:
+                        batch[name] = count
+            self._dispatch(batch)
+
+    def _dispatch(self, batch):
+        """Play one batch of {name: request count}, at most one new voice per sound."""
+        if not self.mixer:
+            return
+
+        policies = self.policies
+        for name in sorted(batch, key=lambda name: policies[name]['priority'], reverse=True):
+            policy = policies[name]
+            sound = self.sounds[name]
+            busy = {i for i, channel in enumerate(self.channels) if channel.get_busy()}
+            if sum(1 for i in busy if self.channels[i].get_sound() is sound) >= policy['voices']:
+                self.dropped += 1
+                continue
+
+            index = self._free_channel(self.reserved[name], busy)
+            if index is None:
+                index = self._free_channel(self.shared, busy)
+            if index is None:
+                # Take over the least important shared voice, if it matters less than this one
+                index = min(self.shared, key=self.channel_priority.__getitem__, default=None)
+                if index is None or self.channel_priority[index] >= policy['priority']:
+                    self.dropped += 1
+                    continue
+                self.stolen += 1
+
+            self.channels[index].play(sound)
+            self.channel_priority[index] = policy['priority']
+            self.played += 1
+
+    @staticmethod
+    def _free_channel(indices, busy):
+        """Return the first channel in `indices` that is not playing, or None."""
+        for index in indices:
+            if index not in busy:
+                return index
+        return None
+
+    def close(self):
+        """Play anything still queued and stop the worker thread."""
+        self.end_frame()
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def stats(self):
+        """Return the request, playback and drop counters."""
+        return {
+            'requested': self.requested,
+            'coalesced': self.coalesced,
+            'merged': self.merged,
+            'played': self.played,
+            'stolen': self.stolen,
+            'dropped': self.dropped,
+            'late_batches': self.late,
+        }
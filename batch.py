@@ -0,0 +1,98 @@
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from headless import HeadlessEngine, POLICIES, SHOP_POLICIES
+
+
+def run_game(seed, policy='random', ticks=36000, level=1, shop='none'):
+    """Play one seeded headless game and return its report."""
+    # The game and the input policy are both seeded, so the whole run is a pure function of the seed
+    engine = HeadlessEngine(POLICIES[policy](seed), level=level, shop_policy=SHOP_POLICIES[shop], seed=seed)
+    report = engine.run(ticks)
+    report['seed'] = seed
+    report['worker'] = os.getpid()
+    return report
+
+
+def _run_job(job):
+    """Unpack a job tuple for ProcessPoolExecutor.map."""
+    return run_game(*job)
+
+
+def summarize(games):
+    """Aggregate per-game reports into balance and throughput statistics."""
+    summary = {'games': len(games)}
+    for key in ('level', 'score', 'coins', 'lives_lost', 'ticks'):
+        values = [game[key] for game in games]
+        summary[key] = {
+            'mean': statistics.fmean(values),
+            'median': statistics.median(values),
+            'min': min(values),
+            'max': max(values),
+        }
+
+    # How often each achievement was unlocked
+    achievements = {}
+    for game in games:
+        for key in game['achievements']:
+            achievements[key] = achievements.get(key, 0) + 1
+    summary['achievements'] = {key: count / len(games) for key, count in sorted(achievements.items())}
+
+    # Ticks per second for each worker process
+    workers = {}
+    for game in games:
+        ticks, seconds = workers.get(game['worker'], (0, 0.0))
+        workers[game['worker']] = (ticks + game['ticks'], seconds + game['seconds'])
+    summary['ticks_per_second_per_worker'] = [
+        ticks / seconds if seconds else 0.0 for ticks, seconds in workers.values()
+    ]
+    summary['ticks_per_second_total'] = sum(summary['ticks_per_second_per_worker'])
+    return summary
+
+
+def run_batch(seeds, policy='random', ticks=36000, level=1, shop='none', workers=None):
+    """Run one game per seed across a process pool.
+
+    Results come back in seed order and each game depends only on its seed,
+    so the same seed list always gives the same statistics.
+    """
+    jobs = [(seed, policy, ticks, level, shop) for seed in seeds]
+    start = time.perf_counter()
+    if workers == 1:
+        games = [_run_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            games = list(executor.map(_run_job, jobs))
+    wall_seconds = time.perf_counter() - start
+
+    summary = summarize(games)
+    summary['wall_seconds'] = wall_seconds
+    summary['ticks_per_second_wall'] = sum(game['ticks'] for game in games) / wall_seconds
+    return {'games': games, 'summary': summary}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run many seeded headless games in parallel")
+    parser.add_argument('--games', type=int, default=16, help="number of games (seeds start..start+games-1)")
+    parser.add_argument('--start-seed', type=int, default=0, help="first seed")
+    parser.add_argument('--policy', choices=list(POLICIES), default='random', help="input policy")
+    parser.add_argument('--ticks', type=int, default=36000, help="maximum ticks per game")
+    parser.add_argument('--level', type=int, default=1, help="level to start at")
+    parser.add_argument('--shop', choices=list(SHOP_POLICIES), default='none', help="what to buy between waves")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: one per core)")
+    parser.add_argument('--output', help="write the full results as JSON to this file")
+    args = parser.parse_args()
+
+    seeds = range(args.start_seed, args.start_seed + args.games)
+    results = run_batch(seeds, args.policy, args.ticks, args.level, args.shop, args.workers)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    json.dump(results['summary'], sys.stdout, indent=2)
+    print()
@@ -0,0 +1,572 @@
+import argparse
+import os
+import random
+import time
+
+# Run without opening a window or an audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import Explorer
+from enemy_wave import EnemyWave
+from pools import EntityPool
+
+
+def populate(game, count, rng, height):
+    """Fill the game with `count` player bullets, enemies and enemy bullets spread over `height` pixels."""
+    def point():
+        return [rng.uniform(0, Explorer.WIDTH), rng.uniform(0, height)]
+
+    # A fresh world sized for the run, so large counts never hit the game's capacities
+    game.use_world(Explorer.create_world(count, count, count, max(count // 10, 1)))
+    energy = Explorer.POWER_UP_TYPES.index('energy')
+    for _ in range(count):
+        x, y = point()
+        game.player_bullets.spawn(x=x, y=y)
+        x, y = point()
+        game.enemy_bullets.spawn(x=x, y=y)
+        x, y = point()
+        game.enemies.spawn(x=x, y=y, direction=1, type=rng.randint(0, 2), attack_timer=60)
+    for _ in range(count // 10):
+        x, y = point()
+        game.power_ups.spawn(x=x, y=y, type=energy, speed=2)
+    # As if everything had moved this tick, so bullets are swept along a full step
+    for archetype in game.world:
+        archetype.moved_seq = archetype.next_seq
+
+
+def bench_collisions(sizes=(250, 500, 1000, 2000, 4000, 8000), repeats=5):
+    """Time check_collisions at increasing entity counts to show how it scales.
+
+    The play field grows with the entity count so density stays constant,
+    so a cost that grows linearly stays flat per entity.
+    """
+    game = Explorer.SpaceExplorer()
+    game.sound_on = False
+    rng = random.Random(1234)
+
+    print(f"{'entities':>10} {'ms/call':>10} {'us/entity':>10}")
+    results = []
+    for size in sizes:
+        best = None
+        for _ in range(repeats):
+            populate(game, size, rng, Explorer.HEIGHT * size / 250)
+            game.particles.clear()
+            game.boss = None
+            start = time.perf_counter()
+            game.check_collisions()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+
+        # Entities = bullets + enemies + enemy bullets + power-ups
+        entities = size * 3 + size // 10
+        results.append((entities, best))
+        print(f"{entities:>10} {best * 1000:>10.2f} {best * 1e6 / entities:>10.2f}")
+    return results
+
+
+def bench_particles(sizes=(1000, 10000, 50000, 100000), frames=200):
+    """Time ParticlePool.update with large numbers of live particles."""
+    from particles import ParticlePool
+
+    rng = random.Random(1234)
+    print(f"{'particles':>10} {'ms/update':>10}")
+    results = []
+    for size in sizes:
+        pool = ParticlePool(capacity=size)
+        # Lifetimes long enough that the pool stays full for the whole run
+        for _ in range(size // 100):
+            pool.emit(
+                (rng.uniform(0, Explorer.WIDTH), rng.uniform(0, Explorer.HEIGHT)), Explorer.RED,
+                [rng.uniform(-3, 3) for _ in range(100)],
+                [rng.uniform(-3, 3) for _ in range(100)],
+                [rng.uniform(frames + 1, frames * 2) for _ in range(100)],
+                [rng.uniform(1, 3) for _ in range(100)]
+            )
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            pool.update()
+        elapsed = (time.perf_counter() - start) / frames
+        results.append((size, elapsed))
+        print(f"{size:>10} {elapsed * 1000:>10.3f}")
+    return results
+
+
+def bench_enemies(sizes=(100, 1000, 5000, 10000), frames=300):
+    """Time the enemy wave update (movement, edge bounce, timers and firing) at increasing wave sizes."""
+    from waves import CAMPAIGN_VERSION, Campaign
+
+    print(f"{'enemies':>10} {'ms/frame':>10} {'fired':>10}")
+    results = []
+    for size in sizes:
+        rng = random.Random(1234)
+        formation = {'count': size, 'columns': 50, 'spacing': [15, 10]}
+        campaign = Campaign({'version': CAMPAIGN_VERSION, 'waves': [{'formations': [formation]}]}, '<benchmark>')
+        wave = EnemyWave(size)
+        wave.spawn_wave(campaign.wave(1), rng)
+        bullets = EntityPool(size, Explorer.BULLET_FIELDS)
+
+        fired = 0
+        start = time.perf_counter()
+        for _ in range(frames):
+            fire_x, fire_y = wave.update(2, 30, Explorer.WIDTH - 30, rng)
+            fired += len(fire_x)
+            bullets.kill_many(bullets.spawn_many(len(fire_x), x=fire_x, y=fire_y + 15))
+        elapsed = (time.perf_counter() - start) / frames
+        results.append((size, elapsed))
+        print(f"{size:>10} {elapsed * 1000:>10.3f} {fired // frames:>10}")
+    return results
+
+
+def bench_sprites(sizes=(1000, 5000, 20000), frames=50):
+    """Compare drawing bullets one blit at a time from their own image against one batched atlas call."""
+    import numpy as np
+
+    game = Explorer.SpaceExplorer(headless=True)
+    screen = game.screen
+    atlas = game.atlas
+    bullet_img = game.create_bullet_img()  # Standalone per-pixel alpha image, as before the atlas
+    rng = np.random.default_rng(1234)
+
+    print(f"{'sprites':>10} {'blit ms':>10} {'blits ms':>10} {'speedup':>10}")
+    results = []
+    for size in sizes:
+        x = rng.uniform(0, Explorer.WIDTH, size)
+        y = rng.uniform(0, Explorer.HEIGHT, size)
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            for bullet_x, bullet_y in zip(x.tolist(), y.tolist()):
+                screen.blit(bullet_img, (bullet_x - 3, bullet_y - 6))
+        single = (time.perf_counter() - start) / frames
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            atlas.draw(screen, 'bullet', x, y)
+        batched = (time.perf_counter() - start) / frames
+
+        results.append((size, single, batched))
+        print(f"{size:>10} {single * 1000:>10.3f} {batched * 1000:>10.3f} {single / batched:>9.1f}x")
+    return results
+
+
+def _legacy_sound_samples(frequency, duration):
+    """The original per-sample pure-Python sine loop, kept as the baseline."""
+    import math
+
+    sample_rate = 44100
+    buf = bytearray()
+    for i in range(int(duration * sample_rate)):
+        t = i / sample_rate
+        buf.append(int(127 + 127 * math.sin(2 * math.pi * frequency * t) * (1 - t / duration)))
+    return bytes(buf)
+
+
+def bench_audio(repeats=5):
+    """Compare startup cost of the game's sound set: Python loop vs NumPy synthesis vs disk cache."""
+    import shutil
+    import tempfile
+
+    import pygame
+    from synth import SoundBank
+
+    pygame.mixer.init()
+    sound_set = [(220, 0.1), (100, 0.3), (440, 0.2), (150, 0.2)]
+    cache_dir = tempfile.mkdtemp(prefix="space_explorer_sounds_")
+
+    def best_of(func):
+        best = None
+        for _ in range(repeats):
+            start = time.perf_counter()
+            func()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+        return best
+
+    def legacy():
+        for frequency, duration in sound_set:
+            pygame.mixer.Sound(buffer=_legacy_sound_samples(frequency, duration))
+
+    def synthesized():
+        bank = SoundBank(use_cache=False)
+        for frequency, duration in sound_set:
+            bank.sound(frequency, duration)
+
+    def cached():
+        bank = SoundBank(cache_dir)
+        for frequency, duration in sound_set:
+            bank.sound(frequency, duration)
+
+    try:
+        cached()  # Populate the cache
+        results = {
+            'legacy': best_of(legacy),
+            'numpy': best_of(synthesized),
+            'cached': best_of(cached),
+        }
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"{'method':>10} {'ms':>10} {'speedup':>10}")
+    for name, elapsed in results.items():
+        print(f"{name:>10} {elapsed * 1000:>10.3f} {results['legacy'] / elapsed:>9.1f}x")
+    return results
+
+
+def bench_stars(sizes=(100, 1000, 5000, 20000), frames=300):
+    """Time moving and drawing the starfield at increasing star counts."""
+    import pygame
+    from starfield import Starfield
+
+    screen = pygame.Surface((Explorer.WIDTH, Explorer.HEIGHT))
+    print(f"{'stars':>10} {'ms/frame':>10}")
+    results = []
+    for size in sizes:
+        starfield = Starfield(Explorer.WIDTH, Explorer.HEIGHT, random.Random(1234))
+        starfield.add_stars(size)
+        starfield.draw(screen)  # Render the initial tiles
+
+        start = time.perf_counter()
+        for _ in range(frames):
+            screen.fill(Explorer.BLACK)
+            starfield.update()
+            starfield.draw(screen)
+        elapsed = (time.perf_counter() - start) / frames
+        results.append((size, elapsed))
+        print(f"{size:>10} {elapsed * 1000:>10.3f}")
+    return results
+
+
+def bench_dispatch(bursts=(1, 10, 50, 200), frames=120):
+    """Game-thread cost of a frame's sound requests: direct Sound.play vs the AudioDispatcher."""
+    import pygame
+    from audio import AudioDispatcher
+    from synth import SoundBank
+
+    pygame.mixer.init()
+    bank = SoundBank()
+    sounds = {
+        'shoot': bank.sound(220, 0.1),
+        'explosion': bank.sound(100, 0.3),
+        'powerup': bank.sound(440, 0.2),
+        'hit': bank.sound(150, 0.2),
+    }
+    names = list(sounds)
+    results = []
+    print(f"{'requests':>10} {'direct ms':>10} {'queued ms':>10} {'played':>8} {'coalesced':>10} {'merged':>8} "
+          f"{'dropped':>8}")
+    for burst in bursts:
+        # A kill-heavy frame: mostly explosions, some pickups and shots
+        requests = [names[1] if i % 4 else names[i // 4 % len(names)] for i in range(burst)]
+
+        pygame.mixer.stop()
+        start = time.perf_counter()
+        for _ in range(frames):
+            for name in requests:
+                sounds[name].play()
+        direct = (time.perf_counter() - start) / frames
+
+        pygame.mixer.stop()
+        dispatcher = AudioDispatcher(sounds)
+        start = time.perf_counter()
+        for _ in range(frames):
+            for name in requests:
+                dispatcher.play(name)
+            dispatcher.end_frame()
+        queued = (time.perf_counter() - start) / frames
+        dispatcher.close()
+
+        stats = dispatcher.stats()
+        results.append((burst, direct, queued, stats))
+        print(f"{burst:>10} {direct * 1000:>10.3f} {queued * 1000:>10.3f} {stats['played']:>8} "
+              f"{stats['coalesced']:>10} {stats['merged']:>8} {stats['dropped']:>8}")
+    return results
+
+
+def bench_tunneling(speeds=(10, 20, 40, 80, 160), bullets=1000):
+    """Share of bullets fired up through a row of enemies that hit one: point tests vs swept tests."""
+    import numpy as np
+    from sweep import swept_pairs
+
+    rng = np.random.default_rng(1234)
+    enemy_x = np.arange(20, Explorer.WIDTH, 40, dtype=np.float64)
+    enemy_y = np.full(len(enemy_x), 100.0)
+
+    print(f"{'speed':>10} {'point':>10} {'swept':>10}")
+    results = []
+    for speed in speeds:
+        # Bullets start anywhere below the row and fly up until they leave the screen
+        x = rng.uniform(0, Explorer.WIDTH, bullets)
+        y = rng.uniform(150, Explorer.HEIGHT, bullets)
+        point = np.zeros(bullets, dtype=bool)
+        swept = np.zeros(bullets, dtype=bool)
+        while (y > 0).any():
+            y -= speed
+            point[swept_pairs(x, y, y, enemy_x, enemy_y, 20, 20)[0]] = True
+            swept[swept_pairs(x, y + speed, y, enemy_x, enemy_y, 20, 20)[0]] = True
+        results.append((speed, point.mean(), swept.mean()))
+        print(f"{speed:>10} {point.mean():>10.1%} {swept.mean():>10.1%}")
+    return results
+
+
+def bench_waves(levels=10000):
+    """Campaign load time, per-level compile vs cached lookup, and memory held by the wave LRU."""
+    from waves import DEFAULT_CAMPAIGN, load_campaign
+
+    start = time.perf_counter()
+    campaign = load_campaign(DEFAULT_CAMPAIGN)
+    load = time.perf_counter() - start
+
+    # Walk a very long campaign: every level is compiled once, then looked up again
+    start = time.perf_counter()
+    for level in range(1, levels + 1):
+        campaign.wave(level)
+    compile_time = (time.perf_counter() - start) / levels
+    start = time.perf_counter()
+    for _ in range(levels):
+        campaign.wave(levels)
+    lookup_time = (time.perf_counter() - start) / levels
+
+    stats = campaign.stats()
+    print(f"load: {load * 1000:.3f} ms")
+    print(f"compile: {compile_time * 1e6:.2f} us/level, cached: {lookup_time * 1e6:.3f} us/level")
+    print(f"cached waves: {stats['compiled']} of {levels}, {stats['bytes'] / 1024:.0f} KiB")
+    return load, compile_time, lookup_time, stats
+
+
+def bench_ecs(sizes=(100, 1000, 10000), ticks=60):
+    """Count the Python calls a tick of the update and draw systems makes as the world grows.
+
+    Systems work on whole archetypes, so the count stays flat while the
+    number of entities goes up a hundredfold; only the NumPy work grows.
+    """
+    import sys
+
+    game = Explorer.SpaceExplorer(headless=True)
+    game.sound_on = False
+    calls = [0]
+
+    def count(frame, event, arg):
+        if event in ('call', 'c_call'):
+            calls[0] += 1
+
+    print(f"{'entities':>10} {'calls/tick':>11} {'ms/tick':>10}")
+    results = []
+    for size in sizes:
+        rng = random.Random(1234)
+        populate(game, size, rng, Explorer.HEIGHT)
+        game.state = Explorer.PLAYING
+        game.boss = None
+        # No kills, hits or shots, so every tick does the same work: what is
+        # left is the systems' own per-archetype overhead
+        game.player_bullets.clear()
+        game.enemies.attack_timer[:] = 10 ** 9
+        game.player_pos = [-1000, -1000]
+
+        calls[0] = 0
+        sys.setprofile(count)
+        for _ in range(ticks):
+            game.update_game()
+            game.draw_game()
+        sys.setprofile(None)
+        per_tick = calls[0] // ticks
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            game.update_game()
+            game.draw_game()
+        elapsed = (time.perf_counter() - start) / ticks
+
+        entities = sum(len(archetype) for archetype in game.world)
+        results.append((entities, per_tick, elapsed))
+        print(f"{entities:>10} {per_tick:>11} {elapsed * 1000:>10.2f}")
+    return results
+
+
+def bench_pipeline(sizes=(100, 1000, 4000), frames=120):
+    """Frame time of the sequential loop vs the pipelined one (simulation on a worker thread).
+
+    Each frame simulates one tick of a dense, boss-heavy world and draws
+    it. The pipelined loop also reports how often and how long the main
+    thread stalled waiting for the simulation. The overlap needs a second
+    core; on one core the pipeline can only add its hand-off cost.
+    """
+    from pipeline import SimulationPipeline
+
+    print(f"cores: {os.cpu_count()}")
+    print(f"{'entities':>10} {'seq ms':>8} {'pipe ms':>8} {'speedup':>8} {'stalls':>7} {'stall/frame':>11}")
+    results = []
+    for size in sizes:
+        timings = []
+        for pipelined in (False, True):
+            game = Explorer.SpaceExplorer(headless=True, seed=1234)
+            game.sound_on = False
+            game.start_game(5)
+            populate(game, size, random.Random(1234), Explorer.HEIGHT)
+            game.player_bullets.clear()
+            game.lives = 10 ** 9
+            pipeline = SimulationPipeline(game) if pipelined else None
+
+            start = time.perf_counter()
+            for _ in range(frames):
+                if pipeline:
+                    pipeline.submit(1, Explorer.INPUT_FIRE)
+                    pipeline.draw()
+                    pipeline.wait()
+                else:
+                    game.simulate(1, Explorer.INPUT_FIRE)
+                    game.draw_game()
+            timings.append((time.perf_counter() - start) / frames)
+            if pipeline:
+                pipeline.close()
+                stats = pipeline.stats()
+
+        sequential, pipelined = timings
+        entities = size * 3 + size // 10
+        results.append((entities, sequential, pipelined, stats))
+        print(f"{entities:>10} {sequential * 1000:>8.2f} {pipelined * 1000:>8.2f} "
+              f"{sequential / pipelined:>7.2f}x {stats['stalls']:>7} {stats['stall_ms'] / frames:>8.3f} ms")
+    return results
+
+
+def bench_netplay(losses=(0.0, 0.05, 0.2), players=2, seconds=5.0, latency=0.03, jitter=0.01):
+    """Bandwidth and responsiveness of a co-op session over the loopback network at several packet loss rates.
+
+    Runs a real server and clients in one event loop, with `latency`
+    seconds (plus up to `jitter`) each way. Bandwidth is per player;
+    prediction error is how far, in pixels, the client's predicted ship
+    was from the server's once the server confirmed the input.
+    """
+    import asyncio
+    import netplay
+
+    print(f"{'loss':>6} {'down kbps':>10} {'up kbps':>8} {'snap B':>7} {'full':>5} {'rtt ms':>7} {'p95 ms':>7} "
+          f"{'pred err':>9}")
+    results = []
+    for loss in losses:
+        report = asyncio.run(netplay.loopback_session(players, seconds, loss, latency, jitter))
+        clients = report['clients']
+        rtt = sum(client['rtt_ms'] for client in clients) / players
+        p95 = max(client['rtt_p95_ms'] for client in clients)
+        error = sum(client['prediction_error'] for client in clients) / players
+        server = report['server']
+        results.append((loss, report))
+        print(f"{loss:>6.0%} {report['down_kbps']:>10.1f} {report['up_kbps']:>8.1f} "
+              f"{server['mean_snapshot_bytes']:>7.0f} {server['full_snapshots']:>5} {rtt:>7.1f} {p95:>7.1f} "
+              f"{error:>9.2f}")
+    return results
+
+
+def bench_stream(levels=(1, 10, 30), ticks=3600, seeks=200):
+    """Size of a state stream recording per second of play, and the cost of playing it back and scrubbing it.
+
+    Records `ticks` ticks of the autopilot from each starting level (with
+    endless lives), with and without particles, then decodes every tick in
+    order and seeks to random ticks.
+    """
+    import shutil
+    import tempfile
+
+    from headless import HeadlessEngine, autopilot_policy
+    from state_stream import StateStreamReader
+
+    directory = tempfile.mkdtemp(prefix="space_explorer_stream_")
+    print(f"{'level':>6} {'particles':>9} {'KB/s':>7} {'keyframes':>9} {'play us/tick':>12} {'seek ms':>8} "
+          f"{'max ms':>7}")
+    results = []
+    try:
+        for level in levels:
+            for particles in (False, True):
+                path = os.path.join(directory, f"{level}-{particles}.sxt")
+                engine = HeadlessEngine(autopilot_policy, level=level, seed=1, stream=path,
+                                        stream_particles=particles)
+                engine.game.lives = 10 ** 9
+                engine.run(ticks)
+                engine.close()
+
+                reader = StateStreamReader(path)
+                start = time.perf_counter()
+                for _ in reader.frames():
+                    pass
+                play = (time.perf_counter() - start) / reader.ticks
+
+                rng = random.Random(1234)
+                timings = []
+                for _ in range(seeks):
+                    start = time.perf_counter()
+                    reader.seek(rng.randrange(reader.ticks))
+                    timings.append(time.perf_counter() - start)
+                stats = reader.stats()
+                reader.close()
+
+                seek = sum(timings) / seeks
+                results.append((level, particles, stats, play, seek, max(timings)))
+                print(f"{level:>6} {str(particles):>9} {stats['kb_per_second']:>7.2f} {stats['keyframes']:>9} "
+                      f"{play * 1e6:>12.1f} {seek * 1000:>8.3f} {max(timings) * 1000:>7.3f}")
+    finally:
+        shutil.rmtree(directory, ignore_errors=True)
+    return results
+
+
+def bench_scaling(windows=((640, 480), (800, 600), (1280, 720), (1600, 1200)), frames=120):
+    """Time scaling frames to windows below, at and above the logical size, full and dirty-rect."""
+    from framebuffer import SCALERS
+
+    print(f"{'window':>10} {'scaler':>8} {'mode':>6} {'scale':>6} {'ms/frame':>10}")
+    results = []
+    for window in windows:
+        for scaler in SCALERS:
+            for mode in (Explorer.RENDER_FULL, Explorer.RENDER_DIRTY):
+                game = Explorer.SpaceExplorer(seed=1, render_mode=mode, window_size=window, scaler=scaler)
+                game.start_game(5)
+                game.lives = 10 ** 9
+                display = game.display
+
+                elapsed = 0.0
+                for _ in range(frames):
+                    game.update_state()
+                    start = time.perf_counter()
+                    game.present()
+                    elapsed += time.perf_counter() - start
+                elapsed /= frames
+                # The window corners must map back onto the corners of the logical frame
+                corners = (display.to_logical(display.target_rect.topleft),
+                           display.to_logical(display.target_rect.bottomright))
+                if corners != ((0, 0), (Explorer.WIDTH, Explorer.HEIGHT)):
+                    raise RuntimeError(f"{window} {scaler}: window corners map to {corners}")
+
+                results.append((window, scaler, mode, display.scale, elapsed))
+                print(f"{'%dx%d' % window:>10} {scaler:>8} {mode:>6} {display.scale:>6.2f} {elapsed * 1000:>10.3f}")
+    return results
+
+
+BENCHMARKS = {
+    'collisions': bench_collisions,
+    'tunneling': bench_tunneling,
+    'particles': bench_particles,
+    'enemies': bench_enemies,
+    'audio': bench_audio,
+    'dispatch': bench_dispatch,
+    'stars': bench_stars,
+    'sprites': bench_sprites,
+    'waves': bench_waves,
+    'ecs': bench_ecs,
+    'pipeline': bench_pipeline,
+    'netplay': bench_netplay,
+    'stream': bench_stream,
+    'scaling': bench_scaling,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Space Explorer micro-benchmarks")
+    parser.add_argument('names', nargs='*', help=f"benchmarks to run: {', '.join(BENCHMARKS)} (default: all)")
+    args = parser.parse_args()
+    for name in args.names:
+        if name not in BENCHMARKS:
+            parser.error(f"unknown benchmark: {name}")
+
+    for name in args.names or BENCHMARKS:
+        print(f"== {name} ==")
+        BENCHMARKS[name]()
@@ -0,0 +1,70 @@
+import pygame
+
+
+class DirtyRectTracker:
+    """Remembers the rects drawn each frame so only changed areas are cleared and pushed to the display.
+
+    A sprite that moves leaves behind the area it covered last frame and
+    paints the area it covers now; clearing the first set and updating both
+    is enough to keep the screen correct without touching the rest of it.
+    """
+
+    def __init__(self, size, enabled=True):
+        """Create a tracker for a screen of the given size."""
+        self.bounds = pygame.Rect((0, 0), size)
+        self.enabled = enabled
+        self.previous = []
+        self.current = []
+        self.full = True
+
+        # Stats for the last presented frame
+        self.frame_rects = 0
+        self.frame_pixels = 0
+
+    def add(self, rect):
+        """Record a rect drawn this frame and return it unchanged."""
+        if self.enabled:
+            self.current.append(rect)
+        return rect
+
+    def invalidate(self):
+        """Force the next frame to clear and push the whole screen."""
+        self.full = True
+
+    def clear(self, surface, color):
+        """Restore the background where last frame's sprites were (or everywhere, after invalidate)."""
+        if self.full or not self.enabled:
+            surface.fill(color)
+            return
+        for rect in self.previous:
+            surface.fill(color, rect)
+
+    def present(self):
+        """Return the rects to push to the display (None for the whole screen) and start a new frame."""
+        if self.full or not self.enabled:
+            rects = None
+            self.frame_rects = 1
+            self.frame_pixels = self.bounds.w * self.bounds.h
+        else:
+            rects = []
+            pixels = 0
+            for rect in self.previous + self.current:
+                rect = rect.clip(self.bounds)
+                if rect.w and rect.h:
+                    rects.append(rect)
+                    pixels += rect.w * rect.h
+            self.frame_rects = len(rects)
+            self.frame_pixels = pixels
+
+        self.previous = self.current
+        self.current = []
+        self.full = False
+        return rects
+
+    def stats(self):
+        """Return the rect count, pixel area and screen fraction pushed last frame."""
+        return {
+            'rects': self.frame_rects,
+            'pixels': self.frame_pixels,
+            'fraction': self.frame_pixels / (self.bounds.w * self.bounds.h),
+        }
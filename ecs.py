@@ -0,0 +1,121 @@
+from pools import EntityPool
+
+
+class Archetype(EntityPool):
+    """One kind of entity in a World: a pool whose entities all have the same components.
+
+    Per-entity components are the pool's contiguous NumPy arrays. Shared
+    components hold one value for every entity of the archetype (a
+    velocity, a sprite, a draw layer), so systems read them once per
+    archetype instead of once per entity.
+    """
+
+    def __init__(self, name, capacity, components, shared=None):
+        """Create archetype `name` with room for `capacity` entities of {component: dtype}."""
+        super().__init__(capacity, components)
+        self.name = name
+        self.components = frozenset(components)
+        self.shared = dict(shared or {})
+        self.moved_seq = 0  # Entities from this seq on were spawned after the last movement pass
+
+    def has(self, components=(), shared=()):
+        """Return whether the archetype has every listed per-entity and shared component."""
+        return self.components.issuperset(components) and all(name in self.shared for name in shared)
+
+    def mirror(self):
+        """Return an empty archetype with the same name, capacity, components and shared values."""
+        fields = {name: getattr(self, name).dtype for name in self.field_names}
+        return Archetype(self.name, self.capacity, fields, self.shared)
+
+    def copy_to(self, other):
+        """Copy every entity into `other`, a mirror() of this archetype that is only read from."""
+        top = self.top
+        other.alive[top:other.top] = False
+        other.alive[:top] = self.alive[:top]
+        other.seq[:top] = self.seq[:top]
+        for name in self.field_names:
+            getattr(other, name)[:top] = getattr(self, name)[:top]
+        other.top = top
+        other.count = self.count
+        other.next_seq = self.next_seq
+        other.moved_seq = self.moved_seq
+
+
+class World:
+    """Archetypes plus the systems that run over them.
+
+    Systems are callables (usually bound game methods) registered in named
+    schedules such as 'update' and 'draw' and run in registration order.
+    They find their entities with query(), whose results are cached until
+    an archetype is added, so a system works on each matching archetype's
+    arrays once rather than walking entities one by one.
+    """
+
+    def __init__(self):
+        """Create an empty world."""
+        self.archetypes = {}
+        self.queries = {}
+        self.schedules = {}
+
+    def add(self, archetype):
+        """Add (or replace by name) an archetype and return it."""
+        self.archetypes[archetype.name] = archetype
+        self.queries.clear()
+        return archetype
+
+    def __getitem__(self, name):
+        return self.archetypes[name]
+
+    def __iter__(self):
+        return iter(self.archetypes.values())
+
+    def query(self, *components, shared=()):
+        """Return the archetypes (in the order they were added) with all the given components."""
+        key = (components, shared)
+        result = self.queries.get(key)
+        if result is None:
+            result = self.queries[key] = tuple(
+                archetype for archetype in self.archetypes.values() if archetype.has(components, shared)
+            )
+        return result
+
+    def system(self, schedule, name, func):
+        """Append system `func` to a schedule under `name`."""
+        # The profiler phase label is built once here rather than on every run
+        self.schedules.setdefault(schedule, []).append((name, func, f"{schedule}.{name}"))
+
+    def run(self, schedule, lap=None, skip=()):
+        """Run every system of a schedule but those named in `skip`.
+
+        `lap` (e.g. FrameProfiler.lap) is called after each system with a
+        '<schedule>.<name>' phase label. In pipelined mode the 'update'
+        schedule runs on the worker thread without a lap, so its phases are
+        not timed there; the main thread's sync phase covers them instead.
+        """
+        for name, func, label in self.schedules.get(schedule, ()):
+            if name in skip:
+                continue
+            func()
+            if lap is not None:
+                lap(label)
+
+    def mirror(self):
+        """Return a world (without systems) of empty mirrors of every archetype, for copy_to()."""
+        world = World()
+        for archetype in self.archetypes.values():
+            world.add(archetype.mirror())
+        return world
+
+    def copy_to(self, other):
+        """Copy every archetype's entities into the matching archetype of a mirror() world."""
+        for name, archetype in self.archetypes.items():
+            archetype.copy_to(other.archetypes[name])
+
+    def clear(self):
+        """Remove every entity from every archetype."""
+        for archetype in self.archetypes.values():
+            archetype.clear()
+
+    def stats(self):
+        """Return the pool statistics of every archetype."""
+        return {name: archetype.stats() for name, archetype in self.archetypes.items()}
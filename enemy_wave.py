@@ -0,0 +1,67 @@
+import numpy as np
+
+from ecs import Archetype
+
+# Per-enemy fields of a wave
+ENEMY_FIELDS = {'x': float, 'y': float, 'direction': np.int8, 'type': np.int8, 'attack_timer': np.int32}
+
+
+class EnemyWave(Archetype):
+    """Archetype of regular enemies whose movement, edge bounce and firing are updated in batches.
+
+    Every live enemy is advanced with a handful of array operations per
+    frame, so a wave of thousands costs about the same Python overhead as a
+    wave of ten. Only the enemies that fire call back into Python, to roll
+    their next cooldown from the game's RNG in spawn order.
+    """
+
+    def __init__(self, capacity, shared=None):
+        """Preallocate room for `capacity` enemies."""
+        super().__init__('enemies', capacity, ENEMY_FIELDS, shared)
+
+    def spawn_wave(self, wave, rng):
+        """Spawn the formations of a compiled waves.Wave, rolling each enemy's type and first attack delay."""
+        enemy_types = []
+        timers = []
+        for count, types, delay_min, delay_max in wave.groups:
+            for _ in range(count):
+                enemy_types.append(rng.randint(0, types - 1))
+                timers.append(rng.randint(delay_min, delay_max))
+
+        return self.spawn_many(
+            len(wave),
+            x=wave.x,
+            y=wave.y,
+            direction=1,
+            type=enemy_types,
+            attack_timer=timers
+        )
+
+    def update(self, speed, left, right, rng, drop=20, cooldown=(60, 120)):
+        """Advance the wave one frame and return the (x, y) arrays of the enemies that fire.
+
+        Enemies move `speed` pixels in their direction; past `left` or `right`
+        they turn around and drop down. A firing enemy's timer is reset to
+        rng.randint(*cooldown).
+        """
+        slots = self.active()
+        if not len(slots):
+            return self.x[slots], self.y[slots]
+
+        # Move horizontally
+        x = self.x[slots] + self.direction[slots] * speed
+        self.x[slots] = x
+
+        # Change direction and move down a bit at the screen edges
+        bounced = slots[(x < left) | (x > right)]
+        self.direction[bounced] *= -1
+        self.y[bounced] += drop
+
+        # Count down attack timers and re-arm the ones that fire
+        timers = self.attack_timer[slots] - 1
+        firing = timers <= 0
+        firing_slots = slots[firing]
+        if len(firing_slots):
+            timers[firing] = [rng.randint(*cooldown) for _ in range(len(firing_slots))]
+        self.attack_timer[slots] = timers
+        return self.x[firing_slots], self.y[firing_slots]
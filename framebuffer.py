@@ -0,0 +1,78 @@
+import pygame
+
+# How the logical frame is scaled to the window
+SCALE_INTEGER = 'integer'  # Largest whole-number factor that fits, nearest neighbour, letterboxed
+SCALE_NEAREST = 'nearest'  # Fill the window (keeping the aspect ratio), nearest neighbour
+SCALE_SMOOTH = 'smooth'    # Fill the window (keeping the aspect ratio), bilinear filtering
+SCALERS = (SCALE_INTEGER, SCALE_NEAREST, SCALE_SMOOTH)
+
+
+class ScaledDisplay:
+    """Offscreen framebuffer at the game's logical resolution, scaled to the window in one pass.
+
+    The game draws into `surface` exactly as it would into an 800x600
+    window; present() then scales the frame into the window, centered with
+    black bars where the aspect ratios differ. With the integer scaler
+    every logical pixel maps to a whole block of window pixels, so
+    dirty-rect frames only rescale the rects that changed. A window
+    smaller than the logical frame has no whole-number factor, so it falls
+    back to fractional nearest-neighbour scaling of the full frame.
+    """
+
+    def __init__(self, window, logical_size, scaler=SCALE_INTEGER):
+        """Create a framebuffer of `logical_size` presented into the `window` display surface."""
+        if scaler not in SCALERS:
+            raise ValueError(f"Unknown scaler: {scaler!r}")
+        self.logical_size = logical_size
+        self.scaler = scaler
+        self.surface = pygame.Surface(logical_size).convert(window)
+        self.resize(window)
+
+    def resize(self, window):
+        """Fit the frame to a (new) window surface and clear the borders."""
+        self.window = window
+        window_w, window_h = window.get_size()
+        logical_w, logical_h = self.logical_size
+        scale = min(window_w / logical_w, window_h / logical_h)
+        self.integer = self.scaler == SCALE_INTEGER and scale >= 1
+        if self.integer:
+            scale = int(scale)
+
+        width = min(round(logical_w * scale), window_w)
+        height = min(round(logical_h * scale), window_h)
+        self.target_rect = pygame.Rect((window_w - width) // 2, (window_h - height) // 2, width, height)
+        # The factor actually drawn, so mouse mapping and dirty rects agree with the picture
+        self.scale = width // logical_w if self.integer else width / logical_w
+        self.target = window.subsurface(self.target_rect)
+        window.fill((0, 0, 0))
+        self.full = True
+
+    def to_logical(self, pos):
+        """Map a window position (e.g. the mouse) to logical coordinates."""
+        logical_w, logical_h = self.logical_size
+        target = self.target_rect
+        return (int((pos[0] - target.x) * logical_w / target.w),
+                int((pos[1] - target.y) * logical_h / target.h))
+
+    def present(self, rects=None):
+        """Scale the frame (or just `rects` of it) into the window and return the window rects to update.
+
+        Returns None when the whole window should be flipped.
+        """
+        full = rects is None or self.full or not self.integer
+        self.full = False
+        if full:
+            if self.scaler == SCALE_SMOOTH:
+                pygame.transform.smoothscale(self.surface, self.target_rect.size, self.target)
+            else:
+                pygame.transform.scale(self.surface, self.target_rect.size, self.target)
+            return None
+
+        scale = self.scale
+        window_rects = []
+        for rect in rects:
+            size = (rect.w * scale, rect.h * scale)
+            dest = pygame.Rect(rect.x * scale, rect.y * scale, *size)
+            pygame.transform.scale(self.surface.subsurface(rect), size, self.target.subsurface(dest))
+            window_rects.append(dest.move(self.target_rect.topleft))
+        return window_rects
@@ -0,0 +1,219 @@
+import argparse
+import os
+import random
+import time
+
+# No window and no audio device: everything runs offscreen
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import Explorer
+from Explorer import (
+    SpaceExplorer, PLAYING, SHOP, GAME_OVER,
+    INPUT_LEFT, INPUT_RIGHT, INPUT_FIRE
+)
+from snapshot import save_file
+from state_stream import StateStreamWriter
+from waves import DEFAULT_CAMPAIGN
+
+
+def idle_policy(game, tick):
+    """Input policy that never touches the controls."""
+    return 0
+
+
+def make_random_policy(seed, hold=10):
+    """Return an input policy that holds a random set of keys for `hold` ticks at a time."""
+    rng = random.Random(seed)
+    state = {'bits': 0}
+
+    def policy(game, tick):
+        if tick % hold == 0:
+            state['bits'] = rng.getrandbits(5)
+        return state['bits']
+    return policy
+
+
+def autopilot_policy(game, tick):
+    """Input policy that chases the nearest target horizontally and keeps firing."""
+    enemies = game.enemies
+    slots = enemies.active()
+    targets = list(zip(enemies.x[slots].tolist(), enemies.y[slots].tolist()))
+    if game.boss:
+        targets.append(game.boss['pos'])
+
+    bits = INPUT_FIRE
+    if targets:
+        x = game.player_pos[0]
+        target_x = min(targets, key=lambda pos: abs(pos[0] - x))[0]
+        if target_x < x - game.player_speed:
+            bits |= INPUT_LEFT
+        elif target_x > x + game.player_speed:
+            bits |= INPUT_RIGHT
+    return bits
+
+
+POLICIES = {
+    'idle': lambda seed: idle_policy,
+    'random': make_random_policy,
+    'autopilot': lambda seed: autopilot_policy,
+}
+
+
+def greedy_shop_policy(game):
+    """Shop policy that keeps buying the most expensive item it can afford."""
+    while True:
+        affordable = [i for i, item in enumerate(game.shop_items) if item["cost"] <= game.coins]
+        if not affordable:
+            return
+        game.buy_item(max(affordable, key=lambda i: game.shop_items[i]["cost"]))
+
+
+SHOP_POLICIES = {
+    'none': None,
+    'greedy': greedy_shop_policy,
+}
+
+
+class HeadlessEngine:
+    """Drives SpaceExplorer's update_game at an uncapped fixed timestep without a display.
+
+    Every call to step() is one simulation tick (one frame of the windowed
+    game at FPS). Nothing is drawn unless render=True. Between waves the
+    optional shop policy gets to spend coins, then the shop is left
+    automatically so a run keeps going from wave to wave.
+    """
+
+    def __init__(self, policy=idle_policy, render=False, level=1, shop_policy=None,
+                 seed=None, record=None, start=True, profile=None, snapshot=None, campaign=DEFAULT_CAMPAIGN,
+                 stream=None, stream_particles=False):
+        """Build a headless game and, unless start=False, start it at the given level.
+        
+        A seed makes the run reproducible; `record` is a path to write a
+        replay of the run to and `profile` a .csv or .jsonl path to log
+        per-tick phase timings to. Given a `snapshot` path the run continues
+        the saved game instead of starting a new one. `campaign` is the
+        level file the waves come from. `stream` is a path to record the
+        state of every tick to (see state_stream.py), with particles if
+        stream_particles=True.
+        """
+        self.game = SpaceExplorer(headless=True, seed=seed, campaign=campaign)
+        self.game.record_path = record
+        if profile:
+            self.game.profiler.open_log(profile)
+        self.policy = policy
+        self.shop_policy = shop_policy
+        self.render = render
+        self.stream = StateStreamWriter(stream, particles=stream_particles, tick_rate=Explorer.FPS) if stream else None
+        self.ticks = 0
+        self.elapsed = 0.0
+        self.lives_lost = 0
+
+        if snapshot:
+            self.game.load_snapshot(snapshot)
+        elif start:
+            self.game.start_game(level)
+
+    @property
+    def finished(self):
+        """True once the player has run out of lives."""
+        return self.game.state == GAME_OVER
+
+    def step(self, bits=None):
+        """Advance the simulation by one tick using `bits` or the engine's input policy."""
+        game = self.game
+        if game.state == SHOP:
+            if self.shop_policy:
+                self.shop_policy(game)
+            game.leave_shop()
+        if game.state != PLAYING:
+            return
+
+        profiler = game.profiler
+        profiler.begin_frame()
+        if bits is None:
+            bits = self.policy(game, self.ticks)
+        lives = game.lives
+        game.apply_input(bits)
+        profiler.lap('input')
+        game.update_game()
+        if game.lives < lives:
+            self.lives_lost += lives - game.lives
+        if self.render:
+            game.draw_game()
+            profiler.lap('draw')
+        if self.stream:
+            self.stream.write(game)
+        if profiler.enabled:
+            profiler.end_frame(game.entity_counts())
+        self.ticks += 1
+
+    def run(self, ticks):
+        """Run up to `ticks` ticks (stopping early on game over) and return a report."""
+        start = time.perf_counter()
+        for _ in range(ticks):
+            if self.finished:
+                break
+            self.step()
+        self.elapsed += time.perf_counter() - start
+        return self.report()
+
+    def close(self):
+        """Finish any replay or state stream being recorded and the profiler log."""
+        self.game.stop_recording()
+        if self.stream:
+            self.stream.close()
+        self.game.profiler.close_log()
+
+    def report(self):
+        """Summarize the run so far, including simulated ticks per second."""
+        game = self.game
+        report = {
+            'ticks': self.ticks,
+            'seconds': self.elapsed,
+            'ticks_per_second': self.ticks / self.elapsed if self.elapsed else 0.0,
+            'simulated_seconds': self.ticks / Explorer.FPS,
+            'level': game.level,
+            'score': game.score,
+            'lives': game.lives,
+            'coins': game.coins,
+            'lives_lost': self.lives_lost,
+            'achievements': [key for key, achievement in game.achievements.items() if achievement["unlocked"]],
+            'game_over': self.finished,
+        }
+        if game.profiler.enabled:
+            report['profile'] = game.profiler.summary()
+        if self.stream:
+            report['stream'] = self.stream.stats()
+        return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run Space Explorer without a display")
+    parser.add_argument('--ticks', type=int, default=36000, help="maximum ticks to simulate")
+    parser.add_argument('--policy', choices=list(POLICIES), default='autopilot', help="input policy")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the game and the random input policy")
+    parser.add_argument('--level', type=int, default=1, help="level to start at")
+    parser.add_argument('--shop', choices=list(SHOP_POLICIES), default='none', help="what to buy between waves")
+    parser.add_argument('--render', action='store_true', help="also draw every frame offscreen")
+    parser.add_argument('--record', metavar='PATH', help="write a replay of the run")
+    parser.add_argument('--stream', metavar='PATH', help="record the state of every tick for spectating")
+    parser.add_argument('--stream-particles', action='store_true', help="include particles in the --stream recording")
+    parser.add_argument('--profile', metavar='PATH', help="log per-tick phase timings to a .csv or .jsonl file")
+    parser.add_argument('--campaign', metavar='PATH', default=DEFAULT_CAMPAIGN, help="campaign file to play")
+    parser.add_argument('--load', metavar='PATH', help="continue from a snapshot instead of starting a new game")
+    parser.add_argument('--save', metavar='PATH', help="snapshot the final state of the run")
+    args = parser.parse_args()
+
+    engine = HeadlessEngine(
+        POLICIES[args.policy](args.seed), render=args.render, level=args.level,
+        shop_policy=SHOP_POLICIES[args.shop], seed=args.seed, record=args.record,
+        profile=args.profile, snapshot=args.load, campaign=args.campaign, stream=args.stream,
+        stream_particles=args.stream_particles
+    )
+    report = engine.run(args.ticks)
+    engine.close()
+    if args.save:
+        save_file(engine.game, args.save)
+    for key, value in report.items():
+        print(f"{key}: {value}")
@@ -0,0 +1,669 @@
+import argparse
+import asyncio
+import math
+import os
+import random
+import struct
+import sys
+import time
+import zlib
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# The server never opens a window or an audio device; this has to be settled
+# before Explorer is imported, since importing it initializes pygame
+if __name__ == "__main__" and sys.argv[1:2] == ['server']:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+from Explorer import GAME_OVER, MAX_PLAYERS, PLAYING, SHOP, SpaceExplorer, step_ship
+from snapshot import SnapshotError, apply, capture
+from waves import DEFAULT_CAMPAIGN
+
+# Co-op over datagrams. The server runs the only real simulation and sends
+# each player the state as a snapshot body (see snapshot.py) XORed against
+# the last snapshot that player acknowledged, compressed. Clients send their
+# input every tick, repeating the latest few so a lost packet costs nothing,
+# and move their own ship right away; when a snapshot confirms an input,
+# the inputs after it are replayed on top of the server's position.
+#
+# Every datagram starts with a message type:
+#   HELLO     client -> server  protocol version, client nonce
+#   WELCOME   server -> client  player index, nonce, players, tick rate
+#   FULL      server -> client  nonce (the game is full or already running)
+#   INPUT     client -> server  newest snapshot tick received, newest input
+#                               seq, count, then one INPUT_* byte per input
+#   SNAPSHOT  server -> client  tick, baseline tick (0: none), the player's
+#                               last applied input seq, body size, delta
+PROTOCOL_VERSION = 1
+DEFAULT_PORT = 5555
+TICK_RATE = 60
+
+MSG_HELLO = 1
+MSG_WELCOME = 2
+MSG_FULL = 3
+MSG_INPUT = 4
+MSG_SNAPSHOT = 5
+
+HELLO = struct.Struct('<BBI')
+WELCOME = struct.Struct('<BBIBH')
+FULL = struct.Struct('<BI')
+INPUT = struct.Struct('<BIIB')
+SNAPSHOT = struct.Struct('<BIIII')
+
+SNAPSHOT_INTERVAL = 2     # Server ticks between snapshots (30 per second)
+INPUT_REDUNDANCY = 8      # Inputs repeated in every INPUT packet
+MAX_INPUT_BACKLOG = 8     # Inputs the server queues per player before skipping ahead
+HISTORY = 64              # Snapshots kept on both sides as delta baselines
+FINAL_SNAPSHOTS = 5       # Copies of the game-over snapshot, in case some are lost
+MAX_DATAGRAM = 65507      # Largest UDP payload
+HELLO_INTERVAL = 0.25     # Seconds between join attempts
+
+
+class NetplayError(Exception):
+    """Raised when joining a co-op game fails."""
+
+
+def encode_delta(body, baseline, level=6):
+    """Return `body` XORed against `baseline` (cut or zero-padded to its length), compressed."""
+    delta = np.frombuffer(body, dtype=np.uint8).copy()
+    common = min(len(body), len(baseline))
+    delta[:common] ^= np.frombuffer(baseline, dtype=np.uint8, count=common)
+    return zlib.compress(delta.tobytes(), level)
+
+
+def decode_delta(payload, size, baseline):
+    """Rebuild the body encode_delta() compressed against the same baseline."""
+    try:
+        delta = np.frombuffer(zlib.decompress(payload), dtype=np.uint8).copy()
+    except zlib.error as error:
+        raise SnapshotError(f"Corrupt snapshot delta: {error}") from None
+    if len(delta) != size:
+        raise SnapshotError("Corrupt snapshot delta (size mismatch)")
+    common = min(size, len(baseline))
+    delta[:common] ^= np.frombuffer(baseline, dtype=np.uint8, count=common)
+    return delta.tobytes()
+
+
+class LoopbackNetwork:
+    """In-process datagram network with configurable loss, latency and jitter.
+
+    Endpoints exchange datagrams through the running event loop exactly
+    like UDP sockets, dropping each one with probability `loss` and
+    delivering the rest after latency + uniform(0, jitter) seconds (so
+    jitter may reorder them). It lets a whole co-op session run, and be
+    measured, on one machine without touching the network.
+    """
+
+    def __init__(self, loss=0.0, latency=0.0, jitter=0.0, seed=None):
+        """Create an empty network; `seed` makes losses and delays reproducible."""
+        self.loss = loss
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = random.Random(seed)
+        self.endpoints = {}
+
+        # Stats
+        self.delivered = 0
+        self.dropped = 0
+
+    def endpoint(self, address):
+        """Create an endpoint reachable at `address` (any hashable)."""
+        endpoint = LoopbackEndpoint(self, address)
+        self.endpoints[address] = endpoint
+        return endpoint
+
+    def send(self, data, source, destination):
+        """Deliver a datagram later, or lose it."""
+        if self.rng.random() < self.loss:
+            self.dropped += 1
+            return
+        delay = self.latency + self.rng.uniform(0, self.jitter)
+        asyncio.get_running_loop().call_later(delay, self._arrive, bytes(data), source, destination)
+
+    def _arrive(self, data, source, destination):
+        endpoint = self.endpoints.get(destination)
+        if endpoint is not None:
+            self.delivered += 1
+            endpoint.received(data, source)
+
+
+class LoopbackEndpoint:
+    """One address on a LoopbackNetwork; received datagrams go to `receiver(data, address)`."""
+
+    def __init__(self, network, address):
+        self.network = network
+        self.address = address
+        self.receiver = None
+
+        # Stats
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.packets_received = 0
+        self.bytes_received = 0
+
+    def send(self, data, address):
+        """Send a datagram to `address`."""
+        self.packets_sent += 1
+        self.bytes_sent += len(data)
+        self.network.send(data, self.address, address)
+
+    def received(self, data, address):
+        self.packets_received += 1
+        self.bytes_received += len(data)
+        if self.receiver is not None:
+            self.receiver(data, address)
+
+    def close(self):
+        """Stop receiving."""
+        self.network.endpoints.pop(self.address, None)
+
+
+class UdpEndpoint(asyncio.DatagramProtocol):
+    """A UDP socket with the same interface as LoopbackEndpoint (see open_udp)."""
+
+    def __init__(self):
+        self.transport = None
+        self.receiver = None
+
+        # Stats
+        self.packets_sent = 0
+        self.bytes_sent = 0
+        self.packets_received = 0
+        self.bytes_received = 0
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, address):
+        self.packets_received += 1
+        self.bytes_received += len(data)
+        if self.receiver is not None:
+            self.receiver(data, address)
+
+    def send(self, data, address):
+        """Send a datagram to `address`."""
+        self.packets_sent += 1
+        self.bytes_sent += len(data)
+        self.transport.sendto(data, address)
+
+    def close(self):
+        """Close the socket."""
+        if self.transport is not None:
+            self.transport.close()
+
+
+async def open_udp(host='0.0.0.0', port=0):
+    """Open a UDP endpoint bound to (host, port); port 0 picks a free one."""
+    loop = asyncio.get_running_loop()
+    _, endpoint = await loop.create_datagram_endpoint(UdpEndpoint, local_addr=(host, port))
+    return endpoint
+
+
+class _Peer:
+    """Server-side state of one player."""
+
+    def __init__(self, index, nonce):
+        self.index = index
+        self.nonce = nonce
+        self.slot = None     # Wingmen slot (players after the first)
+        self.inputs = {}     # Input seq -> INPUT_* bits, received but not applied yet
+        self.applied = 0     # Last input seq applied
+        self.bits = 0        # Held when no input arrived in time
+        self.acked = 0       # Newest snapshot tick the player has received
+
+
+class CoopServer:
+    """Authoritative co-op server: runs the simulation and streams it to 1-4 players.
+
+    Players join in order (the first flies the game's own ship, the rest
+    wingmen) and the game starts once `players` have joined. Every tick
+    applies each player's next input, in seq order, or holds the last one
+    if none arrived in time; every `snapshot_interval` ticks each player
+    gets the state as a delta against the newest snapshot it acknowledged.
+    Shops are skipped, so levels follow each other directly.
+    """
+
+    def __init__(self, endpoint, players=2, seed=None, campaign=DEFAULT_CAMPAIGN, tick_rate=TICK_RATE,
+                 snapshot_interval=SNAPSHOT_INTERVAL, cosmetic=False, lives=None):
+        """Serve a game for `players` players on `endpoint`.
+
+        With cosmetic=True snapshots include particles, which costs
+        bandwidth; otherwise clients show no explosion particles. `lives`
+        overrides the starting lives.
+        """
+        if not 1 <= players <= MAX_PLAYERS:
+            raise ValueError(f"Co-op games have 1 to {MAX_PLAYERS} players, not {players}")
+        self.endpoint = endpoint
+        endpoint.receiver = self.receive
+        self.players = players
+        self.tick_rate = tick_rate
+        self.snapshot_interval = snapshot_interval
+        self.cosmetic = cosmetic
+        self.lives = lives
+        self.game = SpaceExplorer(headless=True, seed=seed, campaign=campaign)
+        self.game.sound_on = False
+        self.peers = {}  # Address -> _Peer, in joining order
+        self.history = OrderedDict()  # Tick -> snapshot body
+        self.tick = 0
+        self.started = False
+
+        # Stats
+        self.snapshots_sent = 0
+        self.full_snapshots = 0
+        self.snapshot_bytes = 0
+        self.oversized = 0
+        self.held_inputs = 0
+        self.lost_inputs = 0
+        self.skipped_inputs = 0
+
+    def receive(self, data, address):
+        """Handle a datagram from a client."""
+        if not data:
+            return
+        if data[0] == MSG_HELLO and len(data) >= HELLO.size:
+            self._hello(data, address)
+        elif data[0] == MSG_INPUT and len(data) >= INPUT.size:
+            self._input(data, address)
+
+    def _hello(self, data, address):
+        _, version, nonce = HELLO.unpack_from(data)
+        peer = self.peers.get(address)
+        if peer is None or peer.nonce != nonce:
+            if version != PROTOCOL_VERSION or self.started or len(self.peers) >= self.players:
+                self.endpoint.send(FULL.pack(MSG_FULL, nonce), address)
+                return
+            peer = self.peers[address] = _Peer(len(self.peers), nonce)
+        # Answer repeated hellos too, in case the welcome was lost
+        self.endpoint.send(WELCOME.pack(MSG_WELCOME, peer.index, nonce, self.players, self.tick_rate), address)
+
+    def _input(self, data, address):
+        peer = self.peers.get(address)
+        if peer is None:
+            return
+        _, acked, last_seq, count = INPUT.unpack_from(data)
+        peer.acked = max(peer.acked, acked)
+        first_seq = last_seq - count + 1
+        for offset, bits in enumerate(data[INPUT.size:INPUT.size + count]):
+            seq = first_seq + offset
+            if seq > peer.applied:
+                peer.inputs[seq] = bits
+
+    def _next_input(self, peer):
+        """Return the input to apply for `peer` this tick."""
+        inputs = peer.inputs
+        if not inputs:
+            # Late or lost: keep doing what the player did last
+            self.held_inputs += 1
+            return peer.bits
+
+        # Running too far behind the client: skip to the newest inputs
+        while len(inputs) > MAX_INPUT_BACKLOG:
+            peer.applied = min(inputs)
+            del inputs[peer.applied]
+            self.skipped_inputs += 1
+
+        seq = peer.applied + 1
+        if seq not in inputs:
+            # Every packet repeats the newest inputs, so a gap before the oldest one queued is lost for good
+            seq = min(inputs)
+            self.lost_inputs += seq - peer.applied - 1
+        peer.bits = inputs.pop(seq)
+        peer.applied = seq
+        return peer.bits
+
+    def start(self):
+        """Start the game with a ship for every player who joined."""
+        game = self.game
+        game.start_game()
+        if self.lives is not None:
+            game.lives = self.lives
+        for peer in self.peers.values():
+            if peer.index:
+                peer.slot = game.add_wingman()
+        self.started = True
+
+    def step(self):
+        """Run one tick with every player's next input and send snapshots when they are due."""
+        game = self.game
+        if game.state == SHOP:
+            game.leave_shop()
+        if game.state == PLAYING:
+            for peer in self.peers.values():
+                bits = self._next_input(peer)
+                if peer.slot is None:
+                    game.apply_input(bits)
+                else:
+                    game.apply_wingman_input(peer.slot, bits)
+            game.update_game()
+        self.tick += 1
+        if self.tick % self.snapshot_interval == 0:
+            self.broadcast()
+
+    def broadcast(self):
+        """Send every player the current state as a delta against its newest acknowledged snapshot."""
+        body = capture(self.game, cosmetic=self.cosmetic, rng=False)
+        self.history[self.tick] = body
+        while len(self.history) > HISTORY:
+            self.history.popitem(last=False)
+
+        for address, peer in self.peers.items():
+            baseline = self.history.get(peer.acked) if peer.acked else None
+            if baseline is None:
+                baseline_tick = 0
+                baseline = b''
+                self.full_snapshots += 1
+            else:
+                baseline_tick = peer.acked
+            packet = (SNAPSHOT.pack(MSG_SNAPSHOT, self.tick, baseline_tick, peer.applied, len(body)) +
+                      encode_delta(body, baseline))
+            if len(packet) > MAX_DATAGRAM:
+                self.oversized += 1
+                continue
+            self.endpoint.send(packet, address)
+            self.snapshots_sent += 1
+            self.snapshot_bytes += len(packet)
+
+    async def run(self, ticks=None):
+        """Wait for the players, then run at the tick rate until game over (or `ticks` ticks)."""
+        while len(self.peers) < self.players:
+            await asyncio.sleep(0.01)
+        self.start()
+
+        loop = asyncio.get_running_loop()
+        tick_seconds = 1.0 / self.tick_rate
+        deadline = loop.time()
+        while self.game.state != GAME_OVER and (ticks is None or self.tick < ticks):
+            self.step()
+            deadline += tick_seconds
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+
+        # Make sure everyone sees how it ended
+        for _ in range(FINAL_SNAPSHOTS):
+            self.tick += 1
+            self.broadcast()
+            await asyncio.sleep(tick_seconds)
+
+    def stats(self):
+        """Return snapshot, bandwidth and input-delivery counters."""
+        return {
+            'ticks': self.tick,
+            'snapshots_sent': self.snapshots_sent,
+            'full_snapshots': self.full_snapshots,
+            'snapshot_bytes': self.snapshot_bytes,
+            'mean_snapshot_bytes': self.snapshot_bytes / max(self.snapshots_sent, 1),
+            'oversized': self.oversized,
+            'held_inputs': self.held_inputs,
+            'lost_inputs': self.lost_inputs,
+            'skipped_inputs': self.skipped_inputs,
+        }
+
+
+class CoopClient:
+    """A co-op player: sends input every tick and shows the server's state with its own ship predicted.
+
+    The client's game is never simulated locally. Each snapshot replaces
+    its state; the player's ship is then moved again by every input the
+    server has not applied yet, so it reacts to the controls immediately
+    whatever the round trip. Shots are not predicted: bullets appear when
+    the server's snapshot does.
+    """
+
+    def __init__(self, endpoint, server, game=None, tick_rate=TICK_RATE):
+        """Create a client talking to the server at address `server` through `endpoint`."""
+        self.endpoint = endpoint
+        endpoint.receiver = self.receive
+        self.server = server
+        self.game = game if game is not None else SpaceExplorer(headless=True)
+        self.tick_rate = tick_rate
+        self.nonce = random.getrandbits(32)
+        self.index = None
+        self.players = 0
+        self.rejected = False
+
+        self.seq = 0
+        self.pending = deque()  # (seq, bits) the server has not applied yet
+        self.sent_at = {}  # Input seq -> send time
+        self.predicted = {}  # Input seq -> predicted ship position after it
+        self.baselines = OrderedDict()  # Tick -> snapshot body
+        self.tick = 0  # Newest snapshot applied
+
+        # Stats
+        self.snapshots = 0
+        self.stale = 0
+        self.missing_baseline = 0
+        self.corrupt = 0
+        self.round_trips = []
+        self.errors = []
+
+    def receive(self, data, address):
+        """Handle a datagram from the server."""
+        if address != self.server or not data:
+            return
+        kind = data[0]
+        if kind == MSG_WELCOME and len(data) >= WELCOME.size:
+            _, index, nonce, players, tick_rate = WELCOME.unpack_from(data)
+            if nonce == self.nonce:
+                self.index = index
+                self.players = players
+                self.tick_rate = tick_rate
+        elif kind == MSG_FULL and len(data) >= FULL.size:
+            if FULL.unpack_from(data)[1] == self.nonce:
+                self.rejected = True
+        elif kind == MSG_SNAPSHOT and len(data) >= SNAPSHOT.size:
+            self._snapshot(data)
+
+    async def join(self, timeout=5.0):
+        """Say hello until the server answers; raise NetplayError if it refuses or never does."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.index is None:
+            if self.rejected:
+                raise NetplayError("The server is full or the game has started")
+            if loop.time() > deadline:
+                raise NetplayError("No answer from the server")
+            self.endpoint.send(HELLO.pack(MSG_HELLO, PROTOCOL_VERSION, self.nonce), self.server)
+            await asyncio.sleep(HELLO_INTERVAL)
+        return self.index
+
+    def _snapshot(self, data):
+        _, tick, baseline_tick, applied, size = SNAPSHOT.unpack_from(data)
+        if tick <= self.tick:
+            # Older than what is already shown (reordered on the way)
+            self.stale += 1
+            return
+        baseline = b'' if baseline_tick == 0 else self.baselines.get(baseline_tick)
+        if baseline is None:
+            self.missing_baseline += 1
+            return
+        try:
+            body = decode_delta(data[SNAPSHOT.size:], size, baseline)
+            apply(self.game, body)
+        except SnapshotError:
+            self.corrupt += 1
+            return
+
+        self.baselines[tick] = body
+        while len(self.baselines) > HISTORY:
+            self.baselines.popitem(last=False)
+        self.tick = tick
+        self.snapshots += 1
+        self._reconcile(applied)
+
+    def _reconcile(self, applied):
+        """Put the ship where the server has it and replay the inputs it has not applied yet."""
+        sent = self.sent_at.pop(applied, None)
+        if sent is not None:
+            self.round_trips.append(time.perf_counter() - sent)
+        for seq in [seq for seq in self.sent_at if seq < applied]:
+            del self.sent_at[seq]
+        while self.pending and self.pending[0][0] <= applied:
+            self.pending.popleft()
+
+        x, y = self.ship_position()
+        predicted = self.predicted.pop(applied, None)
+        if predicted is not None:
+            self.errors.append(math.hypot(x - predicted[0], y - predicted[1]))
+        for seq in [seq for seq in self.predicted if seq < applied]:
+            del self.predicted[seq]
+
+        speed = self.game.player_speed
+        for _, bits in self.pending:
+            x, y = step_ship(x, y, bits, speed)
+        self.set_ship_position(x, y)
+
+    def ship_position(self):
+        """Return this player's ship position in the client's game."""
+        game = self.game
+        if not self.index:
+            return game.player_pos[0], game.player_pos[1]
+        slot = self.index - 1
+        return float(game.wingmen.x[slot]), float(game.wingmen.y[slot])
+
+    def set_ship_position(self, x, y):
+        game = self.game
+        if not self.index:
+            game.player_pos = [x, y]
+        else:
+            game.wingmen.x[self.index - 1] = x
+            game.wingmen.y[self.index - 1] = y
+
+    def step(self, bits):
+        """Send this tick's input (INPUT_* bits) and move the ship by it right away."""
+        if self.index is None or self.game.state != PLAYING:
+            return
+        self.seq += 1
+        self.pending.append((self.seq, bits))
+        if len(self.pending) > HISTORY:
+            self.pending.popleft()
+        self.sent_at[self.seq] = time.perf_counter()
+
+        x, y = step_ship(*self.ship_position(), bits, self.game.player_speed)
+        self.set_ship_position(x, y)
+        self.predicted[self.seq] = (x, y)
+
+        inputs = [bits for _, bits in list(self.pending)[-INPUT_REDUNDANCY:]]
+        packet = INPUT.pack(MSG_INPUT, self.tick, self.seq, len(inputs)) + bytes(inputs)
+        self.endpoint.send(packet, self.server)
+
+    async def run(self, policy, ticks=None):
+        """Join, then play with input from `policy(game, tick)` until game over (or `ticks` ticks)."""
+        await self.join()
+        loop = asyncio.get_running_loop()
+        tick_seconds = 1.0 / self.tick_rate
+        deadline = loop.time()
+        tick = 0
+        while self.game.state != GAME_OVER and (ticks is None or tick < ticks):
+            self.step(policy(self.game, tick))
+            tick += 1
+            deadline += tick_seconds
+            await asyncio.sleep(max(0.0, deadline - loop.time()))
+
+    def stats(self):
+        """Return snapshot, round-trip and prediction counters."""
+        round_trips = np.array(self.round_trips) * 1000
+        errors = np.array(self.errors)
+        return {
+            'snapshots': self.snapshots,
+            'stale': self.stale,
+            'missing_baseline': self.missing_baseline,
+            'corrupt': self.corrupt,
+            'rtt_ms': float(round_trips.mean()) if len(round_trips) else None,
+            'rtt_p95_ms': float(np.percentile(round_trips, 95)) if len(round_trips) else None,
+            'prediction_error': float(errors.mean()) if len(errors) else None,
+            'mispredicted': int((errors > 0).sum()),
+        }
+
+
+async def loopback_session(players=2, seconds=3.0, loss=0.0, latency=0.03, jitter=0.01, seed=1):
+    """Play a co-op game of random inputs over a LoopbackNetwork and return bandwidth and latency figures."""
+    from headless import make_random_policy
+
+    network = LoopbackNetwork(loss, latency, jitter, seed)
+    server = CoopServer(network.endpoint('server'), players, seed=seed, lives=10 ** 9)
+    clients = [CoopClient(network.endpoint(f'client{i}'), 'server') for i in range(players)]
+    ticks = int(seconds * TICK_RATE)
+
+    server_task = asyncio.create_task(server.run(ticks))
+    await asyncio.gather(*(client.run(make_random_policy(seed + i), ticks) for i, client in enumerate(clients)))
+    await server_task
+
+    down = sum(client.endpoint.bytes_received for client in clients) / players
+    up = sum(client.endpoint.bytes_sent for client in clients) / players
+    return {
+        'players': players,
+        'loss': loss,
+        'latency_ms': latency * 1000,
+        'down_kbps': down * 8 / seconds / 1000,
+        'up_kbps': up * 8 / seconds / 1000,
+        'network': {'delivered': network.delivered, 'dropped': network.dropped},
+        'server': server.stats(),
+        'clients': [client.stats() for client in clients],
+    }
+
+
+async def play(host, port):
+    """Join the server at host:port in a window and play until the game ends or the window closes."""
+    import pygame
+
+    endpoint = await open_udp()
+    client = CoopClient(endpoint, (host, port), SpaceExplorer())
+    game = client.game
+    print(f"Joined as player {await client.join() + 1}; waiting for the game to start")
+
+    loop = asyncio.get_running_loop()
+    deadline = loop.time()
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+        client.step(game.read_input())
+        if game.state == GAME_OVER:
+            game.draw_game_over()
+        elif client.tick:
+            game.draw_game()
+        game.present()
+        deadline += 1.0 / client.tick_rate
+        await asyncio.sleep(max(0.0, deadline - loop.time()))
+    endpoint.close()
+    pygame.quit()
+
+
+async def serve(host, port, players, seed, campaign, cosmetic):
+    """Run a co-op server on host:port until its game ends."""
+    endpoint = await open_udp(host, port)
+    server = CoopServer(endpoint, players, seed=seed, campaign=campaign, cosmetic=cosmetic)
+    print(f"Serving {players} players on {host}:{port}")
+    await server.run()
+    endpoint.close()
+    print(server.stats())
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Space Explorer co-op over UDP")
+    commands = parser.add_subparsers(dest='command', required=True)
+    server_parser = commands.add_parser('server', help="host a game")
+    server_parser.add_argument('--host', default='0.0.0.0', help="address to listen on")
+    server_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="UDP port to listen on")
+    server_parser.add_argument('--players', type=int, default=2, help=f"players to wait for (1-{MAX_PLAYERS})")
+    server_parser.add_argument('--seed', type=int, default=None, help="seed for a reproducible game")
+    server_parser.add_argument('--campaign', metavar='PATH', default=DEFAULT_CAMPAIGN,
+                               help="campaign file (.json or .toml) defining each level's waves")
+    server_parser.add_argument('--particles', action='store_true',
+                               help="send explosion particles to the clients (more bandwidth)")
+    client_parser = commands.add_parser('client', help="join a game")
+    client_parser.add_argument('host', help="server address")
+    client_parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="server UDP port")
+    args = parser.parse_args()
+
+    if args.command == 'server':
+        if not 1 <= args.players <= MAX_PLAYERS:
+            parser.error(f"--players must be between 1 and {MAX_PLAYERS}")
+        asyncio.run(serve(args.host, args.port, args.players, args.seed, args.campaign, args.particles))
+    else:
+        try:
+            asyncio.run(play(args.host, args.port))
+        except NetplayError as error:
+            parser.exit(1, f"{error}\n")
@@ -0,0 +1,193 @@
+import numpy as np
+import pygame
+
+# What to do when a burst arrives and the pool is already full
+OVERFLOW_DROP = 'drop'                      # Discard the new particles
+OVERFLOW_REPLACE_OLDEST = 'replace_oldest'  # Overwrite the particles closest to expiring
+OVERFLOW_GROW = 'grow'                      # Double the capacity
+OVERFLOW_POLICIES = (OVERFLOW_DROP, OVERFLOW_REPLACE_OLDEST, OVERFLOW_GROW)
+
+
+class ParticlePool:
+    """Fixed-capacity particle system stored as parallel NumPy arrays.
+
+    Live particles always occupy the first `count` slots. Expired particles
+    are removed by moving live ones from the tail into the holes, so an
+    update never shifts the whole array.
+    """
+
+    def __init__(self, capacity=65536, overflow=OVERFLOW_REPLACE_OLDEST):
+        """Preallocate storage for `capacity` particles."""
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow!r}")
+        self.overflow = overflow
+        self.count = 0
+        self.dropped = 0
+        self.stamps = {}
+        self._allocate(capacity)
+
+    def _allocate(self, capacity):
+        """Create (or grow into) arrays large enough for `capacity` particles."""
+        old_count = self.count
+        pos = np.zeros((capacity, 2), dtype=np.float32)
+        vel = np.zeros((capacity, 2), dtype=np.float32)
+        lifetime = np.zeros(capacity, dtype=np.float32)
+        max_lifetime = np.ones(capacity, dtype=np.float32)
+        size = np.zeros(capacity, dtype=np.float32)
+        color = np.zeros((capacity, 3), dtype=np.uint8)
+
+        if old_count:
+            pos[:old_count] = self.pos[:old_count]
+            vel[:old_count] = self.vel[:old_count]
+            lifetime[:old_count] = self.lifetime[:old_count]
+            max_lifetime[:old_count] = self.max_lifetime[:old_count]
+            size[:old_count] = self.size[:old_count]
+            color[:old_count] = self.color[:old_count]
+
+        self.capacity = capacity
+        self.pos = pos
+        self.vel = vel
+        self.lifetime = lifetime
+        self.max_lifetime = max_lifetime
+        self.size = size
+        self.color = color
+
+    def __len__(self):
+        """Return the number of live particles."""
+        return self.count
+
+    def clear(self):
+        """Remove every particle without releasing the storage."""
+        self.count = 0
+
+    def copy_to(self, other):
+        """Copy the live particles into another pool, growing it if needed."""
+        count = self.count
+        if other.capacity < count:
+            other.count = 0
+            other._allocate(self.capacity)
+        other.pos[:count] = self.pos[:count]
+        other.vel[:count] = self.vel[:count]
+        other.lifetime[:count] = self.lifetime[:count]
+        other.max_lifetime[:count] = self.max_lifetime[:count]
+        other.size[:count] = self.size[:count]
+        other.color[:count] = self.color[:count]
+        other.count = count
+
+    def _reserve(self, amount):
+        """Return the slot indices the next `amount` particles should be written to."""
+        free = self.capacity - self.count
+        if amount <= free:
+            start = self.count
+            self.count += amount
+            return np.arange(start, start + amount)
+
+        if self.overflow == OVERFLOW_GROW:
+            capacity = self.capacity
+            while capacity - self.count < amount:
+                capacity *= 2
+            self._allocate(capacity)
+            return self._reserve(amount)
+
+        # Fill whatever room is left, then apply the policy to the rest
+        slots = np.arange(self.count, self.capacity)
+        self.count = self.capacity
+        overflow = amount - free
+        if self.overflow == OVERFLOW_DROP:
+            self.dropped += overflow
+            return slots
+
+        # Replace the particles with the least lifetime left
+        overflow = min(overflow, self.capacity - free)
+        oldest = np.argpartition(self.lifetime[:self.capacity - free], overflow - 1)[:overflow]
+        self.dropped += amount - free - overflow
+        return np.concatenate((slots, oldest))
+
+    def emit(self, pos, color, vel_x, vel_y, lifetimes, sizes):
+        """Add a burst of particles at `pos` with per-particle velocity, lifetime and size."""
+        amount = len(lifetimes)
+        if not amount:
+            return
+        slots = self._reserve(amount)
+        used = len(slots)
+
+        self.pos[slots, 0] = pos[0]
+        self.pos[slots, 1] = pos[1]
+        self.vel[slots, 0] = vel_x[:used]
+        self.vel[slots, 1] = vel_y[:used]
+        self.lifetime[slots] = lifetimes[:used]
+        self.max_lifetime[slots] = lifetimes[:used]
+        self.size[slots] = sizes[:used]
+        self.color[slots] = color[:3]
+
+    def update(self):
+        """Advance every particle one frame and remove the expired ones."""
+        count = self.count
+        if not count:
+            return
+
+        self.pos[:count] += self.vel[:count]
+        lifetime = self.lifetime[:count]
+        lifetime -= 1
+
+        expired = lifetime <= 0
+        dead = np.flatnonzero(expired)
+        if not dead.size:
+            return
+
+        # Swap-with-last compaction: live particles past the new end fill the holes before it
+        alive_count = count - dead.size
+        holes = dead[dead < alive_count]
+        if holes.size:
+            fillers = alive_count + np.flatnonzero(~expired[alive_count:])
+            for array in (self.pos, self.vel, self.lifetime, self.max_lifetime, self.size, self.color):
+                array[holes] = array[fillers]
+        self.count = alive_count
+
+    def _stamp(self, key):
+        """Return the pre-drawn circle for a packed (color, radius) key, drawing it on first use."""
+        stamp = self.stamps.get(key)
+        if stamp is None:
+            radius = key & 0xff
+            color = ((key >> 24) & 0xff, (key >> 16) & 0xff, (key >> 8) & 0xff)
+            # Particles are opaque, so a colorkey is enough and blits faster than per-pixel alpha
+            background = (255, 255, 255) if color == (0, 0, 0) else (0, 0, 0)
+            stamp = pygame.Surface((radius * 2, radius * 2))
+            stamp.fill(background)
+            pygame.draw.circle(stamp, color, (radius, radius), radius)
+            stamp.set_colorkey(background)
+            if pygame.display.get_surface() is not None:
+                stamp = stamp.convert()
+            self.stamps[key] = stamp
+        return stamp
+
+    def draw(self, surface, mark=None):
+        """Draw all live particles with a single Surface.blits call.
+
+        Each particle is a pre-drawn circle stamp, cached per color and
+        radius, so nothing is rasterized per frame. If `mark` is given it is
+        called with the rect of every particle drawn.
+        """
+        count = self.count
+        if not count:
+            return
+
+        radius = self.size[:count].astype(np.int32)
+        visible = radius > 0
+        radius = radius[visible]
+        pos = self.pos[:count][visible].astype(np.int32)
+        color = self.color[:count][visible].astype(np.int64)
+
+        # Pack color and radius into one integer key per particle
+        keys = (color[:, 0] << 24 | color[:, 1] << 16 | color[:, 2] << 8 | radius).tolist()
+        left = (pos[:, 0] - radius).tolist()
+        top = (pos[:, 1] - radius).tolist()
+
+        stamps = self.stamps
+        stamp = self._stamp
+        batch = [(stamps.get(key) or stamp(key), (x, y)) for key, x, y in zip(keys, left, top)]
+        if mark is None:
+            surface.blits(batch, doreturn=False)
+        else:
+            for rect in surface.blits(batch):
+                mark(rect)
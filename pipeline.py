@@ -0,0 +1,175 @@
+import queue
+import threading
+import time
+
+from particles import ParticlePool
+
+# Game attributes the draw systems read, copied into every frame
+VIEW_FIELDS = (
+    'lives', 'score', 'level', 'coins', 'energy', 'max_energy',
+    'double_shot', 'double_shot_time', 'shield_active', 'shield_time',
+    'boss_health', 'boss_max_health',
+)
+
+# Update systems the worker leaves out: the starfield is purely cosmetic and
+# is drawn from its live state, so it scrolls on the main thread instead
+MAIN_THREAD_SYSTEMS = ('stars',)
+
+
+class FrameState:
+    """An immutable copy of everything SpaceExplorer's draw systems read, taken after a tick.
+
+    It mirrors the game's attribute names (view fields, player_pos, boss,
+    world, particles), so the draw systems can draw it in place of the
+    game. The world and particle arrays are preallocated and refilled on
+    every capture.
+    """
+
+    def __init__(self):
+        """Create an empty frame; the first capture sizes it for the game."""
+        self.source = None
+        self.world = None
+        self.particles = ParticlePool(1)
+        self.ticks = 0
+
+    def capture(self, game, ticks):
+        """Copy the game's drawable state, reached after `ticks` simulated ticks."""
+        if self.source is not game.world:
+            # First capture, or the game switched to a new world
+            self.source = game.world
+            self.world = game.world.mirror()
+        game.world.copy_to(self.world)
+        game.particles.copy_to(self.particles)
+        # Stamps are only ever touched by the drawing thread
+        self.particles.stamps = game.particles.stamps
+
+        for name in VIEW_FIELDS:
+            setattr(self, name, getattr(game, name))
+        self.player_pos = tuple(game.player_pos)
+        self.boss = game.boss and {'pos': tuple(game.boss['pos'])}
+        self.ticks = ticks
+
+
+class SimulationPipeline:
+    """Overlaps simulating the next ticks with drawing and presenting the last one.
+
+    Each frame the main thread hands the frame's ticks and input to a
+    worker thread through a one-slot queue, draws the previous frame's
+    FrameState (tick N) while the worker simulates towards tick N+1, and
+    then waits for the worker, which has copied its result into the other
+    of two FrameState buffers. The buffers then swap. Drawing and flipping
+    release the GIL, so on a multicore machine most of the simulation
+    hides behind them.
+
+    Between wait() and the next submit() the worker is idle, so events,
+    menus, audio and autosaves run on the main thread as before. Gameplay
+    is identical to the sequential loop; only what is on screen lags by a
+    frame. Cosmetic effects share fx_rng across the two threads and are
+    not reproducible in this mode.
+    """
+
+    def __init__(self, game):
+        """Create a pipeline for `game`; the worker starts with the first submit()."""
+        self.game = game
+        self.buffers = (FrameState(), FrameState())
+        self.front = None  # Frame being drawn
+        self.back = self.buffers[0]  # Frame the worker fills
+        self.jobs = queue.Queue(maxsize=1)
+        self.results = queue.Queue(maxsize=1)
+        self.thread = None
+        self.pending = False
+
+        # Stats
+        self.frames = 0
+        self.ticks = 0
+        self.stalls = 0
+        self.stall_seconds = 0.0
+        self.max_stall = 0.0
+        self.worker_seconds = 0.0
+
+    def reset(self):
+        """Forget the front frame (after the game changed outside the pipeline, e.g. a new game)."""
+        self.front = None
+
+    def submit(self, ticks, bits):
+        """Start simulating `ticks` ticks with held INPUT_* `bits` on the worker."""
+        if self.front is None:
+            # Nothing drawn yet: the current state is the frame to show
+            self.front = self.buffers[self.back is self.buffers[0]]
+            self.front.capture(self.game, 0)
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, name="simulation", daemon=True)
+            self.thread.start()
+        self.jobs.put((ticks, bits))
+        self.pending = True
+
+    def _run(self):
+        """Run submitted jobs until a None job arrives."""
+        game = self.game
+        while True:
+            job = self.jobs.get()
+            if job is None:
+                return
+            ticks, bits = job
+            start = time.perf_counter()
+            try:
+                ran = game.simulate(ticks, bits, skip=MAIN_THREAD_SYSTEMS)
+                self.back.capture(game, ran)
+                result = ran
+            except Exception as error:
+                result = error
+            self.worker_seconds += time.perf_counter() - start
+            self.results.put(result)
+
+    def draw(self):
+        """Draw the front frame with the game's draw systems (on the calling thread)."""
+        game = self.game
+        game.view = self.front
+        try:
+            game.draw_game()
+        finally:
+            game.view = game
+
+    def wait(self):
+        """Wait for the submitted ticks and make their state the next frame to draw."""
+        if not self.pending:
+            return
+        self.pending = False
+        try:
+            result = self.results.get_nowait()
+        except queue.Empty:
+            # The simulation took longer than drawing: the main thread stalls
+            start = time.perf_counter()
+            result = self.results.get()
+            stall = time.perf_counter() - start
+            self.stalls += 1
+            self.stall_seconds += stall
+            self.max_stall = max(self.max_stall, stall)
+        if isinstance(result, Exception):
+            raise result
+
+        self.front, self.back = self.back, self.front
+        for _ in range(result):
+            self.game.move_stars()
+        self.frames += 1
+        self.ticks += result
+
+    def close(self):
+        """Finish the job in flight and stop the worker thread."""
+        if self.pending:
+            self.wait()
+        if self.thread is not None:
+            self.jobs.put(None)
+            self.thread.join()
+            self.thread = None
+
+    def stats(self):
+        """Return frame, tick and stall counters."""
+        return {
+            'frames': self.frames,
+            'ticks': self.ticks,
+            'stalls': self.stalls,
+            'stall_ms': self.stall_seconds * 1000,
+            'max_stall_ms': self.max_stall * 1000,
+            'worker_ms': self.worker_seconds * 1000,
+        }
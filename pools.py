@@ -0,0 +1,130 @@
+import numpy as np
+
+
+class PoolFullError(Exception):
+    """Raised by EntityPool.spawn(strict=True) when every slot is in use."""
+
+
+class EntityPool:
+    """Fixed-capacity entity store: one preallocated NumPy array per field plus a free list of slots.
+
+    An entity lives in the same slot from spawn to kill, so slot numbers are
+    stable handles and removal is O(1) (the slot just goes back on the free
+    list). active() returns live slots in spawn order, which is the order
+    the old lists were iterated in.
+    """
+
+    def __init__(self, capacity, fields):
+        """Preallocate `capacity` slots for entities with the given {name: dtype} fields."""
+        self.capacity = capacity
+        self.field_names = tuple(fields)
+        for name, dtype in fields.items():
+            setattr(self, name, np.zeros(capacity, dtype=dtype))
+
+        self.alive = np.zeros(capacity, dtype=bool)
+        self.seq = np.zeros(capacity, dtype=np.int64)
+        self.next_seq = 0
+
+        # Free slots as a stack; the lowest slots are handed out first
+        self.free = list(range(capacity - 1, -1, -1))
+        self.count = 0
+        self.top = 0  # One past the highest slot ever used, bounds every scan
+
+        # Stats
+        self.high_water = 0
+        self.spawned = 0
+        self.dropped = 0
+
+    def __len__(self):
+        """Return the number of live entities."""
+        return self.count
+
+    def spawn(self, strict=False, **values):
+        """Store a new entity and return its slot, or None if the pool is full."""
+        if not self.free:
+            if strict:
+                raise PoolFullError(f"Pool of {self.capacity} entities is full")
+            self.dropped += 1
+            return None
+
+        slot = self.free.pop()
+        for name, value in values.items():
+            getattr(self, name)[slot] = value
+        self.alive[slot] = True
+        self.seq[slot] = self.next_seq
+        self.next_seq += 1
+
+        self.count += 1
+        self.spawned += 1
+        if slot >= self.top:
+            self.top = slot + 1
+        if self.count > self.high_water:
+            self.high_water = self.count
+        return slot
+
+    def spawn_many(self, count, **values):
+        """Store `count` new entities from per-field arrays (or scalars) and return their slots.
+
+        Entities that do not fit are dropped from the end of the batch.
+        """
+        available = min(count, len(self.free))
+        self.dropped += count - available
+        if not available:
+            return np.zeros(0, dtype=np.intp)
+
+        # Same slots, in the same order, as `available` calls to spawn()
+        slots = np.array(self.free[:-available - 1:-1], dtype=np.intp)
+        del self.free[-available:]
+        for name, value in values.items():
+            if np.ndim(value):
+                value = value[:available]
+            getattr(self, name)[slots] = value
+        self.alive[slots] = True
+        self.seq[slots] = np.arange(self.next_seq, self.next_seq + available)
+        self.next_seq += available
+
+        self.count += available
+        self.spawned += available
+        self.top = max(self.top, int(slots.max()) + 1)
+        if self.count > self.high_water:
+            self.high_water = self.count
+        return slots
+
+    def kill(self, slot):
+        """Remove the entity in `slot`."""
+        if self.alive[slot]:
+            self.alive[slot] = False
+            self.free.append(slot)
+            self.count -= 1
+
+    def kill_many(self, slots):
+        """Remove every entity in an array of live slots."""
+        if len(slots):
+            self.alive[slots] = False
+            self.free.extend(slots.tolist())
+            self.count -= len(slots)
+
+    def clear(self):
+        """Remove every entity and hand the slots back in their initial order."""
+        self.alive[:self.top] = False
+        self.free = list(range(self.capacity - 1, -1, -1))
+        self.count = 0
+        self.top = 0
+
+    def active(self):
+        """Return the slots of all live entities in the order they were spawned."""
+        slots = np.flatnonzero(self.alive[:self.top])
+        if len(slots) > 1:
+            slots = slots[np.argsort(self.seq[slots], kind='stable')]
+        return slots
+
+    def stats(self):
+        """Return occupancy and high-water-mark statistics."""
+        return {
+            'count': self.count,
+            'capacity': self.capacity,
+            'occupancy': self.count / self.capacity,
+            'high_water': self.high_water,
+            'spawned': self.spawned,
+            'dropped': self.dropped,
+        }
@@ -0,0 +1,172 @@
+import csv
+import json
+import time
+
+import numpy as np
+import pygame
+
+# Percentiles kept for every phase
+PERCENTILES = (50, 95, 99)
+
+# Log formats, picked from the file extension
+LOG_CSV = 'csv'
+LOG_JSONL = 'jsonl'
+
+
+def _skip(name):
+    """Stand-in for FrameProfiler.lap while profiling is off."""
+
+
+class FrameProfiler:
+    """Times the phases of every frame with perf_counter_ns and keeps rolling percentiles.
+
+    A frame is split into laps: each call to lap(name) charges the time
+    since the previous lap (or begin_frame) to `name`, so the phases of a
+    frame add up to its total. The last `window` frames are kept in a ring
+    buffer for percentiles, and every frame can be streamed to a CSV or
+    JSONL log. While disabled, lap is a no-op function and begin_frame and
+    end_frame return immediately, so instrumented code costs next to nothing.
+    """
+
+    def __init__(self, phases, counters=(), window=600):
+        """Create a disabled profiler for the given phase names and per-frame counters."""
+        self.phases = tuple(phases)
+        self.counters = tuple(counters)
+        self.index = {name: i for i, name in enumerate(self.phases)}
+        self.window = window
+
+        # Ring buffer of per-frame phase times (ns); the last column is the frame total
+        self.samples = np.zeros((window, len(self.phases) + 1), dtype=np.int64)
+        self.frame = [0] * len(self.phases)
+        self.frames = 0
+        self.frame_start = 0
+        self.last = 0
+        self.counts = {}
+
+        self.log = None
+        self.log_file = None
+        self.log_format = None
+        self.overlay = False
+        self.enabled = False
+        self.lap = _skip
+
+    def _update_enabled(self):
+        """Turn timing on while the overlay is visible or a log is open."""
+        self.enabled = self.overlay or self.log is not None
+        self.lap = self._lap if self.enabled else _skip
+
+    def toggle_overlay(self):
+        """Show or hide the overlay, timing frames only while something consumes the numbers."""
+        self.overlay = not self.overlay
+        self._update_enabled()
+
+    def open_log(self, path):
+        """Stream every frame to `path`, as JSON lines if it ends in .jsonl and CSV otherwise."""
+        self.close_log()
+        self.log_format = LOG_JSONL if path.endswith('.jsonl') else LOG_CSV
+        self.log_file = open(path, 'w', newline='')
+        if self.log_format == LOG_CSV:
+            self.log = csv.writer(self.log_file)
+            self.log.writerow(('frame',) + self.phases + ('total',) + self.counters)
+        else:
+            self.log = self.log_file
+        self._update_enabled()
+
+    def close_log(self):
+        """Finish the log file, if one is open."""
+        if self.log_file is not None:
+            self.log_file.close()
+        self.log = None
+        self.log_file = None
+        self._update_enabled()
+
+    def begin_frame(self):
+        """Start timing a new frame."""
+        if not self.enabled:
+            return
+        self.frame = [0] * len(self.phases)
+        self.frame_start = self.last = time.perf_counter_ns()
+
+    def _lap(self, name):
+        """Charge the time since the previous lap to phase `name`."""
+        now = time.perf_counter_ns()
+        self.frame[self.index[name]] += now - self.last
+        self.last = now
+
+    def end_frame(self, counts=None):
+        """Finish the frame: store its timings and per-frame counters and log them."""
+        if not self.enabled:
+            return
+        total = time.perf_counter_ns() - self.frame_start
+        row = self.samples[self.frames % self.window]
+        row[:-1] = self.frame
+        row[-1] = total
+        self.frames += 1
+        self.counts = counts or {}
+
+        if self.log_format == LOG_CSV:
+            self.log.writerow([self.frames] + self.frame + [total] +
+                              [self.counts.get(name, '') for name in self.counters])
+        elif self.log_format == LOG_JSONL:
+            record = {'frame': self.frames, 'total': total}
+            record.update(zip(self.phases, self.frame))
+            record.update(self.counts)
+            self.log.write(json.dumps(record) + '\n')
+
+    def percentiles(self):
+        """Return {phase: (p50, p95, p99)} in milliseconds over the recorded window, plus 'total'."""
+        frames = min(self.frames, self.window)
+        if not frames:
+            return {}
+        values = np.percentile(self.samples[:frames], PERCENTILES, axis=0) / 1e6
+        names = self.phases + ('total',)
+        return {name: tuple(values[:, i].tolist()) for i, name in enumerate(names)}
+
+    def summary(self):
+        """Return the percentiles and latest counters as a JSON-friendly dict."""
+        return {
+            'frames': self.frames,
+            'percentiles_ms': {
+                name: dict(zip((f"p{p}" for p in PERCENTILES), values))
+                for name, values in self.percentiles().items()
+            },
+            'counts': dict(self.counts),
+        }
+
+
+class ProfilerOverlay:
+    """Text panel showing a profiler's percentiles, re-rendered only every few frames."""
+
+    def __init__(self, profiler, font, pos=(10, 100), refresh=30):
+        """Create an overlay for `profiler` drawn with `font` at `pos`."""
+        self.profiler = profiler
+        self.font = font
+        self.pos = pos
+        self.refresh = refresh
+        self.surface = None
+        self.rendered_at = None
+
+    def render(self):
+        """Render the panel for the profiler's current numbers."""
+        profiler = self.profiler
+        lines = [f"{'phase':<18}{'p50':>7}{'p95':>7}{'p99':>7}  ms"]
+        for name, (p50, p95, p99) in profiler.percentiles().items():
+            lines.append(f"{name:<18}{p50:>7.2f}{p95:>7.2f}{p99:>7.2f}")
+        lines.append(" ".join(f"{name}={value}" for name, value in profiler.counts.items()))
+
+        line_height = self.font.get_linesize()
+        width = max(self.font.size(line)[0] for line in lines) + 10
+        surface = pygame.Surface((width, line_height * len(lines) + 10))
+        surface.fill((20, 20, 30))
+        for i, line in enumerate(lines):
+            surface.blit(self.font.render(line, True, (200, 255, 200)), (5, 5 + i * line_height))
+        self.surface = surface
+        self.rendered_at = profiler.frames
+
+    def draw(self, surface):
+        """Draw the panel (if shown) and return its rect, or None."""
+        if not self.profiler.overlay:
+            return None
+        if self.surface is None or self.profiler.frames - self.rendered_at >= self.refresh:
+            self.render()
+        return surface.blit(self.surface, self.pos)
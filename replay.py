@@ -0,0 +1,254 @@
+import argparse
+import os
+import struct
+import time
+
+from waves import CampaignError
+
+# File layout:
+#   header  "SXRP", version, seed, start level, coins, player speed, bullet damage
+#   campaign digest of the campaign's rules, then the path it was loaded from
+#   records one byte each (plus payload for END):
+#     0x00-0x1f  one tick with that INPUT_* bitmask held
+#     0x20       leave the shop
+#     0x40 | i   buy shop item i
+#     0x7f       end of replay, followed by the tick count and final state hash
+#     0x80 | n   repeat the previous tick's input n more times (n = 1..127)
+MAGIC = b"SXRP"
+# Also bumped when the simulation's rules change, since a replay only
+# reproduces the game under the rules it was recorded with
+VERSION = 3  # 2: swept bullet collisions, 3: campaign identity
+HEADER = struct.Struct("<4sBQHIHH")
+CAMPAIGN = struct.Struct("<16sH")
+END_PAYLOAD = struct.Struct("<I16s")
+
+INPUT_MASK = 0x1f
+CMD_LEAVE_SHOP = 0x20
+CMD_BUY = 0x40
+CMD_END = 0x7f
+REPEAT = 0x80
+MAX_REPEAT = 0x7f
+
+
+class ReplayError(Exception):
+    """Raised when a replay file is malformed."""
+
+
+class ReplayWriter:
+    """Streams a game's seed and per-tick input to disk as it is played.
+
+    Runs of identical input collapse into repeat bytes, so a typical replay
+    costs well under one byte per tick. Records are buffered and written out
+    every `flush_bytes` bytes, so long sessions never sit in memory.
+    """
+
+    def __init__(self, path, seed, level, coins, player_speed, bullet_damage, campaign, flush_bytes=4096):
+        """Open `path` and write the replay header; `campaign` is the waves.Campaign being played."""
+        self.file = open(path, 'wb')
+        self.file.write(HEADER.pack(MAGIC, VERSION, seed, level, coins, player_speed, bullet_damage))
+        source = campaign.source.encode()
+        self.file.write(CAMPAIGN.pack(campaign.digest, len(source)) + source)
+        self.flush_bytes = flush_bytes
+        self.buffer = bytearray()
+        self.ticks = 0
+        self.last_input = None
+        self.pending_repeats = 0
+
+    def _flush_repeats(self):
+        """Emit any pending repeat count for the previous input."""
+        if self.pending_repeats:
+            self.buffer.append(REPEAT | self.pending_repeats)
+            self.pending_repeats = 0
+
+    def _write(self, byte):
+        """Append a record byte, flushing the buffer to disk when it is full."""
+        self._flush_repeats()
+        self.buffer.append(byte)
+        if len(self.buffer) >= self.flush_bytes:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to disk."""
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+
+    def record_input(self, bits):
+        """Record one simulation tick with the given input bits held."""
+        self.ticks += 1
+        bits &= INPUT_MASK
+        if bits == self.last_input:
+            self.pending_repeats += 1
+            if self.pending_repeats == MAX_REPEAT:
+                self._flush_repeats()
+            return
+        self.last_input = bits
+        self._write(bits)
+
+    def record_leave_shop(self):
+        """Record leaving the shop for the next wave."""
+        self._write(CMD_LEAVE_SHOP)
+
+    def record_buy(self, index):
+        """Record an attempt to buy shop item `index`."""
+        self._write(CMD_BUY | index)
+
+    def close(self, state_hash):
+        """Finish the replay with the tick count and final state hash, and close the file."""
+        self._write(CMD_END)
+        self.buffer += END_PAYLOAD.pack(self.ticks, state_hash)
+        self.flush()
+        self.file.close()
+
+
+class ReplayReader:
+    """Reads a replay header and then streams its records back in order."""
+
+    def __init__(self, path, chunk_size=65536):
+        """Open `path` and parse the header."""
+        self.file = open(path, 'rb')
+        self.chunk_size = chunk_size
+
+        header = self.file.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise ReplayError("Replay file is truncated")
+        magic, version, seed, level, coins, player_speed, bullet_damage = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise ReplayError("Not a Space Explorer replay")
+        if version != VERSION:
+            raise ReplayError(f"Unsupported replay version {version}")
+
+        campaign = self.file.read(CAMPAIGN.size)
+        if len(campaign) != CAMPAIGN.size:
+            raise ReplayError("Replay file is truncated")
+        self.campaign_digest, size = CAMPAIGN.unpack(campaign)
+        source = self.file.read(size)
+        if len(source) != size:
+            raise ReplayError("Replay file is truncated")
+        self.campaign = source.decode()
+
+        self.seed = seed
+        self.level = level
+        self.coins = coins
+        self.player_speed = player_speed
+        self.bullet_damage = bullet_damage
+        self.ticks = None
+        self.state_hash = None
+
+    def events(self):
+        """Yield ('input', bits), ('leave_shop', None) and ('buy', index) events in order.
+
+        Once the generator is exhausted, `ticks` and `state_hash` hold the
+        values written at the end of the recording (None if it was cut off).
+        """
+        last_input = 0
+        data = b''
+        offset = 0
+        while True:
+            if offset >= len(data):
+                data = self.file.read(self.chunk_size)
+                offset = 0
+                if not data:
+                    return
+
+            byte = data[offset]
+            offset += 1
+            if byte & REPEAT:
+                for _ in range(byte & MAX_REPEAT):
+                    yield 'input', last_input
+            elif byte <= INPUT_MASK:
+                last_input = byte
+                yield 'input', byte
+            elif byte == CMD_LEAVE_SHOP:
+                yield 'leave_shop', None
+            elif byte == CMD_END:
+                payload = data[offset:offset + END_PAYLOAD.size]
+                if len(payload) < END_PAYLOAD.size:
+                    payload += self.file.read(END_PAYLOAD.size - len(payload))
+                if len(payload) != END_PAYLOAD.size:
+                    raise ReplayError("Replay end record is truncated")
+                self.ticks, self.state_hash = END_PAYLOAD.unpack(payload)
+                return
+            elif CMD_BUY <= byte < CMD_BUY + 0x20:
+                yield 'buy', byte - CMD_BUY
+            else:
+                raise ReplayError(f"Unknown replay record 0x{byte:02x}")
+
+    def close(self):
+        """Close the underlying file."""
+        self.file.close()
+
+
+def play_replay(path, verify=True, campaign=None):
+    """Re-simulate a replay headlessly at full speed and return a report.
+
+    The game plays the campaign file the replay was recorded with, or
+    `campaign` if given (e.g. after the file moved); either way it must hold
+    the same rules. With verify=True the final state hash is compared to
+    the recorded one and a ReplayError is raised on mismatch.
+    """
+    # Imported here so recording from Explorer.py does not import the headless setup
+    from headless import HeadlessEngine
+
+    reader = ReplayReader(path)
+    try:
+        engine = HeadlessEngine(start=False, campaign=campaign or reader.campaign)
+    except CampaignError as error:
+        reader.close()
+        raise ReplayError(f"Cannot load the replay's campaign: {error}") from None
+    game = engine.game
+    if game.campaign.digest != reader.campaign_digest:
+        reader.close()
+        raise ReplayError(f"{game.campaign.source} is not the campaign the replay was recorded with")
+
+    # Recreate the carried-over state the recording started from
+    game.coins = reader.coins
+    game.player_speed = reader.player_speed
+    game.bullet_damage = reader.bullet_damage
+    game.seed_rng(reader.seed)
+    game.start_game(reader.level)
+
+    start = time.perf_counter()
+    try:
+        for kind, value in reader.events():
+            if kind == 'input':
+                engine.step(value)
+            elif kind == 'leave_shop':
+                game.leave_shop()
+            else:
+                game.buy_item(value)
+    finally:
+        reader.close()
+    engine.elapsed += time.perf_counter() - start
+
+    report = engine.report()
+    report['seed'] = reader.seed
+    report['campaign'] = game.campaign.source
+    report['replay_bytes'] = os.path.getsize(path)
+    report['bytes_per_tick'] = report['replay_bytes'] / max(1, engine.ticks)
+    report['complete'] = reader.state_hash is not None
+    report['verified'] = reader.state_hash is not None and game.state_hash() == reader.state_hash
+    if verify:
+        if not report['complete']:
+            raise ReplayError("Replay has no end record to verify against")
+        if reader.ticks != engine.ticks:
+            raise ReplayError(f"Replay ran {engine.ticks} ticks but recorded {reader.ticks}")
+        if not report['verified']:
+            raise ReplayError("Final state hash does not match the recording")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-simulate a Space Explorer replay headlessly")
+    parser.add_argument('path', help="replay file")
+    parser.add_argument('--no-verify', action='store_true', help="skip the final state hash check")
+    parser.add_argument('--campaign', metavar='PATH',
+                        help="campaign file to play instead of the recorded path (must hold the same rules)")
+    args = parser.parse_args()
+
+    try:
+        report = play_replay(args.path, verify=not args.no_verify, campaign=args.campaign)
+    except (OSError, ReplayError) as error:
+        parser.exit(1, f"{args.path}: {error}\n")
+    for key, value in report.items():
+        print(f"{key}: {value}")
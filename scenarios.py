@@ -0,0 +1,268 @@
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+
+# Run without opening a window or an audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import pygame
+
+from Explorer import MENU, PLAYING, SHOP, RENDER_DIRTY, RENDER_FULL, WIDTH, SpaceExplorer
+from headless import autopilot_policy
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+# Level 50 is a boss level, so the formation scenario uses the largest
+# regular formation just below it (5 + 49 * 2 = 103 enemies)
+FORMATION_LEVEL = 49
+BOSS_LEVEL = 5
+
+# Lives high enough that no scenario can end in a game over
+ENDLESS_LIVES = 10 ** 6
+
+# Ticks spent on each screen in the idle scenario before switching
+IDLE_SWITCH_TICKS = 600
+
+
+def scenario_formation(game):
+    """Level 49's full formation under autopilot fire, respawned whenever it is cleared."""
+    game.start_game(FORMATION_LEVEL)
+    game.lives = ENDLESS_LIVES
+
+    def update(tick):
+        if game.state != PLAYING:
+            game.state = PLAYING
+            game.level = FORMATION_LEVEL
+            game.spawn_enemies()
+        game.apply_input(autopilot_policy(game, tick))
+        game.update_game()
+
+    return update, game.draw_game
+
+
+def scenario_boss_storm(game):
+    """A type-0 boss that cannot die firing its five-bullet spread shot every tick."""
+    game.start_game(BOSS_LEVEL)
+    game.lives = ENDLESS_LIVES
+    game.boss['type'] = 0
+
+    def update(tick):
+        game.boss_health = game.boss_max_health
+        game.boss['attack_timer'] = 1
+        game.update_game()
+
+    return update, game.draw_game
+
+
+def scenario_boss_explosions(game):
+    """A boss killed every tick, each death setting off its particle explosion and power-up drop."""
+    game.start_game(BOSS_LEVEL)
+    game.lives = ENDLESS_LIVES
+
+    def update(tick):
+        if game.state != PLAYING:
+            game.state = PLAYING
+            game.level = BOSS_LEVEL
+        if game.boss is None:
+            game.spawn_enemies()
+            game.boss['pos'][0] = game.rng.randint(40, WIDTH - 40)
+        # One hit from a bullet sitting on the boss finishes it off
+        game.boss_health = 1
+        game.player_bullets.spawn(x=game.boss['pos'][0], y=game.boss['pos'][1])
+        game.update_game()
+
+    return update, game.draw_game
+
+
+def scenario_idle(game):
+    """The shop and main menu left open, switching screens every ten seconds."""
+    game.state = SHOP
+
+    def update(tick):
+        if tick % IDLE_SWITCH_TICKS == 0:
+            game.state = SHOP if (tick // IDLE_SWITCH_TICKS) % 2 == 0 else MENU
+
+    return update, game.update_state
+
+
+def scenario_snapshot(game, path):
+    """A game restored from a snapshot (e.g. a late level) played on by the autopilot."""
+    game.load_snapshot(path)
+    game.state = PLAYING  # Snapshots taken while paused or shopping play on at once
+    game.lives = ENDLESS_LIVES
+    level = game.level
+
+    def update(tick):
+        if game.state != PLAYING:
+            # Replay the saved level rather than moving on through the shop
+            game.state = PLAYING
+            game.level = level
+            game.spawn_enemies()
+        game.apply_input(autopilot_policy(game, tick))
+        game.update_game()
+
+    return update, game.draw_game
+
+
+SCENARIOS = {
+    'formation': scenario_formation,
+    'boss_storm': scenario_boss_storm,
+    'boss_explosions': scenario_boss_explosions,
+    'idle': scenario_idle,
+}
+
+
+def _stats(samples_ns):
+    """Summarize per-tick timings (ns) as milliseconds."""
+    ms = samples_ns / 1e6
+    return {
+        'mean_ms': float(ms.mean()),
+        'p50_ms': float(np.percentile(ms, 50)),
+        'p95_ms': float(np.percentile(ms, 95)),
+        'max_ms': float(ms.max()),
+    }
+
+
+def _play(name, ticks, seed, render_mode, update_ns=None, draw_ns=None):
+    """Run scenario `name` for `ticks` ticks, optionally recording per-tick timings.
+
+    Returns the game and the peak count of each kind of entity.
+    """
+    game = SpaceExplorer(headless=True, seed=seed, render_mode=render_mode)
+    update, draw = SCENARIOS[name](game)
+    peak = {}
+    clock = time.perf_counter_ns
+    for tick in range(ticks):
+        start = clock()
+        update(tick)
+        middle = clock()
+        draw()
+        end = clock()
+        if update_ns is not None:
+            update_ns[tick] = middle - start
+            draw_ns[tick] = end - middle
+
+        for key, value in game.entity_counts().items():
+            peak[key] = max(peak.get(key, 0), value)
+    return game, peak
+
+
+def run_scenario(name, ticks=1800, seed=0, render_mode=RENDER_FULL, memory=True):
+    """Run one scenario and return its timings, peak entity counts and (optionally) peak memory.
+
+    Memory is measured in a second run under tracemalloc, which would
+    otherwise distort the timings.
+    """
+    update_ns = np.zeros(ticks, dtype=np.int64)
+    draw_ns = np.zeros(ticks, dtype=np.int64)
+    game, peak = _play(name, ticks, seed, render_mode, update_ns, draw_ns)
+    seconds = (update_ns.sum() + draw_ns.sum()) / 1e9
+
+    result = {
+        'ticks': ticks,
+        'seconds': seconds,
+        'ticks_per_second': ticks / seconds if seconds else 0.0,
+        'update': _stats(update_ns),
+        'render': _stats(draw_ns),
+        'peak_entities': peak,
+        'score': game.score,
+        'level': game.level,
+    }
+
+    if memory:
+        tracemalloc.start()
+        _play(name, ticks, seed, render_mode)
+        result['peak_traced_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return result
+
+
+def environment():
+    """Describe the machine and commit the results were produced on."""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        'commit': commit,
+        'python': platform.python_version(),
+        'pygame': pygame.version.ver,
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+    }
+
+
+def run_scenarios(names, ticks=1800, seed=0, render_mode=RENDER_FULL, memory=True):
+    """Run the named scenarios and return a JSON-friendly results document."""
+    results = {}
+    for name in names:
+        results[name] = run_scenario(name, ticks, seed, render_mode, memory)
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None
+    return {
+        'environment': environment(),
+        'settings': {'ticks': ticks, 'seed': seed, 'render_mode': render_mode},
+        'max_rss_kb': max_rss,
+        'scenarios': results,
+    }
+
+
+def compare(results, baseline):
+    """Print each scenario's speed relative to a baseline results document."""
+    print(f"{'scenario':>16} {'ticks/s':>10} {'baseline':>10} {'change':>8} {'render ms':>10} {'baseline':>10}")
+    for name, result in results['scenarios'].items():
+        old = baseline['scenarios'].get(name)
+        if old is None:
+            continue
+        change = result['ticks_per_second'] / old['ticks_per_second'] - 1 if old['ticks_per_second'] else 0.0
+        print(f"{name:>16} {result['ticks_per_second']:>10.0f} {old['ticks_per_second']:>10.0f} {change:>+8.1%} "
+              f"{result['render']['mean_ms']:>10.3f} {old['render']['mean_ms']:>10.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Space Explorer stress scenarios")
+    parser.add_argument('names', nargs='*', help=f"scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--ticks', type=int, default=1800, help="ticks to run each scenario for")
+    parser.add_argument('--seed', type=int, default=0, help="game seed")
+    parser.add_argument('--render-mode', choices=[RENDER_FULL, RENDER_DIRTY], default=RENDER_FULL,
+                        help="redraw the whole screen or only what changed")
+    parser.add_argument('--no-memory', action='store_true', help="skip the tracemalloc pass")
+    parser.add_argument('--output', metavar='PATH', help="write the results as JSON")
+    parser.add_argument('--baseline', metavar='PATH', help="results JSON from an earlier commit to compare with")
+    parser.add_argument('--snapshot', metavar='PATH',
+                        help="add a 'snapshot' scenario that plays on from a saved game")
+    args = parser.parse_args()
+    if args.snapshot:
+        SCENARIOS['snapshot'] = functools.partial(scenario_snapshot, path=args.snapshot)
+    for name in args.names:
+        if name not in SCENARIOS:
+            parser.error(f"unknown scenario: {name}")
+
+    results = run_scenarios(args.names or list(SCENARIOS), args.ticks, args.seed, args.render_mode,
+                            memory=not args.no_memory)
+
+    print(f"{'scenario':>16} {'ticks/s':>10} {'update ms':>10} {'render ms':>10} {'render p95':>10} {'peak MB':>8}")
+    for name, result in results['scenarios'].items():
+        peak = result.get('peak_traced_bytes')
+        peak = f"{peak / 2 ** 20:>8.1f}" if peak is not None else f"{'-':>8}"
+        print(f"{name:>16} {result['ticks_per_second']:>10.0f} {result['update']['mean_ms']:>10.3f} "
+              f"{result['render']['mean_ms']:>10.3f} {result['render']['p95_ms']:>10.3f} {peak}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
@@ -0,0 +1,457 @@
+import argparse
+import os
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+# File layout:
+#   header  "SXSN", version, uncompressed body size, CRC32 of the compressed body
+#   body    zlib-compressed sections, in order:
+#     flags      which optional sections are present (FLAG_*)
+#     campaign   digest of the campaign's rules and the path it was loaded from
+#     scalars    one tagged value per SCALAR_FIELDS entry, then the player position
+#     achievements
+#     boss       present flag, then position, direction, type and attack timer
+#     pools      per entity pool: bookkeeping, the used part of every array
+#                and the free slots that have been handed out before
+#     rng        (FLAG_RNG) gameplay random stream
+#     cosmetic   (FLAG_COSMETIC) live particle arrays and the effect random stream
+# Cosmetic state that is regenerated on demand (the starfield tiles, text
+# and sprite caches) is not stored.
+MAGIC = b"SXSN"
+VERSION = 3  # 2: co-op wingmen pool, optional rng and cosmetic sections, 3: campaign identity
+HEADER = struct.Struct("<4sBII")
+
+# Tagged values keep ints, floats, bools and None distinct across a round trip
+TAG_NONE = b'n'
+TAG_BOOL = b'b'
+TAG_INT = b'i'
+TAG_FLOAT = b'd'
+TAG_STR = b's'
+
+SCALAR_FIELDS = (
+    'state', 'level', 'score', 'lives', 'energy', 'max_energy', 'coins', 'game_time',
+    'player_speed', 'bullet_speed', 'bullet_damage', 'shoot_cooldown',
+    'shield_active', 'shield_time', 'shield_cooldown', 'double_shot', 'double_shot_time',
+    'boss_health', 'boss_max_health', 'selected_item', 'tutorial_step', 'seed',
+)
+POOL_NAMES = ('player_bullets', 'enemy_bullets', 'enemies', 'power_ups', 'wingmen')
+POOL_COUNTERS = ('count', 'top', 'next_seq', 'high_water', 'spawned', 'dropped')
+PARTICLE_ARRAYS = ('pos', 'vel', 'lifetime', 'max_lifetime', 'size', 'color')
+
+# Body flags
+FLAG_COSMETIC = 1
+FLAG_RNG = 2
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot file is malformed or from an incompatible version."""
+
+
+class _Writer:
+    """Appends tagged values and raw arrays to a growing buffer."""
+
+    def __init__(self):
+        self.buffer = bytearray()
+
+    def pack(self, fmt, *values):
+        self.buffer += struct.pack(fmt, *values)
+
+    def string(self, text):
+        data = text.encode()
+        self.pack('<H', len(data))
+        self.buffer += data
+
+    def value(self, value):
+        if value is None:
+            self.buffer += TAG_NONE
+        elif isinstance(value, (bool, np.bool_)):
+            self.buffer += TAG_BOOL
+            self.pack('<?', bool(value))
+        elif isinstance(value, (int, np.integer)):
+            self.buffer += TAG_INT
+            self.pack('<q', int(value))
+        elif isinstance(value, (float, np.floating)):
+            self.buffer += TAG_FLOAT
+            self.pack('<d', float(value))
+        elif isinstance(value, str):
+            self.buffer += TAG_STR
+            self.string(value)
+        else:
+            raise TypeError(f"Cannot snapshot value of type {type(value).__name__}")
+
+    def array(self, array):
+        array = np.ascontiguousarray(array)
+        self.string(array.dtype.str)
+        self.pack('<B', array.ndim)
+        self.pack(f'<{array.ndim}I', *array.shape)
+        self.buffer += array.tobytes()
+
+
+class _Reader:
+    """Reads back what _Writer wrote."""
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def unpack(self, fmt):
+        size = struct.calcsize(fmt)
+        if self.offset + size > len(self.data):
+            raise SnapshotError("Snapshot is truncated")
+        values = struct.unpack_from(fmt, self.data, self.offset)
+        self.offset += size
+        return values
+
+    def string(self):
+        size, = self.unpack('<H')
+        text = bytes(self.data[self.offset:self.offset + size]).decode()
+        self.offset += size
+        return text
+
+    def value(self):
+        tag = bytes(self.data[self.offset:self.offset + 1])
+        self.offset += 1
+        if tag == TAG_NONE:
+            return None
+        if tag == TAG_BOOL:
+            return self.unpack('<?')[0]
+        if tag == TAG_INT:
+            return self.unpack('<q')[0]
+        if tag == TAG_FLOAT:
+            return self.unpack('<d')[0]
+        if tag == TAG_STR:
+            return self.string()
+        raise SnapshotError(f"Unknown value tag {tag!r}")
+
+    def array(self):
+        dtype = np.dtype(self.string())
+        ndim, = self.unpack('<B')
+        shape = self.unpack(f'<{ndim}I')
+        size = dtype.itemsize * int(np.prod(shape))
+        if self.offset + size > len(self.data):
+            raise SnapshotError("Snapshot is truncated")
+        array = np.frombuffer(self.data, dtype=dtype, count=size // dtype.itemsize if dtype.itemsize else 0,
+                              offset=self.offset).reshape(shape).copy()
+        self.offset += size
+        return array
+
+
+def _write_rng(writer, rng):
+    version, internal, gauss_next = rng.getstate()
+    writer.pack('<B', version)
+    writer.array(np.array(internal, dtype=np.uint32))
+    writer.value(gauss_next)
+
+
+def _read_rng(reader, rng):
+    version, = reader.unpack('<B')
+    internal = tuple(reader.array().tolist())
+    gauss_next = reader.value()
+    rng.setstate((version, internal, gauss_next))
+
+
+def capture(game, cosmetic=True, rng=True):
+    """Serialize the simulation state of a SpaceExplorer into an uncompressed body.
+
+    With cosmetic=False particles and the effect random stream are left
+    out, and with rng=False the gameplay random stream (only needed to keep
+    simulating); restoring such a body keeps the game's own.
+    """
+    writer = _Writer()
+    writer.pack('<B', (FLAG_COSMETIC if cosmetic else 0) | (FLAG_RNG if rng else 0))
+    writer.pack('<16s', game.campaign.digest)
+    writer.string(game.campaign.source)
+    for name in SCALAR_FIELDS:
+        writer.value(getattr(game, name))
+    writer.value(game.player_pos[0])
+    writer.value(game.player_pos[1])
+
+    writer.pack('<B', len(game.achievements))
+    for key, achievement in game.achievements.items():
+        writer.string(key)
+        writer.value(achievement['unlocked'])
+        writer.value(achievement.get('count'))
+
+    boss = game.boss
+    writer.pack('<?', boss is not None)
+    if boss is not None:
+        for value in (boss['pos'][0], boss['pos'][1], boss['direction'], boss['type'], boss['attack_timer']):
+            writer.value(value)
+
+    for name in POOL_NAMES:
+        pool = getattr(game, name)
+        writer.pack('<I', pool.capacity)
+        writer.pack(f'<{len(POOL_COUNTERS)}q', *(getattr(pool, counter) for counter in POOL_COUNTERS))
+        top = pool.top
+        writer.array(pool.alive[:top])
+        writer.array(pool.seq[:top])
+        for field in pool.field_names:
+            writer.array(getattr(pool, field)[:top])
+        # Slots at or above `top` were never handed out and sit at the bottom of the
+        # free stack in their initial order, so only the rest needs storing
+        writer.array(np.array(pool.free[pool.capacity - top:], dtype=np.int32))
+
+    if rng:
+        _write_rng(writer, game.rng)
+
+    if cosmetic:
+        particles = game.particles
+        writer.pack('<I', particles.count)
+        for name in PARTICLE_ARRAYS:
+            writer.array(getattr(particles, name)[:particles.count])
+        _write_rng(writer, game.fx_rng)
+    return bytes(writer.buffer)
+
+
+def encode(body, level=1):
+    """Compress a captured body and prepend the header."""
+    compressed = zlib.compress(body, level)
+    return HEADER.pack(MAGIC, VERSION, len(body), zlib.crc32(compressed)) + compressed
+
+
+def snapshot(game):
+    """Return a complete snapshot file of the game as bytes."""
+    return encode(capture(game))
+
+
+def restore(game, data):
+    """Replace the simulation state of `game` with the one in a snapshot file's bytes."""
+    if len(data) < HEADER.size:
+        raise SnapshotError("Snapshot is truncated")
+    magic, version, size, crc = HEADER.unpack_from(data)
+    if magic != MAGIC:
+        raise SnapshotError("Not a Space Explorer snapshot")
+    if version != VERSION:
+        raise SnapshotError(f"Unsupported snapshot version {version}")
+    compressed = memoryview(data)[HEADER.size:]
+    if zlib.crc32(compressed) != crc:
+        raise SnapshotError("Snapshot is corrupt (checksum mismatch)")
+    body = zlib.decompress(compressed)
+    if len(body) != size:
+        raise SnapshotError("Snapshot is corrupt (size mismatch)")
+
+    # Levels after the saved one come from the campaign, so it has to be the same one
+    reader = _Reader(body)
+    reader.unpack('<B')
+    digest, = reader.unpack('<16s')
+    source = reader.string()
+    if digest != game.campaign.digest:
+        raise SnapshotError(f"Snapshot was saved playing {source}, not {game.campaign.source}")
+    apply(game, body)
+
+
+def apply(game, body):
+    """Replace the simulation state of `game` with a body from capture().
+
+    The body's campaign is not checked (restore() does that for files);
+    co-op clients only show what the server's campaign spawned.
+    """
+    reader = _Reader(body)
+    flags, = reader.unpack('<B')
+    reader.unpack('<16s')
+    reader.string()
+    for name in SCALAR_FIELDS:
+        setattr(game, name, reader.value())
+    game.player_pos = [reader.value(), reader.value()]
+
+    count, = reader.unpack('<B')
+    for _ in range(count):
+        key = reader.string()
+        unlocked = reader.value()
+        achievement_count = reader.value()
+        if key in game.achievements:
+            game.achievements[key]['unlocked'] = unlocked
+            if achievement_count is not None:
+                game.achievements[key]['count'] = achievement_count
+
+    has_boss, = reader.unpack('<?')
+    game.boss = None
+    if has_boss:
+        x, y, direction, boss_type, attack_timer = (reader.value() for _ in range(5))
+        game.boss = {'pos': [x, y], 'direction': direction, 'type': boss_type, 'attack_timer': attack_timer}
+
+    for name in POOL_NAMES:
+        pool = getattr(game, name)
+        capacity, = reader.unpack('<I')
+        if capacity != pool.capacity:
+            raise SnapshotError(f"Snapshot {name} pool holds {capacity} entities, this game {pool.capacity}")
+        counters = reader.unpack(f'<{len(POOL_COUNTERS)}q')
+        top = counters[POOL_COUNTERS.index('top')]
+        pool.alive[:] = False
+        pool.alive[:top] = reader.array()
+        pool.seq[:top] = reader.array()
+        for field in pool.field_names:
+            getattr(pool, field)[:top] = reader.array()
+        pool.free = list(range(capacity - 1, top - 1, -1)) + reader.array().tolist()
+        for counter, value in zip(POOL_COUNTERS, counters):
+            setattr(pool, counter, value)
+
+    if flags & FLAG_RNG:
+        _read_rng(reader, game.rng)
+
+    if flags & FLAG_COSMETIC:
+        particles = game.particles
+        count, = reader.unpack('<I')
+        particles.count = 0
+        if count > particles.capacity:
+            particles._allocate(count)
+        for name in PARTICLE_ARRAYS:
+            getattr(particles, name)[:count] = reader.array()
+        particles.count = count
+        _read_rng(reader, game.fx_rng)
+
+    # Everything on screen may have changed
+    game.lerp.clear()
+    game.static_key = None
+    game.dirty.invalidate()
+
+
+def write_file(path, data):
+    """Write bytes to `path` atomically: readers see the old file or the complete new one."""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def save_file(game, path):
+    """Snapshot the game to `path` on the calling thread."""
+    write_file(path, snapshot(game))
+
+
+def load_file(game, path):
+    """Restore the game from a snapshot file."""
+    with open(path, 'rb') as f:
+        restore(game, f.read())
+
+
+class SnapshotWriter:
+    """Compresses and writes snapshots on a background thread.
+
+    save() only captures the state (a fraction of a millisecond), so the
+    game never waits on compression or the disk. If several snapshots of
+    the same path queue up faster than they can be written, only the newest
+    is written.
+    """
+
+    def __init__(self):
+        """Create an idle writer; its thread starts with the first save."""
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.thread = None
+        self.busy = False
+        self.closed = False
+
+        # Stats
+        self.written = 0
+        self.superseded = 0
+        self.failed = 0
+        self.last_error = None
+        self.last_capture_seconds = 0.0
+        self.last_write_seconds = 0.0
+
+    def save(self, game, path):
+        """Capture the game now and queue the snapshot to be written to `path`."""
+        start = time.perf_counter()
+        body = capture(game)
+        self.last_capture_seconds = time.perf_counter() - start
+
+        with self.condition:
+            if self.closed:
+                raise RuntimeError("SnapshotWriter is closed")
+            if path in self.pending:
+                self.superseded += 1
+            self.pending[path] = body
+            if self.thread is None:
+                self.thread = threading.Thread(target=self._run, name="snapshot-writer", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+
+    def _run(self):
+        """Write queued snapshots until closed."""
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                path, body = self.pending.popitem()
+                self.busy = True
+
+            start = time.perf_counter()
+            try:
+                write_file(path, encode(body))
+                self.written += 1
+            except OSError as error:
+                self.failed += 1
+                self.last_error = error
+            self.last_write_seconds = time.perf_counter() - start
+
+            with self.condition:
+                self.busy = False
+                self.condition.notify_all()
+
+    def flush(self):
+        """Block until every queued snapshot has been written."""
+        with self.condition:
+            while self.pending or self.busy:
+                self.condition.wait()
+
+    def close(self):
+        """Write whatever is queued and stop the thread."""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def stats(self):
+        """Return write counters and the latest capture and write times."""
+        return {
+            'written': self.written,
+            'superseded': self.superseded,
+            'failed': self.failed,
+            'capture_ms': self.last_capture_seconds * 1000,
+            'write_ms': self.last_write_seconds * 1000,
+        }
+
+
+if __name__ == "__main__":
+    # Run without opening a window or an audio device
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+    from Explorer import SpaceExplorer
+
+    parser = argparse.ArgumentParser(description="Inspect a Space Explorer snapshot")
+    parser.add_argument('path', help="snapshot file")
+    args = parser.parse_args()
+
+    game = SpaceExplorer(headless=True)
+    start = time.perf_counter()
+    try:
+        load_file(game, args.path)
+    except SnapshotError as error:
+        parser.exit(1, f"{args.path}: {error}\n")
+    elapsed = time.perf_counter() - start
+
+    print(f"bytes: {os.path.getsize(args.path)}")
+    print(f"load_ms: {elapsed * 1000:.3f}")
+    for name in ('state', 'level', 'score', 'lives', 'coins', 'player_speed', 'bullet_damage'):
+        print(f"{name}: {getattr(game, name)}")
+    for name in POOL_NAMES:
+        print(f"{name}: {len(getattr(game, name))}")
+    print(f"particles: {len(game.particles)}")
+    print(f"boss: {game.boss is not None}")
@@ -0,0 +1,160 @@
+import pygame
+
+# Star sizes the game uses (radius is int(size), speed is 0.5 * size)
+MIN_STAR_SIZE = 1
+MAX_STAR_SIZE = 3
+
+# Tiles are filled with stars lazily in horizontal bands of this height
+BAND_HEIGHT = 32
+
+
+class StarLayer:
+    """Stars of similar size that scroll together, pre-rendered into screen-sized tiles.
+
+    Two tiles are stacked vertically and scroll down as a pair. Once the
+    lower tile has scrolled off the bottom it moves to the top and is
+    cleared; its stars are re-rolled (the equivalent of stars respawning at
+    the top) lazily, one horizontal band at a time as the band scrolls into
+    view, so no single frame pays for a whole tile.
+    """
+
+    def __init__(self, width, height, min_size, max_size, rng):
+        """Create an empty layer for star sizes in [min_size, max_size)."""
+        self.width = width
+        self.height = height
+        self.min_size = min_size
+        self.max_size = max_size
+        self.speed = 0.5 * (min_size + max_size) / 2
+        self.rng = rng
+        self.count = 0
+        self.offset = 0.0
+        self.bands = (height + BAND_HEIGHT - 1) // BAND_HEIGHT
+
+        # tiles[0] is drawn at offset, tiles[1] directly above it. Bands
+        # [0, pending[i]) of tile i have not been rolled and rendered yet.
+        self.tiles = [None, None]
+        self.stars = [[], []]
+        self.pending = [self.bands, self.bands]
+
+    def _tile(self, index):
+        """Return the surface for a tile, creating it on first use."""
+        tile = self.tiles[index]
+        if tile is None:
+            tile = pygame.Surface((self.width, self.height))
+            if pygame.display.get_surface() is not None:
+                tile = tile.convert()
+            tile.set_colorkey((0, 0, 0), pygame.RLEACCEL)
+            self.tiles[index] = tile
+        return tile
+
+    def reset_tile(self, index):
+        """Clear a tile so its stars are rolled again as it scrolls into view."""
+        if self.tiles[index] is not None:
+            self.tiles[index].fill((0, 0, 0))
+        self.stars[index] = []
+        self.pending[index] = self.bands
+
+    def _render_bands(self, index, top_row):
+        """Roll and render the bands of a tile that reach down past `top_row`."""
+        tile = None
+        rng = self.rng
+        stars = self.stars[index]
+        per_band, extra = divmod(self.count, self.bands)
+        while self.pending[index] and self.pending[index] * BAND_HEIGHT > top_row - MAX_STAR_SIZE:
+            band = self.pending[index] - 1
+            self.pending[index] = band
+            if tile is None:
+                # Lock once so the RLE tile is only decoded and re-encoded once
+                tile = self._tile(index)
+                tile.lock()
+
+            band_top = band * BAND_HEIGHT
+            band_bottom = min(band_top + BAND_HEIGHT, self.height) - 1
+            for _ in range(per_band + (band < extra)):
+                size = self.min_size + rng.random() * (self.max_size - self.min_size)
+                brightness = int(255 * (rng.random() * 0.5 + 0.5))
+                star = (rng.randint(0, self.width), rng.randint(band_top, band_bottom), int(size),
+                        (brightness, brightness, brightness))
+                pygame.draw.circle(tile, star[3], (star[0], star[1]), star[2])
+                stars.append(star)
+
+        if tile is not None:
+            tile.unlock()
+
+    def update(self):
+        """Scroll the layer down by its speed."""
+        self.offset += self.speed
+        if self.offset >= self.height:
+            # The lower tile left the screen: it becomes the new top tile
+            self.offset -= self.height
+            self.tiles.reverse()
+            self.stars.reverse()
+            self.pending.reverse()
+            self.reset_tile(1)
+
+    def draw(self, surface, mark=None):
+        """Draw the layer with two blits, or star by star (reporting rects to `mark`) if given."""
+        if not self.count:
+            return
+
+        y = int(self.offset)
+        if self.pending[0]:
+            self._render_bands(0, 0)
+        if self.pending[1] and y > 0:
+            self._render_bands(1, self.height - y)
+
+        if mark is None:
+            surface.blit(self._tile(0), (0, y))
+            if y > 0:
+                surface.blit(self._tile(1), (0, y - self.height))
+            return
+
+        # Dirty-rect mode: a full-screen blit would dirty the whole screen,
+        # so draw only the stars and report their rects instead
+        draw_circle = pygame.draw.circle
+        for index, tile_y in ((0, y), (1, y - self.height)):
+            for x, star_y, radius, color in self.stars[index]:
+                star_y += tile_y
+                if -radius <= star_y <= self.height + radius:
+                    mark(draw_circle(surface, color, (x, star_y), radius))
+
+
+class Starfield:
+    """Parallax starfield made of pre-rendered layers grouped by star size and speed.
+
+    Drawing costs a couple of blits per layer no matter how many stars there
+    are; stars are only rasterized when a tile scrolls back to the top.
+    """
+
+    def __init__(self, width, height, rng, layers=4):
+        """Create an empty starfield with `layers` speed bands."""
+        step = (MAX_STAR_SIZE - MIN_STAR_SIZE) / layers
+        self.layers = [
+            StarLayer(width, height, MIN_STAR_SIZE + i * step, MIN_STAR_SIZE + (i + 1) * step, rng)
+            for i in range(layers)
+        ]
+        self.rng = rng
+
+    def __len__(self):
+        """Return the number of stars on screen at any time."""
+        return sum(layer.count for layer in self.layers)
+
+    def add_stars(self, count):
+        """Add stars, each one to the layer matching a randomly rolled size."""
+        step = (MAX_STAR_SIZE - MIN_STAR_SIZE) / len(self.layers)
+        for _ in range(count):
+            size = self.rng.random() * (MAX_STAR_SIZE - MIN_STAR_SIZE) + MIN_STAR_SIZE
+            self.layers[min(int((size - MIN_STAR_SIZE) / step), len(self.layers) - 1)].count += 1
+        for layer in self.layers:
+            layer.reset_tile(0)
+            layer.reset_tile(1)
+
+    def update(self):
+        """Scroll every layer."""
+        for layer in self.layers:
+            layer.update()
+
+    def draw(self, surface, mark=None):
+        """Draw every layer, slowest (furthest) first."""
+        for layer in self.layers:
+            layer.draw(surface, mark)
@@ -0,0 +1,602 @@
+import argparse
+import bisect
+import os
+import struct
+import time
+import zlib
+
+import numpy as np
+
+from pipeline import VIEW_FIELDS
+
+# File layout:
+#   header  "SXST", version, flags, keyframe interval, ticks per second
+#   records one per tick, in order:
+#     KEY    tick, payload size, payload: the tick's whole state
+#     DELTA  payload size, payload: the tick's state against the last KEY
+#            (its tick is the previous record's plus one)
+#     INDEX  written on close: keyframe count, tick count, then the tick and
+#            file offset of every KEY record
+#   trailer offset of the INDEX record, "SXIX"
+#
+# A keyframe and the deltas after it form one raw deflate stream, flushed
+# (and the four-byte sync marker dropped) at the end of every record, so each
+# record can be read as soon as it is written while still compressing
+# against the ones before it in its group. A KEY payload holds the scalars, then for each
+# archetype in STREAM_FIELDS its entity count, seqs (ascending, each stored
+# as the difference from the one before) and one int16 column per field,
+# then (FLAG_PARTICLES) the particles. A DELTA payload holds the scalars
+# minus the keyframe's, then per archetype a bit per keyframe entity still
+# alive, the field changes of those entities since the keyframe, and the
+# entities spawned since (count, seqs, fields), then the particles again.
+#
+# Every DELTA is relative to its keyframe rather than to the tick before, so
+# reaching any tick means inflating its group up to it (a few KB at most)
+# but decoding only one KEY and one DELTA.
+MAGIC = b"SXST"
+VERSION = 1
+HEADER = struct.Struct("<4sBBHH")
+KEY_RECORD = struct.Struct("<BII")
+DELTA_RECORD = struct.Struct("<BH")
+INDEX_RECORD = struct.Struct("<BII")
+INDEX_ENTRY = struct.Struct("<IQ")
+TRAILER = struct.Struct("<Q4s")
+INDEX_MAGIC = b"SXIX"
+
+KIND_KEY = 1
+KIND_DELTA = 2
+KIND_INDEX = 3
+
+SYNC_MARKER = b'\x00\x00\xff\xff'  # Ends every flushed deflate block
+MAX_DELTA = 0xff00  # Larger deltas (uncompressed) are written as keyframes
+
+# Header flags
+FLAG_PARTICLES = 1
+
+KEYFRAME_INTERVAL = 60
+POSITION_SCALE = 8  # Positions are stored in 1/8 pixel steps
+
+# Per-entity fields stored for each archetype, with the scale they are quantized at
+STREAM_FIELDS = {
+    'player_bullets': (('x', POSITION_SCALE), ('y', POSITION_SCALE)),
+    'enemies': (('x', POSITION_SCALE), ('y', POSITION_SCALE), ('type', 1)),
+    'enemy_bullets': (('x', POSITION_SCALE), ('y', POSITION_SCALE)),
+    'power_ups': (('x', POSITION_SCALE), ('y', POSITION_SCALE), ('type', 1)),
+    'wingmen': (('x', POSITION_SCALE), ('y', POSITION_SCALE), ('shield_time', 1)),
+}
+
+# Game-wide values stored every tick: what the HUD and spectators show
+SCALAR_SCALES = {'energy': POSITION_SCALE}
+SCALARS = ('state',) + VIEW_FIELDS
+POSITION_SCALARS = ('player_x', 'player_y', 'boss', 'boss_x', 'boss_y')
+
+INT16_MIN = -32768
+INT16_MAX = 32767
+
+
+class StreamError(Exception):
+    """Raised when a state stream is malformed or from an incompatible version."""
+
+
+def _quantize(values, scale):
+    """Return `values` * `scale` rounded into int16 (far off-screen positions are clamped)."""
+    return np.clip(np.rint(np.asarray(values, dtype=np.float64) * scale), INT16_MIN, INT16_MAX).astype(np.int16)
+
+
+class Frame:
+    """The quantized drawable state of one tick.
+
+    `scalars` is an int32 array (SCALARS then POSITION_SCALARS), `entities`
+    maps each STREAM_FIELDS archetype to its ascending seqs and an int16
+    (field, entity) array, and `particles`, when recorded, is a tuple of
+    positions, sizes and colors.
+    """
+
+    def __init__(self, tick, scalars, entities, particles=None):
+        self.tick = tick
+        self.scalars = scalars
+        self.entities = entities
+        self.particles = particles
+
+    @classmethod
+    def capture(cls, game, tick, particles=False):
+        """Quantize the game's current state."""
+        values = []
+        for name in SCALARS:
+            values.append(round(getattr(game, name) * SCALAR_SCALES.get(name, 1)))
+        boss = game.boss
+        boss_pos = boss['pos'] if boss else (0, 0)
+        values += [round(game.player_pos[0] * POSITION_SCALE), round(game.player_pos[1] * POSITION_SCALE),
+                   boss is not None, round(boss_pos[0] * POSITION_SCALE), round(boss_pos[1] * POSITION_SCALE)]
+
+        entities = {}
+        for name, fields in STREAM_FIELDS.items():
+            archetype = game.world[name]
+            slots = archetype.active()
+            order = np.argsort(archetype.seq[slots], kind='stable')
+            slots = slots[order]
+            columns = np.empty((len(fields), len(slots)), dtype=np.int16)
+            for row, (field, scale) in enumerate(fields):
+                columns[row] = _quantize(getattr(archetype, field)[slots], scale)
+            entities[name] = (archetype.seq[slots].astype(np.uint32), columns)
+
+        recorded = None
+        if particles:
+            pool = game.particles
+            count = pool.count
+            recorded = (_quantize(pool.pos[:count], 1), np.clip(pool.size[:count], 0, 255).astype(np.uint8),
+                        pool.color[:count].copy())
+        return cls(tick, np.array(values, dtype=np.int32), entities, recorded)
+
+    def fill(self, view):
+        """Write the frame into a pipeline.FrameState whose world mirrors the recording game's.
+
+        Entities beyond an archetype's capacity are left out.
+        """
+        scalars = self.scalars
+        for index, name in enumerate(SCALARS):
+            scale = SCALAR_SCALES.get(name)
+            setattr(view, name, int(scalars[index]) if scale is None else scalars[index] / scale)
+        player_x, player_y, has_boss, boss_x, boss_y = scalars[len(SCALARS):].tolist()
+        view.player_pos = (player_x / POSITION_SCALE, player_y / POSITION_SCALE)
+        view.boss = {'pos': (boss_x / POSITION_SCALE, boss_y / POSITION_SCALE)} if has_boss else None
+
+        for name, fields in STREAM_FIELDS.items():
+            archetype = view.world[name]
+            seq, columns = self.entities[name]
+            count = min(len(seq), archetype.capacity)
+            archetype.alive[count:archetype.top] = False
+            archetype.alive[:count] = True
+            archetype.seq[:count] = seq[:count]
+            for row, (field, scale) in enumerate(fields):
+                getattr(archetype, field)[:count] = columns[row, :count] / scale if scale != 1 else columns[row, :count]
+            archetype.top = count
+            archetype.count = count
+            archetype.next_seq = int(seq[count - 1]) + 1 if count else 0
+
+        pool = view.particles
+        if self.particles is None:
+            pool.count = 0
+            return
+        pos, size, color = self.particles
+        count = len(size)
+        pool.count = 0
+        if count > pool.capacity:
+            pool._allocate(count)
+        pool.pos[:count] = pos
+        pool.size[:count] = size
+        pool.color[:count] = color
+        pool.count = count
+
+
+def _encode_key(frame):
+    """Return the uncompressed KEY payload of a frame."""
+    parts = [frame.scalars.tobytes()]
+    for name in STREAM_FIELDS:
+        seq, columns = frame.entities[name]
+        parts += [struct.pack('<I', len(seq)), np.diff(seq, prepend=np.uint32(0)).tobytes(), columns.tobytes()]
+    _encode_particles(frame, parts)
+    return b''.join(parts)
+
+
+def _encode_delta(frame, key):
+    """Return the uncompressed DELTA payload of a frame against its keyframe, or None if it does not fit."""
+    parts = [(frame.scalars - key.scalars).tobytes()]
+    for name in STREAM_FIELDS:
+        seq, columns = frame.entities[name]
+        key_seq, key_columns = key.entities[name]
+        kept = np.isin(key_seq, seq, assume_unique=True)
+        moved = columns[:, np.searchsorted(seq, key_seq[kept])].astype(np.int32) - key_columns[:, kept]
+        if moved.size and (moved.min() < INT16_MIN or moved.max() > INT16_MAX):
+            return None
+        spawned = ~np.isin(seq, key_seq, assume_unique=True)
+        new_seq = seq[spawned]
+        parts += [np.packbits(kept).tobytes(), moved.astype(np.int16).tobytes(),
+                  struct.pack('<I', len(new_seq)), np.diff(new_seq, prepend=np.uint32(0)).tobytes(),
+                  columns[:, spawned].tobytes()]
+    _encode_particles(frame, parts)
+    return b''.join(parts)
+
+
+def _encode_particles(frame, parts):
+    if frame.particles is not None:
+        pos, size, color = frame.particles
+        parts += [struct.pack('<I', len(size)), pos.tobytes(), size.tobytes(), color.tobytes()]
+
+
+class _PayloadReader:
+    """Reads consecutive arrays out of an uncompressed payload."""
+
+    def __init__(self, data):
+        self.data = data
+        self.offset = 0
+
+    def array(self, dtype, count):
+        dtype = np.dtype(dtype)
+        end = self.offset + dtype.itemsize * count
+        if end > len(self.data):
+            raise StreamError("Stream payload is truncated")
+        values = np.frombuffer(self.data, dtype=dtype, count=count, offset=self.offset)
+        self.offset = end
+        return values
+
+    def count(self):
+        return int(self.array(np.uint32, 1)[0])
+
+    def seqs(self):
+        return np.cumsum(self.array(np.uint32, self.count()), dtype=np.uint32)
+
+
+def _decode_particles(reader, particles):
+    if not particles:
+        return None
+    count = reader.count()
+    return (reader.array(np.int16, count * 2).reshape(count, 2), reader.array(np.uint8, count),
+            reader.array(np.uint8, count * 3).reshape(count, 3))
+
+
+def _decode_key(tick, data, particles):
+    reader = _PayloadReader(data)
+    scalars = reader.array(np.int32, len(SCALARS) + len(POSITION_SCALARS))
+    entities = {}
+    for name, fields in STREAM_FIELDS.items():
+        seq = reader.seqs()
+        entities[name] = (seq, reader.array(np.int16, len(fields) * len(seq)).reshape(len(fields), len(seq)))
+    return Frame(tick, scalars, entities, _decode_particles(reader, particles))
+
+
+def _decode_delta(tick, data, key, particles):
+    reader = _PayloadReader(data)
+    scalars = key.scalars + reader.array(np.int32, len(key.scalars))
+    entities = {}
+    for name, fields in STREAM_FIELDS.items():
+        key_seq, key_columns = key.entities[name]
+        kept = np.unpackbits(reader.array(np.uint8, (len(key_seq) + 7) // 8), count=len(key_seq)).astype(bool)
+        kept_count = int(kept.sum())
+        moved = reader.array(np.int16, len(fields) * kept_count).reshape(len(fields), kept_count)
+        new_seq = reader.seqs()
+        spawned = reader.array(np.int16, len(fields) * len(new_seq)).reshape(len(fields), len(new_seq))
+
+        seq = np.concatenate((key_seq[kept], new_seq))
+        columns = np.concatenate(((key_columns[:, kept] + moved).astype(np.int16), spawned), axis=1)
+        order = np.argsort(seq, kind='stable')
+        entities[name] = (seq[order], columns[:, order])
+    return Frame(tick, scalars, entities, _decode_particles(reader, particles))
+
+
+class StateStreamWriter:
+    """Streams the drawable state of every tick to disk as keyframes and deltas.
+
+    Each tick is quantized (positions to 1/8 pixel) and stored against the
+    last keyframe: only entities that survived get their field changes
+    stored, spawned ones their full values. A keyframe is written every
+    `keyframe_interval` ticks, and early when a delta would not fit.
+    Records are buffered and written out every `flush_bytes` bytes; the
+    seek index is appended on close.
+    """
+
+    def __init__(self, path, keyframe_interval=KEYFRAME_INTERVAL, particles=False, tick_rate=60,
+                 flush_bytes=65536):
+        """Open `path` and write the header; particles=True also records particles."""
+        self.file = open(path, 'wb')
+        self.particles = particles
+        self.keyframe_interval = keyframe_interval
+        self.tick_rate = tick_rate
+        self.flush_bytes = flush_bytes
+        self.buffer = bytearray(HEADER.pack(MAGIC, VERSION, FLAG_PARTICLES if particles else 0,
+                                            keyframe_interval, tick_rate))
+        self.offset = len(self.buffer)
+        self.key = None
+        self.compressor = None
+        self.index = []  # (tick, offset) of every keyframe
+        self.ticks = 0
+
+        # Stats
+        self.keyframes = 0
+        self.key_bytes = 0
+        self.delta_bytes = 0
+        self.forced_keyframes = 0
+
+    def write(self, game):
+        """Append the game's current state as the next tick."""
+        tick = self.ticks
+        frame = Frame.capture(game, tick, self.particles)
+        delta = None
+        if self.key is not None and tick - self.key.tick < self.keyframe_interval:
+            delta = _encode_delta(frame, self.key)
+            if delta is None or len(delta) > MAX_DELTA:
+                delta = None
+                self.forced_keyframes += 1
+
+        if delta is None:
+            # A keyframe starts a new deflate stream, so it decodes on its own
+            self.compressor = zlib.compressobj(6, zlib.DEFLATED, -15)
+            payload = self._compress(_encode_key(frame))
+            self.index.append((tick, self.offset))
+            self.key = frame
+            self.keyframes += 1
+            self.key_bytes += len(payload)
+            self._write(KEY_RECORD.pack(KIND_KEY, tick, len(payload)) + payload)
+        else:
+            payload = self._compress(delta)
+            self.delta_bytes += len(payload)
+            self._write(DELTA_RECORD.pack(KIND_DELTA, len(payload)) + payload)
+        self.ticks += 1
+
+    def _compress(self, data):
+        """Deflate a record's payload into the current group's stream."""
+        return (self.compressor.compress(data) + self.compressor.flush(zlib.Z_SYNC_FLUSH))[:-len(SYNC_MARKER)]
+
+    def _write(self, record):
+        self.buffer += record
+        self.offset += len(record)
+        if len(self.buffer) >= self.flush_bytes:
+            self.flush()
+
+    def flush(self):
+        """Write buffered records to disk."""
+        self.file.write(self.buffer)
+        self.file.flush()
+        self.buffer.clear()
+
+    def close(self):
+        """Append the seek index and close the file."""
+        index_offset = self.offset
+        self.buffer += INDEX_RECORD.pack(KIND_INDEX, len(self.index), self.ticks)
+        for entry in self.index:
+            self.buffer += INDEX_ENTRY.pack(*entry)
+        self.buffer += TRAILER.pack(index_offset, INDEX_MAGIC)
+        self.flush()
+        self.file.close()
+
+    def stats(self):
+        """Return tick, keyframe and size counters (bytes include record headers, not the index)."""
+        return {
+            'ticks': self.ticks,
+            'keyframes': self.keyframes,
+            'forced_keyframes': self.forced_keyframes,
+            'bytes': self.offset,
+            'bytes_per_tick': self.offset / max(self.ticks, 1),
+            'kb_per_second': self.offset * self.tick_rate / max(self.ticks, 1) / 1024,
+            'key_share': self.key_bytes / max(self.key_bytes + self.delta_bytes, 1),
+        }
+
+
+class StateStreamReader:
+    """Reads a state stream front to back, or jumps to any tick.
+
+    The seek index comes from the file's trailer; a stream that is still
+    being written, or was cut off, is indexed by skipping over its record
+    headers instead. seek() inflates at most one keyframe group and decodes
+    one keyframe and one delta, so scrubbing costs the same anywhere in a
+    recording of any length; playing forward continues the current group
+    instead of starting it over.
+    """
+
+    def __init__(self, path):
+        """Open `path`, parse the header and load or build the seek index."""
+        self.file = open(path, 'rb')
+        header = self.file.read(HEADER.size)
+        if len(header) != HEADER.size:
+            raise StreamError("State stream is truncated")
+        magic, version, flags, keyframe_interval, tick_rate = HEADER.unpack(header)
+        if magic != MAGIC:
+            raise StreamError("Not a Space Explorer state stream")
+        if version != VERSION:
+            raise StreamError(f"Unsupported state stream version {version}")
+        self.particles = bool(flags & FLAG_PARTICLES)
+        self.keyframe_interval = keyframe_interval
+        self.tick_rate = tick_rate
+        self.key = None  # Keyframe of the group being read
+        self.frame = None  # Last frame decoded
+        self.reached = None  # Last tick inflated in the group
+        self.inflater = None
+        self.next_offset = None
+
+        self.key_ticks = []
+        self.key_offsets = []
+        self.ticks = 0
+        if not self._load_index():
+            self._build_index()
+
+    def _load_index(self):
+        """Read the index written on close; return False if there is none."""
+        size = self.file.seek(0, os.SEEK_END)
+        if size < HEADER.size + TRAILER.size:
+            return False
+        self.file.seek(size - TRAILER.size)
+        index_offset, magic = TRAILER.unpack(self.file.read(TRAILER.size))
+        if magic != INDEX_MAGIC or index_offset >= size:
+            return False
+        self.file.seek(index_offset)
+        header = self.file.read(INDEX_RECORD.size)
+        if len(header) != INDEX_RECORD.size:
+            return False
+        kind, count, ticks = INDEX_RECORD.unpack(header)
+        entries = self.file.read(INDEX_ENTRY.size * count)
+        if kind != KIND_INDEX or len(entries) != INDEX_ENTRY.size * count:
+            return False
+        for tick, offset in INDEX_ENTRY.iter_unpack(entries):
+            self.key_ticks.append(tick)
+            self.key_offsets.append(offset)
+        self.ticks = ticks
+        return True
+
+    def _build_index(self):
+        """Index the keyframes by walking the record headers."""
+        for tick, offset, kind, size in self._records(HEADER.size, 0):
+            if kind == KIND_KEY:
+                self.key_ticks.append(tick)
+                self.key_offsets.append(offset)
+            self.ticks = tick + 1
+
+    def _records(self, offset, tick):
+        """Yield (tick, offset, kind, payload size) of every complete record from `offset` on."""
+        file = self.file
+        file.seek(offset)
+        while True:
+            kind = file.read(1)
+            if not kind or kind[0] == KIND_INDEX:
+                return
+            if kind[0] == KIND_KEY:
+                header = file.read(KEY_RECORD.size - 1)
+                if len(header) != KEY_RECORD.size - 1:
+                    return
+                tick, size = struct.unpack('<II', header)
+                payload_offset = offset + KEY_RECORD.size
+            elif kind[0] == KIND_DELTA:
+                header = file.read(DELTA_RECORD.size - 1)
+                if len(header) != DELTA_RECORD.size - 1:
+                    return
+                size, = struct.unpack('<H', header)
+                payload_offset = offset + DELTA_RECORD.size
+            else:
+                raise StreamError(f"Unknown state stream record {kind[0]} at offset {offset}")
+            if file.seek(0, os.SEEK_END) < payload_offset + size:
+                # The writer has not finished this record
+                return
+            yield tick, offset, kind[0], size
+            offset = payload_offset + size
+            file.seek(offset)
+            tick += 1
+
+    def _inflate(self, offset, kind, size):
+        """Read and inflate a record's payload, continuing its group's deflate stream."""
+        self.file.seek(offset + (KEY_RECORD.size if kind == KIND_KEY else DELTA_RECORD.size))
+        payload = self.file.read(size)
+        if len(payload) != size:
+            raise StreamError(f"State stream record at offset {offset} is truncated")
+        if kind == KIND_KEY:
+            self.inflater = zlib.decompressobj(-15)
+        try:
+            return self.inflater.decompress(payload + SYNC_MARKER)
+        except zlib.error as error:
+            raise StreamError(f"Corrupt state stream record at offset {offset}: {error}") from None
+
+    def _open_group(self, position):
+        """Decode the keyframe at `position` in the index and rewind to the start of its group."""
+        offset = self.key_offsets[position]
+        self.file.seek(offset)
+        header = self.file.read(KEY_RECORD.size)
+        if len(header) != KEY_RECORD.size:
+            raise StreamError(f"State stream keyframe at offset {offset} is truncated")
+        kind, tick, size = KEY_RECORD.unpack(header)
+        if kind != KIND_KEY or tick != self.key_ticks[position]:
+            raise StreamError(f"No keyframe for tick {self.key_ticks[position]} at offset {offset}")
+        self.key = self.frame = _decode_key(tick, self._inflate(offset, kind, size), self.particles)
+        self.reached = tick
+        self.next_offset = offset + KEY_RECORD.size + size
+
+    def seek(self, tick):
+        """Return the Frame of `tick`."""
+        if not 0 <= tick < self.ticks:
+            raise IndexError(f"Tick {tick} is outside the recording (0-{self.ticks - 1})")
+        frame = self.frame
+        if frame is not None and frame.tick == tick:
+            return frame
+
+        position = bisect.bisect_right(self.key_ticks, tick) - 1
+        key = self.key
+        # Going forward within the group carries on inflating where the last seek stopped
+        if key is None or key.tick != self.key_ticks[position] or self.reached > tick:
+            self._open_group(position)
+            key = self.key
+            if tick == key.tick:
+                return key
+
+        for record_tick, offset, kind, size in self._records(self.next_offset, self.reached + 1):
+            # Every record up to the target is inflated to keep the deflate stream going
+            data = self._inflate(offset, kind, size)
+            self.reached = record_tick
+            self.next_offset = offset + DELTA_RECORD.size + size
+            if record_tick == tick:
+                self.frame = _decode_delta(tick, data, key, self.particles)
+                return self.frame
+        raise StreamError(f"Tick {tick} is missing from the recording")
+
+    def frames(self, start=0):
+        """Yield every Frame from tick `start` on, in order, reading the file as it goes."""
+        for tick in range(start, self.ticks):
+            yield self.seek(tick)
+
+    def close(self):
+        """Close the underlying file."""
+        self.file.close()
+
+    def stats(self):
+        """Return the recording's length, keyframe count and size."""
+        size = os.path.getsize(self.file.name)
+        return {
+            'ticks': self.ticks,
+            'seconds': self.ticks / self.tick_rate,
+            'keyframes': len(self.key_ticks),
+            'particles': self.particles,
+            'bytes': size,
+            'kb_per_second': size * self.tick_rate / max(self.ticks, 1) / 1024,
+        }
+
+
+def spectate(path):
+    """Play a state stream in a window: left/right skip 5 seconds, space pauses, escape quits."""
+    import pygame
+
+    from Explorer import SpaceExplorer
+    from pipeline import FrameState
+
+    reader = StateStreamReader(path)
+    game = SpaceExplorer()
+    view = FrameState()
+    view.world = game.world.mirror()
+    view.particles.stamps = game.particles.stamps
+    clock = pygame.time.Clock()
+
+    tick = 0
+    paused = False
+    running = reader.ticks > 0
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_ESCAPE:
+                    running = False
+                elif event.key == pygame.K_SPACE:
+                    paused = not paused
+                elif event.key == pygame.K_LEFT:
+                    tick = max(0, tick - 5 * reader.tick_rate)
+                elif event.key == pygame.K_RIGHT:
+                    tick = min(reader.ticks - 1, tick + 5 * reader.tick_rate)
+
+        reader.seek(tick).fill(view)
+        game.view = view
+        game.draw_game()
+        game.present()
+        if not paused:
+            tick = min(reader.ticks - 1, tick + 1)
+        clock.tick(reader.tick_rate)
+    reader.close()
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inspect or watch a Space Explorer state stream")
+    parser.add_argument('path', help="state stream file (record one with headless.py --stream)")
+    parser.add_argument('--play', action='store_true', help="watch the recording in a window")
+    args = parser.parse_args()
+
+    if args.play:
+        spectate(args.path)
+    else:
+        try:
+            reader = StateStreamReader(args.path)
+        except StreamError as error:
+            parser.exit(1, f"{args.path}: {error}\n")
+        for key, value in reader.stats().items():
+            print(f"{key}: {value}")
+        if reader.ticks:
+            ticks = np.random.default_rng(0).integers(0, reader.ticks, 100).tolist()
+            start = time.perf_counter()
+            for tick in ticks:
+                reader.seek(tick)
+            print(f"seek_ms: {(time.perf_counter() - start) / len(ticks) * 1000:.3f}")
+        reader.close()
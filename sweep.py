@@ -0,0 +1,102 @@
+import numpy as np
+
+# Cell size of the broad phase; a segment's candidates come from every cell
+# its swept box covers, so cells a little larger than the boxes work best
+DEFAULT_CELL_SIZE = 64
+
+# Below this many segment-box pairs, testing every pair beats building the grid
+BRUTE_FORCE_PAIRS = 8192
+
+# Packs a cell's (column, row) into one sortable int64 key
+_ROW_OFFSET = 1 << 31
+
+
+def _cell_keys(cx, cy):
+    """Return the sort key of grid cells (cx, cy)."""
+    return (cx.astype(np.int64) << 32) + (cy.astype(np.int64) + _ROW_OFFSET)
+
+
+def swept_pairs(x, y_from, y_to, box_x, box_y, half_w, half_h, cell_size=DEFAULT_CELL_SIZE):
+    """Find every vertical segment that passes through a box, for all segments at once.
+
+    Segment i runs from (x[i], y_from[i]) to (x[i], y_to[i]): the path a
+    bullet covered during the tick. Box j is centered on (box_x[j],
+    box_y[j]) with half-sizes half_w and half_h and, as in the game's
+    discrete tests, open edges. A segment of zero length hits exactly the
+    boxes the old point test hit.
+
+    Returns (segment, box, time) arrays, one entry per hit, where time is
+    the fraction of the path travelled before entering the box. Entries are
+    sorted by segment, then time, then box, so each segment's first entry
+    is the box it reached first.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y_from = np.asarray(y_from, dtype=np.float64)
+    y_to = np.asarray(y_to, dtype=np.float64)
+    box_x = np.asarray(box_x, dtype=np.float64)
+    box_y = np.asarray(box_y, dtype=np.float64)
+    empty = np.empty(0, dtype=np.intp)
+    if not len(x) or not len(box_x):
+        return empty, empty, np.empty(0)
+
+    y_min = np.minimum(y_from, y_to)
+    y_max = np.maximum(y_from, y_to)
+    if len(x) * len(box_x) <= BRUTE_FORCE_PAIRS:
+        segment, box = np.nonzero(
+            (np.abs(x[:, None] - box_x) < half_w) &
+            (y_min[:, None] < box_y + half_h) & (y_max[:, None] > box_y - half_h)
+        )
+        return _order_hits(segment, box, y_from, y_to, box_y[box], half_h)
+
+    # Broad phase: sort the boxes by the grid cell their center is in
+    box_keys = _cell_keys(np.floor(box_x / cell_size), np.floor(box_y / cell_size))
+    order = np.argsort(box_keys, kind='stable')
+    box_keys = box_keys[order]
+
+    # Any box a segment can touch has its center inside the segment's bounds
+    # grown by the half-sizes; enumerate the cells covering those bounds
+    cx0 = np.floor((x - half_w) / cell_size).astype(np.int64)
+    cx1 = np.floor((x + half_w) / cell_size).astype(np.int64)
+    cy0 = np.floor((y_min - half_h) / cell_size).astype(np.int64)
+    cy1 = np.floor((y_max + half_h) / cell_size).astype(np.int64)
+    columns = int((cx1 - cx0).max()) + 1
+    rows = int((cy1 - cy0).max()) + 1
+    dx = np.repeat(np.arange(columns), rows)
+    dy = np.tile(np.arange(rows), columns)
+    cell_x = cx0[:, None] + dx
+    cell_y = cy0[:, None] + dy
+    inside = (cell_x <= cx1[:, None]) & (cell_y <= cy1[:, None])
+    cell_segment = np.nonzero(inside)[0]
+    keys = _cell_keys(cell_x[inside], cell_y[inside])
+
+    # Expand each (segment, cell) into (segment, box) candidates
+    start = np.searchsorted(box_keys, keys, 'left')
+    counts = np.searchsorted(box_keys, keys, 'right') - start
+    total = int(counts.sum())
+    if not total:
+        return empty, empty, np.empty(0)
+    segment = np.repeat(cell_segment, counts)
+    within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    box = order[np.repeat(start, counts) + within]
+
+    # Narrow phase: the same open-edge overlap test as the point checks,
+    # with the segment's vertical extent standing in for the point
+    bx = box_x[box]
+    by = box_y[box]
+    hit = ((np.abs(x[segment] - bx) < half_w) &
+           (y_min[segment] < by + half_h) & (y_max[segment] > by - half_h))
+    return _order_hits(segment[hit], box[hit], y_from, y_to, by[hit], half_h)
+
+
+def _order_hits(segment, box, y_from, y_to, by, half_h):
+    """Return hits as (segment, box, time) sorted by segment, time of impact, then box."""
+    # Time of impact along the path (0 if the segment starts inside the box)
+    start_y = y_from[segment]
+    travel = y_to[segment] - start_y
+    edge = np.where(travel < 0, by + half_h, by - half_h)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        time = np.where(travel != 0, (edge - start_y) / travel, 0.0)
+    time = np.clip(time, 0.0, 1.0)
+
+    order = np.lexsort((box, time, segment))
+    return segment[order], box[order], time[order]
@@ -0,0 +1,154 @@
+import hashlib
+import mmap
+import os
+
+import numpy as np
+import pygame
+
+# Bump when the synthesis code changes so stale cache files are ignored
+SYNTH_VERSION = 1
+
+WAVEFORMS = ('sine', 'square', 'noise')
+ENVELOPES = ('none', 'linear', 'exponential')
+
+# pygame mixer sample size -> NumPy dtype
+SAMPLE_DTYPES = {
+    8: np.uint8,
+    -8: np.int8,
+    16: np.uint16,
+    -16: np.int16,
+    32: np.float32,
+}
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')),
+    'space_explorer', 'sounds'
+)
+
+
+def mixer_format():
+    """Return (sample_rate, size, channels) of the initialized mixer."""
+    init = pygame.mixer.get_init()
+    if init is None:
+        raise pygame.error("pygame.mixer is not initialized")
+    return init
+
+
+def synthesize(frequency, duration, waveform='sine', envelope='linear', attack=0.0, seed=0,
+               sample_rate=44100, size=-16, channels=2):
+    """Generate a sound effect as a NumPy array in the mixer's native sample format.
+
+    The result has shape (samples,) for mono or (samples, channels) otherwise,
+    which is the layout pygame.sndarray expects, so it can be handed to the
+    mixer without conversion.
+    """
+    if waveform not in WAVEFORMS:
+        raise ValueError(f"Unknown waveform: {waveform!r}")
+    if envelope not in ENVELOPES:
+        raise ValueError(f"Unknown envelope: {envelope!r}")
+    if size not in SAMPLE_DTYPES:
+        raise ValueError(f"Unsupported sample size: {size}")
+
+    num_samples = int(duration * sample_rate)
+    t = np.arange(num_samples, dtype=np.float32) / sample_rate
+
+    # Raw waveform in [-1, 1]
+    if waveform == 'sine':
+        wave = np.sin((2 * np.pi * frequency) * t)
+    elif waveform == 'square':
+        wave = np.sign(np.sin((2 * np.pi * frequency) * t))
+    else:
+        wave = np.random.default_rng(seed).uniform(-1, 1, num_samples).astype(np.float32)
+
+    # Volume envelope
+    if envelope == 'linear':
+        wave *= 1 - t / duration
+    elif envelope == 'exponential':
+        wave *= np.exp(-5 * t / duration)
+    if attack > 0:
+        wave *= np.minimum(t / attack, 1)
+
+    # Scale to the sample format
+    dtype = SAMPLE_DTYPES[size]
+    if dtype is np.float32:
+        samples = wave.astype(np.float32)
+    else:
+        info = np.iinfo(dtype)
+        half_range = (int(info.max) - int(info.min)) / 2
+        midpoint = int(info.min) + half_range
+        samples = (wave * (half_range - 1) + midpoint).astype(dtype)
+
+    if channels > 1:
+        samples = np.repeat(samples[:, None], channels, axis=1)
+    return samples
+
+
+class SoundBank:
+    """Builds synthesized sounds for the current mixer and caches the PCM data on disk.
+
+    Cache files are keyed by the synthesis parameters and the mixer format,
+    and are loaded back through a memory map, so later launches skip
+    synthesis entirely.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, use_cache=True):
+        """Create a sound bank for the mixer that is currently initialized."""
+        self.sample_rate, self.size, self.channels = mixer_format()
+        self.cache_dir = cache_dir
+        self.use_cache = use_cache
+        self.hits = 0
+        self.misses = 0
+
+    def cache_path(self, params):
+        """Return the cache file path for a set of synthesis parameters."""
+        key = repr((SYNTH_VERSION, self.sample_rate, self.size, self.channels, sorted(params.items())))
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return os.path.join(self.cache_dir, f"{digest}.pcm")
+
+    def samples(self, frequency, duration, **params):
+        """Return the samples for a sound, from the disk cache when possible."""
+        params = dict(params, frequency=frequency, duration=duration)
+        path = self.cache_path(params) if self.use_cache else None
+
+        if path and os.path.exists(path):
+            try:
+                samples = self._load(path)
+                self.hits += 1
+                return samples
+            except (OSError, ValueError):
+                # Corrupt or partial cache file: fall through and rebuild it
+                pass
+
+        self.misses += 1
+        samples = synthesize(
+            sample_rate=self.sample_rate, size=self.size, channels=self.channels, **params
+        )
+        if path:
+            self._store(path, samples)
+        return samples
+
+    def _load(self, path):
+        """Memory-map a raw PCM cache file as a read-only sample array."""
+        with open(path, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        samples = np.frombuffer(data, dtype=SAMPLE_DTYPES[self.size])
+        if self.channels > 1:
+            samples = samples.reshape(-1, self.channels)
+        return samples
+
+    def _store(self, path, samples):
+        """Write raw PCM to a cache file atomically, ignoring failures (the cache is optional)."""
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(tmp_path, 'wb') as f:
+                f.write(np.ascontiguousarray(samples).tobytes())
+            os.replace(tmp_path, path)
+        except OSError:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+    def sound(self, frequency, duration, **params):
+        """Return a pygame Sound for the given synthesis parameters."""
+        # The array is already in the mixer's layout, so this is a single copy into the mixer's chunk
+        return pygame.sndarray.make_sound(self.samples(frequency, duration, **params))
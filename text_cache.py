@@ -0,0 +1,106 @@
+from collections import OrderedDict
+
+
+class TextCache:
+    """LRU cache of rendered text surfaces keyed on font, string and color.
+
+    Rasterizing glyphs is one of the most expensive things a frame does, and
+    most strings on screen are the same from one frame to the next.
+    """
+
+    def __init__(self, max_entries=256):
+        """Create an empty cache holding at most `max_entries` surfaces."""
+        self.max_entries = max_entries
+        self.surfaces = OrderedDict()
+        self.wrapped = {}
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color, antialias=True):
+        """Return the rendered surface for `text`, rasterizing it only on a cache miss."""
+        key = (font, text, color, antialias)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, antialias, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_entries:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def wrap(self, font, text, width):
+        """Split `text` into lines that fit within `width` pixels, caching the result."""
+        key = (font, text, width)
+        lines = self.wrapped.get(key)
+        if lines is not None:
+            return lines
+
+        words = text.split(' ')
+        lines = []
+        line = ""
+        for word in words:
+            test_line = line + word + " "
+            if font.size(test_line)[0] < width:
+                line = test_line
+            else:
+                lines.append(line)
+                line = word + " "
+        lines.append(line)
+
+        self.wrapped[key] = lines
+        return lines
+
+    def clear(self):
+        """Drop every cached surface and wrapped text."""
+        self.surfaces.clear()
+        self.wrapped.clear()
+
+    def stats(self):
+        """Return hit/miss counters and the current cache size."""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.surfaces)}
+
+
+class HudField:
+    """One HUD text item, formatted from a template and a value."""
+
+    def __init__(self, font, template, color, pos):
+        """Create a field that renders `template.format(value)` at `pos`."""
+        self.font = font
+        self.template = template
+        self.color = color
+        self.pos = pos
+        self.value = None
+        self.surface = None
+
+
+class Hud:
+    """Heads-up display whose fields are only re-rendered when their value changes."""
+
+    def __init__(self):
+        """Create an empty HUD."""
+        self.fields = {}
+        self.renders = 0
+        self.reuses = 0
+
+    def add_field(self, name, font, template, color, pos):
+        """Register a field that can then be drawn by name."""
+        self.fields[name] = HudField(font, template, color, pos)
+
+    def draw(self, surface, name, value):
+        """Draw field `name` showing `value` and return the rect it covers."""
+        field = self.fields[name]
+        if field.surface is None or value != field.value:
+            field.surface = field.font.render(field.template.format(value), True, field.color)
+            field.value = value
+            self.renders += 1
+        else:
+            self.reuses += 1
+        return surface.blit(field.surface, field.pos)
+
+    def stats(self):
+        """Return how often fields were re-rendered versus reused."""
+        return {'renders': self.renders, 'reuses': self.reuses}
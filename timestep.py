@@ -0,0 +1,133 @@
+class FixedTimestep:
+    """Turns variable frame times into a whole number of fixed-length simulation ticks.
+
+    Real time accumulates every frame and is spent in ticks of
+    1/tick_rate seconds, so the game runs at the same speed whatever the
+    frame rate: a 30 FPS frame runs two ticks, a 144 Hz frame runs one
+    tick most of the time and none in between. The leftover fraction of a
+    tick (alpha) tells the renderer how far to interpolate between the
+    last two ticks.
+
+    Under load a frame may run up to `max_ticks` ticks; anything beyond
+    that is dropped (the game slows down rather than spiralling). When a
+    frame has to catch up with more than one tick and the previous frame's
+    work alone took longer than a tick, drawing is skipped so the time
+    goes to the simulation, but never more than `max_skip` frames in a row.
+    """
+
+    def __init__(self, tick_rate=60, max_ticks=5, max_skip=2):
+        """Create an accumulator for `tick_rate` ticks per second."""
+        self.tick_seconds = 1.0 / tick_rate
+        self.max_ticks = max_ticks
+        self.max_skip = max_skip
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.render = True
+        self.skipped = 0
+
+        # Stats
+        self.frames = 0
+        self.ticks = 0
+        self.renders_skipped = 0
+        self.seconds_dropped = 0.0
+
+    def reset(self):
+        """Forget accumulated time (e.g. while paused or in a menu)."""
+        self.accumulator = 0.0
+        self.alpha = 1.0
+        self.render = True
+        self.skipped = 0
+
+    def advance(self, elapsed, busy=0.0):
+        """Add a frame of `elapsed` seconds and return how many ticks to run.
+
+        `busy` is how long the previous frame spent working (not waiting),
+        which decides whether the game is behind and may skip drawing.
+        """
+        tick = self.tick_seconds
+        self.accumulator += elapsed
+        ticks = int(self.accumulator / tick)
+        if ticks > self.max_ticks:
+            # Too far behind to catch up: drop the excess time
+            self.seconds_dropped += (ticks - self.max_ticks) * tick
+            ticks = self.max_ticks
+        self.accumulator = max(self.accumulator - ticks * tick, 0.0)
+        self.alpha = min(self.accumulator / tick, 1.0)
+
+        behind = ticks > 1 and busy > tick
+        if behind and self.skipped < self.max_skip:
+            self.render = False
+            self.skipped += 1
+            self.renders_skipped += 1
+        else:
+            self.render = True
+            self.skipped = 0
+
+        self.frames += 1
+        self.ticks += ticks
+        return ticks
+
+    def stats(self):
+        """Return tick, skip and drop counters."""
+        return {
+            'frames': self.frames,
+            'ticks': self.ticks,
+            'renders_skipped': self.renders_skipped,
+            'seconds_dropped': self.seconds_dropped,
+        }
+
+
+class Interpolator:
+    """Keeps positions from the previous tick so a frame can be drawn between two ticks.
+
+    Positions are captured before every tick. When drawing, they are
+    blended from the captured ones to the current ones by alpha. Pool
+    entities are matched by slot and spawn sequence number, so anything
+    spawned (or whose slot was reused) since the capture is drawn where it
+    is now. With alpha == 1 the current arrays are returned untouched.
+    """
+
+    def __init__(self):
+        """Create an interpolator with nothing captured."""
+        self.pools = {}
+        self.points = {}
+
+    def clear(self):
+        """Forget every captured position (after teleports such as a reset or restore)."""
+        self.pools = {}
+        self.points = {}
+
+    def capture_pool(self, pool):
+        """Remember the positions of every live entity in an EntityPool."""
+        top = pool.top
+        self.pools[id(pool)] = (pool.seq[:top].copy(), pool.x[:top].copy(), pool.y[:top].copy())
+
+    def capture_point(self, key, pos):
+        """Remember a single (x, y) position under `key` (None if it does not exist)."""
+        self.points[key] = None if pos is None else (pos[0], pos[1])
+
+    def pool_xy(self, pool, slots, alpha):
+        """Return the x and y arrays of the pool's `slots`, blended from the captured positions."""
+        x = pool.x[slots]
+        y = pool.y[slots]
+        previous = self.pools.get(id(pool))
+        if alpha >= 1.0 or previous is None or not len(slots):
+            return x, y
+
+        seq, prev_x, prev_y = previous
+        known = slots < len(seq)
+        known[known] = seq[slots[known]] == pool.seq[slots[known]]
+        if not known.any():
+            return x, y
+        source = slots[known]
+        x[known] = prev_x[source] + (x[known] - prev_x[source]) * alpha
+        y[known] = prev_y[source] + (y[known] - prev_y[source]) * alpha
+        return x, y
+
+    def point(self, key, pos, alpha):
+        """Return (x, y) for `pos`, blended from the position captured under `key`."""
+        previous = self.points.get(key)
+        if alpha >= 1.0 or previous is None:
+            return pos[0], pos[1]
+        return (previous[0] + (pos[0] - previous[0]) * alpha,
+                previous[1] + (pos[1] - previous[1]) * alpha)
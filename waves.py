@@ -0,0 +1,335 @@
+import argparse
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+# Campaign files are JSON or TOML with this layout:
+#
+#   version   CAMPAIGN_VERSION
+#   name      optional display name
+#   waves     list of wave rules; each level plays the first rule that matches it
+#     levels      a level, a list of levels, or {"from", "to", "every"} (all optional)
+#     formations  list of enemy formations, spawned in order:
+#       count         number of enemies (a scaled value, see below)
+#       columns       enemies per row
+#       origin        [x, y] of the first enemy
+#       spacing       [dx, dy] between columns and rows
+#       types         enemy types to pick from (0 .. types - 1)
+#       attack_delay  [min, max] ticks before an enemy's first shot
+#     boss        optional boss:
+#       pos           [x, y] it enters at
+#       types         boss attack patterns to pick from
+#       health        hit points (a scaled value)
+#
+# A scaled value is a number or {"base", "per_level", "max"}, meaning
+# base + per_level * level, capped at max.
+CAMPAIGN_VERSION = 1
+
+DEFAULT_CAMPAIGN = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'campaigns', 'classic.json')
+
+# Most compiled waves, and bytes of compiled positions, kept in a campaign's LRU
+MAX_CACHED_WAVES = 64
+MAX_CACHE_BYTES = 4 * 2 ** 20
+
+FORMATION_DEFAULTS = {
+    'columns': 5,
+    'origin': (100, 50),
+    'spacing': (150, 80),
+    'types': 3,
+    'attack_delay': (0, 100),
+}
+BOSS_DEFAULTS = {
+    'pos': (400, 100),
+    'types': 3,
+}
+
+
+class CampaignError(Exception):
+    """Raised when a campaign file cannot be read or does not validate."""
+
+
+def _number(value, where, minimum=None):
+    """Validate a plain number."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise CampaignError(f"{where}: expected a number, got {value!r}")
+    if minimum is not None and value < minimum:
+        raise CampaignError(f"{where}: must be at least {minimum}, got {value!r}")
+    return value
+
+
+def _integer(value, where, minimum=None):
+    """Validate a whole number."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise CampaignError(f"{where}: expected a whole number, got {value!r}")
+    return _number(value, where, minimum)
+
+
+def _pair(value, where):
+    """Validate an [x, y] pair of numbers."""
+    if not isinstance(value, (list, tuple)) or len(value) != 2:
+        raise CampaignError(f"{where}: expected [x, y], got {value!r}")
+    return (_number(value[0], f"{where}[0]"), _number(value[1], f"{where}[1]"))
+
+
+def _scaled(value, where):
+    """Validate a scaled value and return it as (base, per_level, max)."""
+    if not isinstance(value, dict):
+        return (_number(value, where), 0, None)
+    _check_keys(value, ('base', 'per_level', 'max'), where)
+    cap = value.get('max')
+    return (
+        _number(value.get('base', 0), f"{where}.base"),
+        _number(value.get('per_level', 0), f"{where}.per_level"),
+        None if cap is None else _number(cap, f"{where}.max"),
+    )
+
+
+def _evaluate(scaled, level):
+    """Return the whole-number value of a scaled value at `level`."""
+    base, per_level, cap = scaled
+    value = base + per_level * level
+    if cap is not None:
+        value = min(value, cap)
+    return max(int(value), 0)
+
+
+def _check_keys(spec, allowed, where):
+    """Reject unknown keys, which are almost always typos."""
+    if not isinstance(spec, dict):
+        raise CampaignError(f"{where}: expected a table, got {spec!r}")
+    for key in spec:
+        if key not in allowed:
+            raise CampaignError(f"{where}: unknown key {key!r}")
+
+
+def _levels(spec, where):
+    """Validate a levels selector and return (first, last, every, listed)."""
+    if spec is None:
+        return (1, None, 1, None)
+    if isinstance(spec, list):
+        return (1, None, 1, frozenset(_integer(level, f"{where}[{i}]", 1) for i, level in enumerate(spec)))
+    if not isinstance(spec, dict):
+        level = _integer(spec, where, 1)
+        return (level, level, 1, None)
+    _check_keys(spec, ('from', 'to', 'every'), where)
+    last = spec.get('to')
+    return (
+        _integer(spec.get('from', 1), f"{where}.from", 1),
+        None if last is None else _integer(last, f"{where}.to", 1),
+        _integer(spec.get('every', 1), f"{where}.every", 1),
+        None,
+    )
+
+
+def _matches(levels, level):
+    """Return whether a levels selector covers `level`."""
+    first, last, every, listed = levels
+    if listed is not None:
+        return level in listed
+    return level >= first and (last is None or level <= last) and level % every == 0
+
+
+def _formation(spec, where):
+    """Validate one formation and fill in its defaults."""
+    _check_keys(spec, ('count',) + tuple(FORMATION_DEFAULTS), where)
+    if 'count' not in spec:
+        raise CampaignError(f"{where}: missing 'count'")
+    spec = dict(FORMATION_DEFAULTS, **spec)
+    attack_delay = _pair(spec['attack_delay'], f"{where}.attack_delay")
+    if attack_delay[0] > attack_delay[1]:
+        raise CampaignError(f"{where}.attack_delay: min is larger than max")
+    return {
+        'count': _scaled(spec['count'], f"{where}.count"),
+        'columns': _integer(spec['columns'], f"{where}.columns", 1),
+        'origin': _pair(spec['origin'], f"{where}.origin"),
+        'spacing': _pair(spec['spacing'], f"{where}.spacing"),
+        'types': _integer(spec['types'], f"{where}.types", 1),
+        'attack_delay': (_integer(attack_delay[0], f"{where}.attack_delay[0]"),
+                         _integer(attack_delay[1], f"{where}.attack_delay[1]")),
+    }
+
+
+def _boss(spec, where):
+    """Validate a boss and fill in its defaults."""
+    _check_keys(spec, ('health',) + tuple(BOSS_DEFAULTS), where)
+    if 'health' not in spec:
+        raise CampaignError(f"{where}: missing 'health'")
+    spec = dict(BOSS_DEFAULTS, **spec)
+    return {
+        'pos': _pair(spec['pos'], f"{where}.pos"),
+        'types': _integer(spec['types'], f"{where}.types", 1),
+        'health': _scaled(spec['health'], f"{where}.health"),
+    }
+
+
+class Wave:
+    """One level's compiled spawn table.
+
+    The formation layout is resolved into flat position arrays; the
+    random parts (enemy types and first attack delays, the boss pattern)
+    stay as ranges and are rolled from the game's RNG at spawn time, so a
+    compiled wave can be shared by every game that plays the level.
+    """
+
+    __slots__ = ('level', 'x', 'y', 'groups', 'boss')
+
+    def __init__(self, level, x, y, groups, boss):
+        """Create a wave from precomputed arrays; see Campaign.compile."""
+        self.level = level
+        self.x = x
+        self.y = y
+        self.groups = groups  # (count, types, attack delay min, attack delay max) per formation
+        self.boss = boss      # None, or (pos, types, health)
+
+    def __len__(self):
+        """Return the number of regular enemies in the wave."""
+        return len(self.x)
+
+    def nbytes(self):
+        """Return the memory used by the position arrays."""
+        return self.x.nbytes + self.y.nbytes
+
+
+class Campaign:
+    """A validated campaign whose levels are compiled into Waves on first use.
+
+    Loading only validates the wave rules, so even a campaign with
+    thousands of levels (or endless procedural rules) is ready at once.
+    Compiled waves are kept in an LRU of at most `max_waves` entries and
+    `max_bytes` of position data.
+    """
+
+    def __init__(self, data, source='<campaign>', max_waves=MAX_CACHED_WAVES, max_bytes=MAX_CACHE_BYTES):
+        """Validate parsed campaign data (a dict as loaded from JSON or TOML)."""
+        self.source = source
+        self.max_waves = max_waves
+        self.max_bytes = max_bytes
+        self.compiled = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+        _check_keys(data, ('version', 'name', 'waves'), source)
+        version = data.get('version')
+        if version != CAMPAIGN_VERSION:
+            raise CampaignError(f"{source}: unsupported campaign version {version!r}")
+        self.name = str(data.get('name', os.path.basename(source)))
+        # Identifies the rules whatever file or format they were loaded from
+        self.digest = hashlib.blake2b(json.dumps(data, sort_keys=True, default=str).encode(), digest_size=16).digest()
+
+        waves = data.get('waves')
+        if not isinstance(waves, list) or not waves:
+            raise CampaignError(f"{source}: 'waves' must be a non-empty list")
+        self.rules = []
+        for i, spec in enumerate(waves):
+            where = f"{source}: waves[{i}]"
+            _check_keys(spec, ('levels', 'formations', 'boss'), where)
+            formations = spec.get('formations', [])
+            if not isinstance(formations, list):
+                raise CampaignError(f"{where}.formations: expected a list")
+            rule = {
+                'levels': _levels(spec.get('levels'), f"{where}.levels"),
+                'formations': [_formation(f, f"{where}.formations[{j}]") for j, f in enumerate(formations)],
+                'boss': _boss(spec['boss'], f"{where}.boss") if 'boss' in spec else None,
+            }
+            if not rule['formations'] and rule['boss'] is None:
+                raise CampaignError(f"{where}: a wave needs formations, a boss or both")
+            self.rules.append(rule)
+
+    def rule(self, level):
+        """Return the wave rule that applies to `level`."""
+        for rule in self.rules:
+            if _matches(rule['levels'], level):
+                return rule
+        raise CampaignError(f"{self.source}: no wave is defined for level {level}")
+
+    def compile(self, level):
+        """Build the Wave for `level` from its rule."""
+        rule = self.rule(level)
+        xs = []
+        ys = []
+        groups = []
+        for formation in rule['formations']:
+            count = _evaluate(formation['count'], level)
+            index = np.arange(count)
+            columns = formation['columns']
+            xs.append(formation['origin'][0] + index % columns * formation['spacing'][0])
+            ys.append(formation['origin'][1] + index // columns * formation['spacing'][1])
+            groups.append((count, formation['types']) + formation['attack_delay'])
+
+        boss = rule['boss']
+        if boss is not None:
+            boss = (boss['pos'], boss['types'], _evaluate(boss['health'], level))
+        x = np.concatenate(xs).astype(np.float64) if xs else np.empty(0)
+        y = np.concatenate(ys).astype(np.float64) if ys else np.empty(0)
+        return Wave(level, x, y, tuple(groups), boss)
+
+    def wave(self, level):
+        """Return the compiled Wave for `level`, compiling it on a cache miss."""
+        wave = self.compiled.get(level)
+        if wave is not None:
+            self.compiled.move_to_end(level)
+            self.hits += 1
+            return wave
+
+        self.misses += 1
+        wave = self.compile(level)
+        self.compiled[level] = wave
+        self.nbytes += wave.nbytes()
+        while len(self.compiled) > 1 and (len(self.compiled) > self.max_waves or self.nbytes > self.max_bytes):
+            self.nbytes -= self.compiled.popitem(last=False)[1].nbytes()
+        return wave
+
+    def stats(self):
+        """Return cache counters and the memory held by compiled waves."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'compiled': len(self.compiled),
+            'bytes': self.nbytes,
+        }
+
+
+def load_campaign(path, max_waves=MAX_CACHED_WAVES, max_bytes=MAX_CACHE_BYTES):
+    """Read and validate a .json or .toml campaign file."""
+    try:
+        if path.endswith('.toml'):
+            if tomllib is None:
+                raise CampaignError(f"{path}: TOML campaigns need Python 3.11 or newer")
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+        else:
+            with open(path) as f:
+                data = json.load(f)
+    except OSError as error:
+        raise CampaignError(f"{path}: {error.strerror}") from error
+    except ValueError as error:  # JSONDecodeError and TOMLDecodeError
+        raise CampaignError(f"{path}: {error}") from error
+    return Campaign(data, path, max_waves, max_bytes)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate a Space Explorer campaign and list its waves")
+    parser.add_argument('path', nargs='?', default=DEFAULT_CAMPAIGN, help="campaign .json or .toml file")
+    parser.add_argument('--levels', type=int, default=20, help="how many levels to list")
+    args = parser.parse_args()
+
+    try:
+        campaign = load_campaign(args.path)
+        print(f"{campaign.name}: {len(campaign.rules)} wave rules")
+        print(f"{'level':>6} {'enemies':>8} {'boss hp':>8} {'lowest y':>9}")
+        for level in range(1, args.levels + 1):
+            wave = campaign.wave(level)
+            boss = wave.boss[2] if wave.boss else '-'
+            lowest = f"{wave.y.max():.0f}" if len(wave) else '-'
+            print(f"{level:>6} {len(wave):>8} {boss:>8} {lowest:>9}")
+    except CampaignError as error:
+        parser.exit(1, f"{error}\n")